@@ -0,0 +1,76 @@
+# encoding: utf-8
+
+"""Measure the cost of Document construction and hydration for documents of varying width.
+
+Run directly:
+
+	python benchmark/construction.py
+
+Each document class has the requested number of fields; one in five is marked for assignment on creation, with a
+default value, so that default processing participates in the measurement.
+"""
+
+from __future__ import print_function, unicode_literals
+
+from timeit import repeat
+
+from bson import BSON, decode_all
+from marrow.mongo import Document
+from marrow.mongo.field import Integer, String
+
+
+def sample(width):
+	"""Construct a Document subclass with the given number of fields."""
+	
+	fields = {}
+	
+	for i in range(width):
+		if i % 5 == 0:
+			fields['field_%d' % i] = Integer(default=i, assign=True)
+		else:
+			fields['field_%d' % i] = String()
+	
+	return type(str('Sample%d' % width), (Document, ), fields)
+
+
+def measure(statement, number, **namespace):
+	"""Return the best per-call time, in microseconds, of the given statement."""
+	
+	return min(repeat(statement, globals=namespace, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+	print("{:>6}  {:>12}  {:>12}  {:>16}  {:>16}".format(
+			"fields", "empty (µs)", "args (µs)", "from_mongo (µs)", "lazy (µs)"))
+	
+	for width in (10, 50, 200):
+		Sample = sample(width)
+		args = (0, 'one', 'two', 'three', 'four')
+		data = {'field_%d' % i: 'value' for i in range(width) if i % 5}
+		number = 20000 // width
+		
+		print("{:>6}  {:>12.2f}  {:>12.2f}  {:>16.2f}  {:>16.2f}".format(
+				width,
+				measure("Sample()", number, Sample=Sample),
+				measure("Sample(*args)", number, Sample=Sample, args=args),
+				measure("Sample.from_mongo(dict(data))", number, Sample=Sample, data=data),
+				measure("Sample.from_mongo(dict(data), lazy=True)", number, Sample=Sample, data=data),
+			))
+	
+	print("\nWrapping a decoded 1000-row result set of 50-field documents, reading one field of each:")
+	
+	Sample = sample(50)
+	payload = b''.join(BSON.encode({'field_%d' % i: 'value' for i in range(50) if i % 5}) for j in range(1000))
+	namespace = dict(Sample=Sample, payload=payload, decode_all=decode_all)
+	
+	for label, statement in (
+				("decode only", "decode_all(payload)"),
+				("eager", "[Sample.from_mongo(i).field_1 for i in decode_all(payload)]"),
+				("lazy", "[Sample.from_mongo(i, lazy=True).field_1 for i in decode_all(payload)]"),
+				("lazy, untouched", "[Sample.from_mongo(i, lazy=True) for i in decode_all(payload)]"),
+			):
+		print("{:>16}  {:>10.2f} ms".format(label, measure(statement, 3, **namespace) / 1000))
+
+
+if __name__ == '__main__':
+	main()
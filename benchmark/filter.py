@@ -0,0 +1,53 @@
+# encoding: utf-8
+
+"""Measure the combination of many filter and update fragments, and the simplification of the resulting filter.
+
+Run directly:
+	
+	python benchmark/filter.py
+"""
+
+from __future__ import print_function, unicode_literals
+
+from functools import reduce
+from operator import and_
+from timeit import repeat
+
+from marrow.mongo import Filter, Update
+from marrow.mongo.query import optimize
+
+
+def filters(count):
+	"""Range constraints across count / 2 fields, each field receiving a lower then upper bound."""
+	
+	return [Filter({'f{}'.format(i // 2): {('$gte', '$lt')[i % 2]: i}}) for i in range(count)]
+
+
+def updates(count):
+	return [Update({('$set', '$inc')[i % 2]: {'f{}'.format(i): i}}) for i in range(count)]
+
+
+def measure(statement, number, **namespace):
+	"""Return the best per-iteration time, in microseconds, of the given statement."""
+	
+	return min(repeat(statement, globals=namespace, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+	print("{:>8}  {:>14}  {:>14}  {:>14}".format("clauses", "Filter (µs)", "Update (µs)", "Optimize (µs)"))
+	
+	for count in (5, 50, 500):
+		number = 5000 // count
+		
+		query = reduce(and_, filters(count))
+		
+		print("{:>8}  {:>14.2f}  {:>14.2f}  {:>14.2f}".format(
+				count,
+				measure("reduce(and_, parts).as_query", number, reduce=reduce, and_=and_, parts=filters(count)),
+				measure("reduce(and_, parts).operations", number, reduce=reduce, and_=and_, parts=updates(count)),
+				measure("optimize(query)", number, optimize=optimize, query=query),
+			))
+
+
+if __name__ == '__main__':
+	main()
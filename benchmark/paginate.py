@@ -0,0 +1,94 @@
+# encoding: utf-8
+
+"""Compare offset (skip) and keyset (seek) pagination at increasing page depths.
+
+Requires a running MongoDB server; run directly, optionally specifying the database to use:
+	
+	python benchmark/paginate.py [mongodb://localhost/test]
+
+A collection of 25,000 articles is populated, then pages of 20 retrieved at depths of 1, 100, and 1000, sorted by
+descending publication date. Skipping must scan and discard every preceding record, keyset pagination seeks directly.
+"""
+
+from __future__ import print_function, unicode_literals
+
+import sys
+from datetime import datetime, timedelta
+from timeit import repeat
+
+from pymongo import MongoClient
+
+from marrow.mongo import Index
+from marrow.mongo.field import Date, String
+from marrow.mongo.query import keyset
+from marrow.mongo.trait import Queryable
+
+
+RECORDS = 25000
+SIZE = 20
+SORT = ('-published', 'id')
+
+
+class Article(Queryable):
+	__collection__ = 'benchmark_paginate'
+	
+	title = String()
+	published = Date()
+	
+	_published = Index('-published', 'id')
+
+
+def populate(db):
+	Article.bind(db).create_collection(drop=True, indexes=True)
+	
+	epoch = datetime(2017, 1, 1)
+	Article.get_collection().insert_many(
+			Article(title="Article %d" % i, published=epoch + timedelta(minutes=i // 3))
+			for i in range(RECORDS))
+
+
+def token(page):
+	"""Produce the continuation token for the given page, from the last record of the page preceding it."""
+	
+	if page == 1:
+		return None
+	
+	order = keyset.order(Article.find().sort(*SORT).options['sort'])
+	last = Article.find().sort(*SORT)[(page - 1) * SIZE - 1]
+	
+	return keyset.encode(order, keyset.values(last, order))
+
+
+def offset(page):
+	return list(Article.find(sort=SORT, skip=(page - 1) * SIZE, limit=SIZE))
+
+
+def seek(after):
+	return Article.paginate(sort=SORT, after=after, limit=SIZE)[0]
+
+
+def measure(statement, **namespace):
+	"""Return the best per-iteration time, in milliseconds, of the given statement."""
+	
+	number = 20
+	return min(repeat(statement, globals=namespace, number=number, repeat=5)) / number * 1e3
+
+
+def main(uri='mongodb://localhost/test'):
+	populate(MongoClient(uri).get_database())
+	
+	print("{:>6}  {:>12}  {:>12}".format("Page", "Skip", "Keyset"))
+	
+	for page in (1, 100, 1000):
+		after = token(page)
+		assert [i.id for i in offset(page)] == [i.id for i in seek(after)]
+		
+		print("{:>6}  {:>9.2f} ms  {:>9.2f} ms".format(page,
+				measure("offset(page)", offset=offset, page=page),
+				measure("seek(after)", seek=seek, after=after)))
+	
+	Article.get_collection().drop()
+
+
+if __name__ == '__main__':
+	main(*sys.argv[1:])
@@ -0,0 +1,115 @@
+# encoding: utf-8
+
+"""Measure the construction of filters through class-level field access, including nested paths, and their local evaluation.
+
+Run directly:
+
+	python benchmark/query.py
+"""
+
+from __future__ import print_function, unicode_literals
+
+from functools import reduce
+from operator import and_
+from timeit import repeat
+
+from marrow.mongo import Document
+from marrow.mongo.field import Array, Embed, Integer, String
+from marrow.mongo.query import matcher, prepare
+
+
+class Address(Document):
+	street = String()
+	city = String()
+	country = String()
+
+
+class Tag(Document):
+	name = String()
+	weight = Integer()
+
+
+class Person(Document):
+	name = String()
+	email = String()
+	age = Integer()
+	address = Embed(Address)
+	tags = Array(Embed(Tag))
+	friends = Array(Embed('__main__:Person'))  # Resolved by name on use.
+
+
+def build():
+	"""Construct a filter of ten clauses, four of them referencing nested fields."""
+	
+	return reduce(and_, (
+			Person.name == "Alice",
+			Person.email == "alice@example.com",
+			Person.age >= 18,
+			Person.age < 65,
+			Person.address.city == "Montréal",
+			Person.address.country == "CA",
+			Person.tags.name == "admin",
+			Person.tags.weight > 5,
+			Person.friends.name == "Bob",
+			Person.name != "Eve",
+		))
+
+
+def shape(D, p):
+	"""The same filter as `build`, with placeholders in place of each value."""
+	
+	return reduce(and_, (
+			D.name == p.name,
+			D.email == p.email,
+			D.age >= p.minimum,
+			D.age < p.maximum,
+			D.address.city == p.city,
+			D.address.country == p.country,
+			D.tags.name == p.tag,
+			D.tags.weight > p.weight,
+			D.friends.name == p.friend,
+			D.name != p.excluded,
+		))
+
+
+def bind(template):
+	return template(name="Alice", email="alice@example.com", minimum=18, maximum=65, city="Montréal", country="CA",
+			tag="admin", weight=5, friend="Bob", excluded="Eve")
+
+
+def sample():
+	"""A plain mapping matching the filter produced by `build`."""
+	
+	return {
+			'name': "Alice",
+			'email': "alice@example.com",
+			'age': 27,
+			'address': {'street': "1 Main", 'city': "Montréal", 'country': "CA"},
+			'tags': [{'name': "staff", 'weight': 1}, {'name': "admin", 'weight': 10}],
+			'friends': [{'name': "Bob"}],
+		}
+
+
+def measure(statement, **namespace):
+	"""Return the best per-iteration time, in microseconds, of the given statement."""
+	
+	number = 2000
+	return min(repeat(statement, globals=namespace, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+	print("{:>24}  {:>10.2f} µs".format("Person.name", measure("Person.name", Person=Person)))
+	print("{:>24}  {:>10.2f} µs".format("Person.friends.name", measure("Person.friends.name", Person=Person)))
+	print("{:>24}  {:>10.2f} µs".format("10-clause filter", measure("build()", build=build)))
+	print("{:>24}  {:>10.2f} µs".format("prepare (cached)", measure("prepare(Person, shape)",
+			prepare=prepare, Person=Person, shape=shape)))
+	print("{:>24}  {:>10.2f} µs".format("10-clause template", measure("bind(template)",
+			bind=bind, template=prepare(Person, shape))))
+	print("{:>24}  {:>10.2f} µs".format("matcher (compile)", measure("matcher(query)",
+			matcher=matcher, query=build())))
+	print("{:>24}  {:>10.2f} µs".format("matcher (evaluate)", measure("test(document)",
+			test=matcher(build()), document=sample())))
+
+
+if __name__ == '__main__':
+	main()
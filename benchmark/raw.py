@@ -0,0 +1,69 @@
+# encoding: utf-8
+
+"""Compare fully decoded and raw BSON-backed storage when reading a few fields of wide documents.
+
+Run directly:
+
+	python benchmark/raw.py
+
+This simulates the wire side of a result set by encoding 1000 documents of 200 fields, a quarter of them embedded
+documents, then decoding them as a collection bound with and without `__raw__ = True` would.
+"""
+
+from __future__ import print_function, unicode_literals
+
+from timeit import repeat
+from tracemalloc import start, stop, take_snapshot
+
+from bson import BSON, decode_all
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+from marrow.mongo import Document
+from marrow.mongo.field import String
+from marrow.schema.compat import odict
+
+
+class Wide(Document):
+	field_1 = String()
+	field_2 = String()
+
+
+RECORD = odict(('field_%d' % i, {'nested': i, 'more': 'value'} if i % 4 == 0 else 'value %d' % i) for i in range(200))
+PAYLOAD = b''.join(BSON.encode(RECORD) for i in range(1000))
+
+DECODED = CodecOptions(document_class=odict)
+RAW = CodecOptions(document_class=RawBSONDocument)
+
+
+def read(options):
+	"""Load the result set and read two fields of each record."""
+	
+	records = [Wide.from_mongo(i) for i in decode_all(PAYLOAD, options)]
+	
+	for record in records:
+		record.field_1, record.field_2
+	
+	return records
+
+
+def allocated(options):
+	"""Determine the memory retained by the loaded result set, in KiB."""
+	
+	start()
+	records = read(options)
+	size = sum(i.size for i in take_snapshot().statistics('filename'))
+	stop()
+	
+	del records
+	return size / 1024.0
+
+
+def main():
+	for label, options in (("decoded", DECODED), ("raw", RAW)):
+		elapsed = min(repeat(lambda: read(options), number=3, repeat=5)) / 3 * 1000
+		print("{:>8}  {:>8.2f} ms  {:>10.0f} KiB".format(label, elapsed, allocated(options)))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,98 @@
+# encoding: utf-8
+
+"""Compare the available JSON codecs serializing and deserializing representative documents.
+
+Run directly:
+
+	python benchmark/serialization.py
+"""
+
+from __future__ import print_function, unicode_literals
+
+from io import BytesIO
+from timeit import repeat
+
+from bson import Binary, ObjectId
+from pkg_resources import iter_entry_points
+
+from marrow.mongo import Document
+from marrow.mongo.core.codec import resolve
+from marrow.mongo.field import Array, Binary as BinaryField, Date, Embed, Integer, ObjectId as ObjectIdField, String
+from marrow.mongo.util import utcnow
+
+try:
+	from marrow.mongo.field import Decimal
+except ImportError:
+	Decimal = None
+
+
+class Address(Document):
+	street = String()
+	city = String()
+	code = String()
+
+
+class Account(Document):
+	id = ObjectIdField('_id', default=lambda: ObjectId())
+	name = String()
+	email = String()
+	age = Integer()
+	created = Date(default=utcnow)
+	modified = Date(default=utcnow)
+	avatar = BinaryField()
+	tags = Array(String())
+	friends = Array(ObjectIdField())
+	address = Embed(Address)
+	
+	if Decimal:
+		balance = Decimal()
+
+
+def sample():
+	account = Account(
+			name = "Alice Bobson",
+			email = "alice@example.com",
+			age = 42,
+			avatar = Binary(b'\x89PNG' * 64),
+			tags = ['admin', 'staff', 'early-adopter'],
+			friends = [ObjectId() for i in range(10)],
+			address = Address(street="123 Example Street", city="Montréal", code="H0H 0H0"),
+		)
+	
+	if Decimal:
+		account.balance = '1234.56'
+	
+	return account
+
+
+def measure(statement, number, **namespace):
+	"""Return the best per-iteration time, in microseconds, of the given statement."""
+	
+	return min(repeat(statement, globals=namespace, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+	documents = [sample() for i in range(1000)]
+	one = documents[0]
+	
+	print("{:>8}  {:>14}  {:>14}  {:>16}".format("", "dumps (µs)", "loads (µs)", "1000 lines (ms)"))
+	
+	for name in sorted(i.name for i in iter_entry_points('marrow.mongo.codec')):
+		try:
+			codec = resolve(name)
+		except ImportError:
+			continue
+		
+		text = codec.dumps(one)
+		
+		print("{:>8}  {:>14.2f}  {:>14.2f}  {:>16.2f}".format(
+				name,
+				measure("codec.dumps(one)", 2000, codec=codec, one=one),
+				measure("codec.loads(text)", 2000, codec=codec, text=text),
+				measure("Account.to_json_lines(documents, BytesIO(), codec)", 5, Account=Account,
+						documents=documents, BytesIO=BytesIO, codec=codec) / 1000,
+			))
+
+
+if __name__ == '__main__':
+	main()
@@ -9,6 +9,7 @@ from .query import Q, Ops, Filter, Update
 from .param import F, P, S, U
 from .util import Registry, utcnow
 
+codec = sys.modules['marrow.mongo.codec'] = Registry('marrow.mongo.codec')
 document = sys.modules['marrow.mongo.document'] = Registry('marrow.mongo.document')
 field = sys.modules['marrow.mongo.field'] = Registry('marrow.mongo.field')
 trait = sys.modules['marrow.mongo.trait'] = Registry('marrow.mongo.trait')
@@ -26,6 +27,7 @@ __all__ = [
 	'S',
 	'U',
 	'Update',
+	'codec',
 	'document',
 	'field',
 ]
@@ -0,0 +1,207 @@
+# encoding: utf-8
+
+"""JSON serialization plugins, registered in the `marrow.mongo.codec` namespace.
+
+Each codec produces, and consumes, MongoDB Extended JSON compatible with PyMongo's own `bson.json_util` module, so
+output from one may be read back using any other. The `bson` codec is the reference implementation; the others
+handle the common BSON types (ObjectId, datetime, Decimal128, and Binary) directly and defer to `bson.json_util` for
+anything more exotic.
+"""
+
+from __future__ import unicode_literals
+
+import json
+
+from abc import ABCMeta, abstractmethod
+from base64 import b64encode
+from calendar import timegm
+from collections import Mapping
+from datetime import datetime
+
+from bson import Binary, ObjectId
+from bson.json_util import default as _default, dumps as _dumps, loads as _loads, object_hook as _hook
+
+from ...package.loader import load
+from ...schema.compat import native, py3, str, unicode
+
+try:
+	from bson.decimal128 import Decimal128
+except ImportError:  # pragma: no cover
+	Decimal128 = None
+
+try:
+	import orjson
+except ImportError:  # pragma: no cover
+	orjson = None
+
+
+__all__ = ['Codec', 'ExtendedJSON', 'JSON', 'ORJSON', 'resolve']
+
+
+_cache = {}  # Resolved codec instances, keyed by the reference given.
+
+
+def resolve(codec):
+	"""Resolve a codec plugin name, codec class, or codec instance to a usable codec instance."""
+	
+	if not isinstance(codec, (str, unicode, type)):
+		return codec
+	
+	try:
+		return _cache[codec]
+	except KeyError:
+		pass
+	
+	instance = load(codec, 'marrow.mongo.codec') if isinstance(codec, (str, unicode)) else codec
+	
+	if isinstance(instance, type):
+		instance = instance()
+	
+	_cache[codec] = instance
+	
+	return instance
+
+
+def _millis(value):
+	"""Calculate the number of milliseconds since the UNIX epoch represented by the given datetime."""
+	
+	offset = value.utcoffset()
+	
+	if offset is not None:
+		value = value - offset
+	
+	return timegm(value.timetuple()) * 1000 + value.microsecond // 1000
+
+
+def _binary(value, subtype):
+	return {'$binary': b64encode(value).decode('ascii'), '$type': '{0:02x}'.format(subtype)}
+
+
+def _encode(value):
+	"""Encode values the JSON serializer does not natively understand, handling the common cases directly."""
+	
+	kind = value.__class__
+	
+	if kind is ObjectId:
+		return {'$oid': unicode(value)}
+	
+	if kind is datetime:
+		return {'$date': _millis(value)}
+	
+	if Decimal128 is not None and kind is Decimal128:
+		return {'$numberDecimal': unicode(value)}
+	
+	if kind is Binary:
+		return _binary(value, value.subtype)
+	
+	if py3 and kind is bytes:
+		return _binary(value, 0)
+	
+	if isinstance(value, Mapping):
+		data = getattr(value, '__data__', None)  # Documents are mappings, but not dictionaries.
+		return data if isinstance(data, dict) else dict(value)
+	
+	return _default(value)
+
+
+def _object(value):
+	"""Convert an Extended JSON type wrapper to its native type, skipping the full check for typical mappings."""
+	
+	for key in value:
+		if key[:1] == '$':
+			return _hook(value)
+	
+	return value
+
+
+def _decode(value):
+	"""Recursively apply Extended JSON type conversion to a parsed structure, from the innermost values outwards."""
+	
+	if isinstance(value, dict):
+		for key, item in value.items():
+			if isinstance(item, (dict, list)):
+				value[key] = _decode(item)
+		
+		return _object(value)
+	
+	if isinstance(value, list):
+		return [_decode(i) if isinstance(i, (dict, list)) else i for i in value]
+	
+	return value
+
+
+class Codec(ABCMeta(native('Abstract'), (object, ), {'__slots__': ()})):
+	"""The interface JSON codec plugins are expected to provide.
+	
+	Only `dumps` and `loads` are required, and a codec lacking either can not be instantiated, thus resolved; the
+	default `encode` produces UTF-8 encoded binary from `dumps`, used when writing to sockets or binary streams.
+	"""
+	
+	__slots__ = ()
+	
+	@abstractmethod
+	def dumps(self, value, *args, **kw):
+		"""Serialize the given value to a JSON string."""
+	
+	@abstractmethod
+	def loads(self, text):
+		"""Deserialize the given JSON string or binary to native (BSON-compatible) types."""
+	
+	def encode(self, value):
+		"""Serialize the given value to UTF-8 encoded JSON binary."""
+		
+		return self.dumps(value).encode('utf-8')
+
+
+class ExtendedJSON(Codec):
+	"""PyMongo's own pure-Python `bson.json_util` implementation. Additional arguments are passed through."""
+	
+	__slots__ = ()
+	
+	def dumps(self, value, *args, **kw):
+		return _dumps(value, *args, **kw)
+	
+	def loads(self, text):
+		return _loads(text)
+
+
+class JSON(Codec):
+	"""The standard library `json` module, utilizing its C accelerated encoder and decoder where available.
+	
+	Rather than pre-processing the entire structure prior to serialization, as `bson.json_util` does, only values the
+	encoder itself can not handle are converted. Additional arguments are passed through to `json.dumps`.
+	"""
+	
+	__slots__ = ()
+	
+	def dumps(self, value, *args, **kw):
+		kw.setdefault('default', _encode)
+		return json.dumps(value, *args, **kw)
+	
+	def loads(self, text):
+		if isinstance(text, bytes):
+			text = text.decode('utf-8')
+		
+		return json.loads(text, object_hook=_object)
+
+
+class ORJSON(Codec):
+	"""The `orjson` Rust-based serializer, if installed. Additional keyword arguments are passed through.
+	
+	Install the `orjson` extra to ensure availability: `pip install 'marrow.mongo[orjson]'`
+	"""
+	
+	__slots__ = ()
+	
+	def __init__(self):
+		if orjson is None:  # pragma: no cover
+			raise ImportError("The orjson package is required to use this codec.")
+	
+	def dumps(self, value, *args, **kw):
+		return self.encode(value, *args, **kw).decode('utf-8')
+	
+	def loads(self, text):
+		return _decode(orjson.loads(text))
+	
+	def encode(self, value, default=_encode, option=0):
+		return orjson.dumps(value, default=default, option=option | orjson.OPT_PASSTHROUGH_DATETIME)
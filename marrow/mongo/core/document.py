@@ -2,23 +2,60 @@
 
 from __future__ import unicode_literals
 
-from collections import MutableMapping
+from collections import Mapping, MutableMapping, namedtuple
+from inspect import isroutine
+from io import BufferedIOBase, RawIOBase
+from itertools import chain
 
 from bson import ObjectId
-from bson.json_util import dumps, loads
+from bson.raw_bson import RawBSONDocument
 
-from ...package.loader import load
+from ...package.loader import load, traverse
 from ...package.canonical import name as named
 from ...schema import Attributes, Container
 from ...schema.compat import str, unicode, odict
+from ...schema.exc import Concern
+from ..query import Update
+from ..query.apply import apply_update
+from ..query.evaluate import matcher
 from ..util import SENTINEL
+from ..util.raw import RawDocument
+from .codec import resolve
 from .field import Field
+from .field.base import FieldContext, _CastingKind
 from .field.alias import Alias
 from .index import Index
 
 __all__ = ['Document']
 
 
+ConstructionPlan = namedtuple('ConstructionPlan', 'attributes,positional,assigned,order,constants,fields,names,aliases')
+RestView = namedtuple('RestView', 'attributes,fields,projection,restricted')
+IMMUTABLE = (type(None), bool, int, float, str, unicode)  # Converted defaults of these types may be shared.
+
+
+class Deferred(object):
+	"""Hydrate a lazily loaded Document upon first access to its backing store.
+	
+	As a non-data descriptor, once the instance has its own `__data__` this is never consulted again.
+	"""
+	
+	def __get__(self, obj, cls=None):
+		if obj is None:
+			return self
+		
+		try:
+			doc = obj.__dict__.pop('__pending__')
+		except KeyError:
+			raise AttributeError("'{0}' object has no attribute '__data__'".format(obj.__class__.__name__))
+		
+		obj.__data__ = doc
+		obj._prepare_defaults()  # pylint:disable=protected-access -- deferred default value processing.
+		obj._clear_changes()  # pylint:disable=protected-access -- nothing has been changed by the application yet.
+		
+		return doc
+
+
 class Document(Container):
 	"""A MongoDB document definition.
 	
@@ -35,12 +72,48 @@ class Document(Container):
 	__foreign__ = {'object'}  # The representation for the database side of things, ref: $type
 	__type_store__ = None  # The pseudo-field to store embedded document class references as.
 	__pk__ = None  # The primary key of the document, to make searchable if embedded, or the name of the '_id' field.
+	__lazy__ = False  # Defer all processing of loaded data until first access; see `from_mongo`.
+	__memoize__ = False  # The default for fields not explicitly declaring if their native values are to be cached.
+	__codec__ = 'bson'  # The JSON codec, by plugin name, class, or instance, used by the JSON serialization methods.
+	__data__ = Deferred()  # Only consulted for lazily loaded instances, prior to their first access.
 	
 	__fields__ = Attributes(only=Field)  # An ordered mapping of field names to their respective Field instance.
 	__fields__.__sequence__ = 10000  # TODO: project=False
 	__indexes__ = Attributes(only=Index)  # An ordered mapping of index names to their respective Index instance.
 	__indexes__.__sequence__ = 10000
 	
+	@classmethod
+	def _get_plan(cls):
+		"""Retrieve the instantiation plan for this class, compiling it on first use.
+		
+		Walking the declared attributes on every instantiation dominates construction cost for wide documents, so the
+		names accepted positionally, the fields requiring assignment of a default, and the relative order of all
+		assignable attributes are determined once per class. Re-ordering of the attributes (e.g. through
+		`adjust_attribute_sequence`) replaces the `__attributes__` mapping, which invalidates the plan.
+		"""
+		
+		plan = cls.__dict__.get('__plan__')
+		
+		if plan is not None and plan.attributes is cls.__attributes__:
+			return plan
+		
+		fields = cls.__fields__
+		names = {field.__name__: field.__name__ for field in fields.values()}
+		names.update((name, field.__name__) for name, field in fields.items())  # Attribute names take precedence.
+		
+		plan = cls.__plan__ = ConstructionPlan(
+				cls.__attributes__,
+				tuple(name for name, field in fields.items() if not name.startswith('__') and field.positional),
+				tuple((name, field.__name__, field) for name, field in fields.items() if field.assign),
+				{name: i for i, name in enumerate(cls.__attributes__)},
+				{},  # Populated on use with (default, converted) pairs for static defaults.
+				tuple((name, field.__name__, field) for name, field in fields.items()),
+				names,  # Mapping of attribute and stored names to stored names.
+				frozenset(name for name, attr in cls.__attributes__.items() if isinstance(attr, Alias)),
+			)
+		
+		return plan
+	
 	def __init__(self, *args, **kw):
 		"""Construct a new MongoDB Document instance.
 		
@@ -51,35 +124,168 @@ class Document(Container):
 		
 		prepare_defaults = kw.pop('_prepare_defaults', True)
 		
-		fields = iter((k, v) for k, v in self.__fields__.items() if not k.startswith('__') and isinstance(v, Field) and v.positional)
+		plan = self._get_plan()
 		
 		# We translate positional to keyword arguments ourselves to facilitate per-field inclusion.
 		# Also to correct for accidental inclusion of Attributes instances, etc.
-		for arg in args:
-			for name, field in fields:
+		if args:
+			positional = plan.positional
+			
+			if len(args) > len(positional):
+				raise TypeError('{0} takes no more than {1} positional argument{2} ({3} given)'.format(
+						self.__class__.__name__,
+						len(positional),
+						'' if len(positional) == 1 else 's',
+						len(args)
+					))
+			
+			for name, arg in zip(positional, args):
 				if name in kw:
 					raise TypeError("Positional value overridden by keyword argument: " + name)
 				
 				kw[name] = arg
-				break
 		
-		super(Document, self).__init__(**kw)
+		self.__data__ = self.__store__()
+		
+		if kw:
+			order = plan.order
+			unknown = [name for name in kw if name not in order]
+			
+			if unknown:
+				raise TypeError('{0} got unexpected keyword argument{1}: {2}'.format(
+						self.__class__.__name__,
+						'' if len(unknown) == 1 else 's',
+						', '.join(unknown)
+					))
+			
+			for name in sorted(kw, key=order.__getitem__):  # Assign in declaration order.
+				setattr(self, name, kw[name])
 		
 		if prepare_defaults:
 			self._prepare_defaults()
 	
 	def _prepare_defaults(self):
-		"""Trigger assignment of default values."""
+		"""Trigger assignment of default values.
 		
-		for name, field in self.__fields__.items():
-			if field.assign:
-				getattr(self, name)  # An attempt to retrieve the value of an assignable field will assign it.
+		Static defaults whose stored form is an immutable scalar are converted once per class and written directly to
+		the backing store thereafter; default factories are always called and assigned through the field.
+		"""
+		
+		plan = self._get_plan()
+		data = self.__data__
+		constants = plan.constants
+		
+		for name, key, field in plan.assigned:
+			if key in data:
+				continue
+			
+			try:  # Field fixups (e.g. ObjectId) may provide a default late, so we always consult the field itself.
+				default = field.default
+			except AttributeError:
+				getattr(self, name)  # No default; allow the attribute to explain its absence.
+				continue
+			
+			if isroutine(default):
+				field.__set__(self, default())
+				continue
+			
+			cached = constants.get(key)
+			
+			if cached and cached[0] is default:
+				data[key] = cached[1]
+				self._track(key)
+				continue
+			
+			field.__set__(self, default)
+			value = data.get(key)
+			
+			if not field.exclusive and isinstance(value, IMMUTABLE):
+				constants[key] = (default, value)
+	
+	# Change Tracking
+	
+	def _track(self, path):
+		"""Record that the value at the given dot-separated path, relative to this document, has changed.
+		
+		Embedded documents report their changes upwards to the document containing them; changes within an embedded
+		document contained in an array mark the whole array as changed. Memoized native values are invalidated.
+		"""
+		
+		native = self.__dict__.get('__native__')
+		
+		if native:
+			native.pop(path.partition('.')[0], None)
+		
+		parent = self.__dict__.get('__parent__')
+		
+		if parent:
+			document, prefix, whole = parent
+			document = document()
+			
+			if document is not None:
+				document._track(prefix if whole else (prefix + '.' + path))  # pylint:disable=protected-access
+				return
+		
+		changed = self.__dict__.get('__changed__')
+		
+		if changed is None:
+			changed = self.__dict__['__changed__'] = set()
+		
+		changed.add(path)
+	
+	def _clear_changes(self):
+		"""Forget any changes recorded, e.g. after loading or persisting this document."""
+		
+		self.__dict__.pop('__changed__', None)
+	
+	@property
+	def changed(self):
+		"""The set of paths changed since this document was loaded or last persisted."""
+		
+		return set(self.__dict__.get('__changed__', ()))
+	
+	def changes(self):
+		"""Generate the minimal update operation persisting the changes made to this document.
+		
+		Paths nested within other changed paths are subsumed by them; values still present are `$set`, the rest
+		`$unset`. The primary key is never included.
+		"""
+		
+		operations = odict()
+		previous = None
+		
+		for path in sorted(self.__dict__.get('__changed__', ()), key=lambda path: path.split('.')):
+			if path == '_id' or (previous and path.startswith(previous + '.')):
+				continue
+			
+			previous = path
+			value = self.__data__
+			
+			try:
+				for part in path.split('.'):
+					value = value[part]
+			
+			except (KeyError, TypeError):
+				operations.setdefault('$unset', odict())[path] = ''
+				continue
+			
+			operations.setdefault('$set', odict())[path] = value
+		
+		return Update(operations, document=self.__class__)
 	
 	# Data Conversion and Casting
 	
 	@classmethod
-	def from_mongo(cls, doc):
-		"""Convert data coming in from the MongoDB wire driver into a Document instance."""
+	def from_mongo(cls, doc, lazy=None, kinds=None):
+		"""Convert data coming in from the MongoDB wire driver into a Document instance.
+		
+		If `lazy` is truthy (defaulting to the class-level `__lazy__` setting) the instance is allocated without
+		calling the constructor and default value processing is deferred until the data is first accessed or written,
+		making the wrapping of large result sets, of which only a few fields are ever read, nearly free.
+		
+		When converting many records, pass a dictionary as `kinds` to memoize the classes referenced by `__type_store__`
+		values; see `_load_type`.
+		"""
 		
 		if doc is None:  # To support simplified iterative use, None should return None.
 			return None
@@ -87,27 +293,242 @@ class Document(Container):
 		if isinstance(doc, Document):  # No need to perform processing on existing Document instances.
 			return doc
 		
+		if isinstance(doc, RawBSONDocument):  # Permit modification, decoding values only as they are accessed.
+			doc = RawDocument(doc)
+		
 		if cls.__type_store__ and cls.__type_store__ in doc:  # Instantiate specific class mentioned in the data.
-			cls = load(doc[cls.__type_store__], 'marrow.mongo.document')
+			cls = cls._load_type(doc[cls.__type_store__], kinds)
+		
+		if cls.__lazy__ if lazy is None else lazy:
+			instance = cls.__new__(cls)
+			instance.__pending__ = doc  # Picked up by the `__data__` descriptor on first access.
+			return instance
 		
 		# Prepare a new instance in such a way that changes to the instance will be reflected in the originating doc.
 		instance = cls(_prepare_defaults=False)  # Construct an instance, but delay default value processing.
 		instance.__data__ = doc  # I am Popeye of Borg (pattern); you will be askimilgrated.
 		instance._prepare_defaults()  # pylint:disable=protected-access -- deferred default value processing.
+		instance._clear_changes()  # pylint:disable=protected-access -- loaded data represents the stored state.
 		
 		return instance
 	
+	@staticmethod
+	def _load_type(reference, kinds=None):
+		"""Load the Document class referenced by a `__type_store__` value, consulting and populating an optional cache."""
+		
+		if kinds is None:
+			return load(reference, 'marrow.mongo.document')
+		
+		kind = kinds.get(reference)
+		
+		if kind is None:
+			kind = kinds[reference] = load(reference, 'marrow.mongo.document')
+		
+		return kind
+	
 	@classmethod
-	def from_json(cls, json):
-		"""Convert JSON data into a Document instance."""
+	def from_trusted(cls, mapping=None, **kw):
+		"""Construct an instance from known-good data, bypassing validation and transformation of the values given.
+		
+		Intended for bulk loading of already clean data. Values are written directly to the backing store in their
+		stored form, under the database-side name of the field they are given for, by attribute or stored name. Alias
+		attributes are assigned as usual, and keys not matching any field are stored as given. Default values are
+		processed as per normal construction. Use `validate_many` to verify such instances later, in one pass.
+		"""
+		
+		plan = cls._get_plan()
+		names = plan.names
+		deferred = []
+		
+		instance = cls.__new__(cls)
+		data = instance.__data__ = cls.__store__()
+		
+		for name, value in chain(mapping.items() if mapping else (), kw.items()):
+			if name in plan.aliases:
+				deferred.append((name, value))
+				continue
+			
+			name = names.get(name, name)
+			data[name] = value
+			instance._track(name)  # pylint:disable=protected-access
 		
-		deserialized = loads(json)
+		for name, value in deferred:
+			setattr(instance, name, value)
+		
+		instance._prepare_defaults()  # pylint:disable=protected-access
+		
+		return instance
+	
+	@classmethod
+	def validate_many(cls, documents):
+		"""Validate the stored values of a batch of documents, such as those constructed using `from_trusted`.
+		
+		Each value present is cast to its native form, passed through the validator of its field, and cast back, as
+		assignment would; field exclusivity is also verified. Returns a list of `(document, name, exception)` tuples,
+		one per failing field, in document then field order. An empty list indicates all documents are valid.
+		"""
+		
+		failures = []
+		
+		for document in documents:
+			data = document.__data__
+			
+			for name, key, field in document._get_plan().fields:  # pylint:disable=protected-access
+				if key not in data or data[key] is None:
+					continue
+				
+				try:
+					if field.exclusive:
+						for other in field.exclusive:
+							if traverse(document, other, None) is not None:
+								raise Concern("Can not assign to " + key + " if " + other + " has a value.")
+					
+					context = FieldContext(field, document)
+					value = field.validator.validate(getattr(document, name), context)
+					field.transformer.foreign(value, context)
+				
+				except (Concern, ValueError, TypeError) as e:
+					failures.append((document, name, e))
+		
+		return failures
+	
+	@classmethod
+	def from_json(cls, json, codec=None):
+		"""Convert JSON data into a Document instance, optionally using a specific codec.
+		
+		See the `__codec__` attribute for details on codec selection.
+		"""
+		
+		deserialized = resolve(codec or cls.__codec__).loads(json)
 		return cls.from_mongo(deserialized)
 	
 	def to_json(self, *args, **kw):
-		"""Convert our Document instance back into JSON data. Additional arguments are passed through."""
+		"""Convert our Document instance back into JSON data. Additional arguments are passed through.
+		
+		A `codec` keyword argument may be given to override the class-level `__codec__` for this call.
+		"""
+		
+		return resolve(kw.pop('codec', None) or self.__codec__).dumps(self, *args, **kw)
+	
+	@classmethod
+	def to_json_lines(cls, documents, target, codec=None):
+		"""Serialize an iterable of documents as newline-delimited JSON, writing each to the target as it is encoded.
+		
+		The target may be a file-like object (text or binary) or a socket. Returns the number of documents written.
+		"""
+		
+		codec = resolve(codec or cls.__codec__)
+		
+		if hasattr(target, 'sendall'):  # Sockets.
+			write, encode, newline = target.sendall, codec.encode, b'\n'
+		
+		elif isinstance(target, (RawIOBase, BufferedIOBase)) or 'b' in getattr(target, 'mode', ''):
+			write, encode, newline = target.write, codec.encode, b'\n'
+		
+		else:
+			write, encode, newline = target.write, codec.dumps, '\n'
+		
+		count = 0
+		
+		for count, document in enumerate(documents, 1):
+			write(encode(document) + newline)
+		
+		return count
+	
+	# REST Representation
+	
+	@classmethod
+	def _get_view(cls):
+		"""Retrieve the REST view of this class, compiling it on first use.
+		
+		Fields whose `read` predicate is a static value are resolved once, here; only those with callable predicates
+		(or overridden `is_readable` methods) are evaluated against the context of each request. Invalidated the same
+		way as the instantiation plan; see `_get_plan`.
+		"""
+		
+		view = cls.__dict__.get('__view__')
+		
+		if view is not None and view.attributes is cls.__attributes__:
+			return view
+		
+		fields = []  # Stored name, field, and if readability must be determined per request.
+		projection = {}  # The statically readable fields which are also included in the default projection.
+		restricted = False  # Are there any fields which may not be readable?
+		
+		for field in cls.__fields__.values():
+			dynamic = callable(field.read) or type(field).is_readable is not Field.is_readable
+			
+			if not dynamic and not field.read:
+				restricted = True
+				continue
+			
+			restricted = restricted or dynamic
+			fields.append((field.__name__, field, dynamic))
+			
+			if not dynamic and field.project is not False:
+				projection[field.__name__] = True
+		
+		view = cls.__view__ = RestView(cls.__attributes__, tuple(fields), projection, restricted)
+		
+		return view
+	
+	@classmethod
+	def rest_projection(cls, context=None):
+		"""Construct a projection selecting only the fields readable within the given context.
+		
+		Pass this as the `projection` when querying to avoid retrieving data from the server only to discard it. If no
+		field is readable the projection selects nothing at all, not even the identifier.
+		"""
+		
+		view = cls._get_view()
+		projection = view.projection.copy()
+		
+		for name, field, dynamic in view.fields:
+			if dynamic and field.project is not False and field.is_readable(context):
+				projection[name] = True
+		
+		if not projection:  # An empty, or exclusive, projection would select everything; select a field never stored.
+			projection['__nothing__'] = True
+		
+		if '_id' not in projection:  # The identifier is otherwise always included.
+			projection['_id'] = False
+		
+		return projection
+	
+	def to_rest(self, context=None):
+		"""Produce a plain dictionary of the fields readable within the given context.
+		
+		Data not associated with any declared field is omitted, and embedded documents are processed recursively.
+		"""
+		
+		data = self.__data__
+		result = {}
+		
+		for name, field, dynamic in self._get_view().fields:
+			if name not in data or (dynamic and not field.is_readable(context)):
+				continue
+			
+			result[name] = self._rest_value(field, data[name], context)
+		
+		return result
+	
+	def _rest_value(self, field, value, context):
+		"""Process a stored value for `to_rest`, casting embedded documents still in their stored form first.
+		
+		Values loaded through `from_mongo` are only cast on access, so must be cast here for their own fields to be
+		filtered; the subclass-specific shaping of the native value, such as by `Mapping` or `Set`, is not applied.
+		"""
+		
+		if isinstance(value, list):
+			return [self._rest_value(field, i, context) for i in value]
+		
+		if isinstance(field, _CastingKind) and isinstance(value, Mapping) and not isinstance(value, Document):
+			value = _CastingKind.to_native(field, self, field.__name__, value)
+		
+		if isinstance(value, Document):
+			return value.to_rest(context)
 		
-		return dumps(self, *args, **kw)
+		return value
 	
 	@property
 	def as_rest(self):
@@ -117,9 +538,46 @@ class Document(Container):
 		assistance of PyMongo's `bson.json_util` extended encoding. For details on the latter bit, see:
 		
 		https://docs.mongodb.com/manual/reference/mongodb-extended-json/
+		
+		If any declared field may not be readable this is the result of `to_rest`, passed the context returned by
+		`rest_context`.
+		"""
+		
+		if not self._get_view().restricted:
+			return self  # We're sufficiently dictionary-like to pass muster.
+		
+		return self.to_rest(self.rest_context())
+	
+	def rest_context(self):
+		"""Return the context `as_rest` evaluates readability within; override to supply one, e.g. the current user.
+		
+		By default there is no context, and only fields readable without one are included.
+		"""
+		
+		return None
+	
+	# Local Evaluation
+	
+	def matches(self, query):
+		"""Determine if this document would be selected by the given Filter or filter document, without a query.
+		
+		The filter may also be one previously compiled using `marrow.mongo.query.matcher`, which should be preferred
+		when testing many documents against the same filter. Only changes made to `__data__` are considered.
 		"""
 		
-		return self  # We're sufficiently dictionary-like to pass muster.
+		if not callable(query):
+			query = matcher(query)
+		
+		return query(self)
+	
+	def apply(self, update, insert=False):
+		"""Apply the given Update, or update document, to this document locally, as the server would.
+		
+		The backing store is modified directly; as the result is expected to reflect what has been, or will be,
+		persisted, these modifications are not recorded as changes. Refer to `marrow.mongo.query.apply` for details.
+		"""
+		
+		return apply_update(update, self, insert)
 	
 	# Python Magic Methods
 	
@@ -185,11 +643,13 @@ class Document(Container):
 		"""Assign data directly to the backing store."""
 		
 		self.__data__[name] = value
+		self._track(name)
 	
 	def __delitem__(self, name):
 		"""Unset a value from the backing store."""
 		
 		del self.__data__[name]
+		self._track(name)
 	
 	def __iter__(self):
 		"""Iterate the names of the values assigned to our backing store."""
@@ -241,29 +701,48 @@ class Document(Container):
 	def clear(self):
 		"""Empty the backing store of data."""
 		
+		for name in list(self.__data__):
+			self._track(name)
+		
 		self.__data__.clear()
 	
 	def pop(self, name, default=SENTINEL):
 		"""Retrieve and remove a value from the backing store, optionally with a default."""
 		
 		if default is SENTINEL:
-			return self.__data__.pop(name)
+			value = self.__data__.pop(name)
 		
-		return self.__data__.pop(name, default)
+		elif name not in self.__data__:
+			return default
+		
+		else:
+			value = self.__data__.pop(name)
+		
+		self._track(name)
+		return value
 	
 	def popitem(self):
 		"""Pop an item 2-tuple off the backing store."""
 		
-		return self.__data__.popitem()
+		item = self.__data__.popitem()
+		self._track(item[0])
+		return item
 	
 	def update(self, *args, **kw):
 		"""Update the backing store directly."""
 		
-		self.__data__.update(*args, **kw)
+		values = odict(*args, **kw)
+		self.__data__.update(values)
+		
+		for name in values:
+			self._track(name)
 	
 	def setdefault(self, key, value=None):
 		"""Set a value in the backing store if no value is currently present."""
 		
+		if key not in self.__data__:
+			self._track(key)
+		
 		return self.__data__.setdefault(key, value)
 
 
@@ -3,21 +3,69 @@
 from __future__ import unicode_literals
 
 from collections import Iterable, Mapping
+from functools import wraps
+from weakref import ref
 
 from ... import Field
+from ....schema.compat import py3
 from .base import _HasKind, _CastingKind
 
 
+def _tracked(method):
+	"""Wrap a list method to report in-place modification to the document owning the list."""
+	
+	@wraps(method)
+	def inner(self, *args, **kw):
+		result = method(self, *args, **kw)
+		self._changed()  # pylint:disable=protected-access
+		return result
+	
+	return inner
+
+
 class Array(_HasKind, _CastingKind, Field):
 	__foreign__ = 'array'
 	__allowed_operators__ = {'#array', '$elemMatch', '#rel', '$eq'}
 	
 	class List(list):
-		"""Placeholder list shadow class to identify already-cast arrays."""
+		"""Placeholder list shadow class to identify already-cast arrays.
+		
+		In-place modification marks the whole array as changed within the document it was retrieved from.
+		"""
+		
+		__parent__ = None  # A (weak document reference, field name) tuple, once retrieved through a field.
 		
 		@classmethod
 		def new(cls):
 			return cls()
+		
+		def _changed(self):
+			if not self.__parent__:
+				return
+			
+			document, name = self.__parent__
+			document = document()
+			
+			if document is not None:
+				document._track(name)  # pylint:disable=protected-access
+		
+		append = _tracked(list.append)
+		extend = _tracked(list.extend)
+		insert = _tracked(list.insert)
+		pop = _tracked(list.pop)
+		remove = _tracked(list.remove)
+		reverse = _tracked(list.reverse)
+		sort = _tracked(list.sort)
+		__setitem__ = _tracked(list.__setitem__)
+		__delitem__ = _tracked(list.__delitem__)
+		__iadd__ = _tracked(list.__iadd__)
+		__imul__ = _tracked(list.__imul__)
+		
+		if py3:
+			clear = _tracked(list.clear)
+		else:  # pragma: no cover
+			__setslice__ = _tracked(list.__setslice__)
+			__delslice__ = _tracked(list.__delslice__)
 	
 	def __init__(self, *args, **kw):
 		if kw.get('assign', False):
@@ -25,16 +73,30 @@ class Array(_HasKind, _CastingKind, Field):
 		
 		super(Array, self).__init__(*args, **kw)
 	
+	def _own(self, obj, value):
+		"""Associate a cast array with the document containing it, allowing in-place changes to be reported."""
+		
+		if isinstance(value, Array.List):  # Subclasses may utilize a plain list, which can not be tracked.
+			value.__parent__ = (ref(obj), self.__name__)
+		
+		return value
+	
+	def _link(self, obj, value):
+		"""Embedded documents within arrays mark the whole array as changed when modified."""
+		
+		value.__parent__ = (ref(obj), self.__name__, True)
+		return value
+	
 	def to_native(self, obj, name, value):
 		"""Transform the MongoDB value into a Marrow Mongo value."""
 		
 		if isinstance(value, self.List):
-			return value
+			return self._own(obj, value)
 		
 		result = self.List(super(Array, self).to_native(obj, name, i) for i in value)
 		obj.__data__[self.__name__] = result
 		
-		return result
+		return self._own(obj, result)
 	
 	def to_foreign(self, obj, name, value):
 		"""Transform to a MongoDB-safe value."""
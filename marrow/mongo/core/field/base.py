@@ -4,7 +4,7 @@ from __future__ import unicode_literals
 
 from collections import namedtuple
 from inspect import isclass
-from weakref import proxy
+from weakref import proxy, ref
 
 from ....package.loader import traverse, load
 from ....schema import Attribute
@@ -16,6 +16,7 @@ from ...util import adjust_attribute_sequence, SENTINEL
 
 
 FieldContext = namedtuple('FieldContext', 'field,document')
+UNTRACKED = (list, dict, set)  # Stored values whose in-place modification goes unnoticed, unless they report it.
 
 
 class FieldTransform(BaseTransform):
@@ -36,7 +37,7 @@ class FieldTransform(BaseTransform):
 		return value
 
 
-@adjust_attribute_sequence(1000, 'transformer', 'validator', 'positional', 'assign', 'repr', 'project', 'read', 'write', 'sort')
+@adjust_attribute_sequence(1000, 'transformer', 'validator', 'positional', 'assign', 'repr', 'project', 'read', 'write', 'sort', 'memoize')
 class Field(Attribute):
 	# Possible values for operators include any literal $-prefixed operator, or one of:
 	#  * #rel -- allow/prevent all relative comparison such as $gt, $gte, $lt, etc.
@@ -73,6 +74,10 @@ class Field(Attribute):
 	write = Attribute(default=True)  # Write predicate, either a boolean, callable, or web.security ACL predicate.
 	sort = Attribute(default=True)  # Sort predicate, either a boolean, callable, or web.security ACL predicate.
 	
+	# Performance
+	
+	memoize = Attribute(default=None)  # Cache native conversions per instance; None defers to Document `__memoize__`.
+	
 	def adapt(self, **kw):
 		instance = self.__class__()
 		instance.__data__ = self.__data__.copy()
@@ -151,19 +156,57 @@ class Field(Attribute):
 	
 	# Descriptor Protocol
 	
+	def _proxy(self, cls):
+		"""Retrieve the Queryable interface to this field for the given Document subclass, constructing it once.
+		
+		Proxies are cached per class, as the same field may be inherited by many, keyed on the identity of the field, as
+		several may share a stored name. Identity is verified, so a redefined field is always a miss.
+		"""
+		
+		proxies = cls.__dict__.get('__proxies__')
+		
+		if proxies is None:
+			proxies = cls.__proxies__ = {}
+		
+		instance = proxies.get(id(self))
+		
+		if instance is None or instance._field is not self:  # pylint:disable=protected-access
+			instance = proxies[id(self)] = Q(cls, self)
+		
+		return instance
+	
 	def __get__(self, obj, cls=None):
 		"""Executed when retrieving a Field instance attribute."""
 		
 		# If this is class attribute (and not instance attribute) access, we return a Queryable interface.
 		if obj is None:
-			return Q(cls, self)
+			return self._proxy(cls)
 		
 		result = super(Field, self).__get__(obj, cls)
 		
 		if result is None:  # Discussion: pass through to the transformer?
 			return None
 		
-		return self.transformer.native(result, FieldContext(self, obj))
+		memoize = self.__data__.get('memoize')  # Avoid the comparatively costly default value lookup.
+		
+		if memoize is None:
+			memoize = getattr(obj, '__memoize__', False)
+		
+		if not memoize or (isinstance(result, UNTRACKED) and not hasattr(result, '_changed')):
+			return self.transformer.native(result, FieldContext(self, obj))
+		
+		# The cache is keyed on the identity of the stored value; any replacement of it is a miss. In-place changes to
+		# stored values are reported through `Document._track`, which invalidates it.
+		cache = obj.__dict__.setdefault('__native__', {})
+		cached = cache.get(self.__name__)
+		
+		if cached and cached[0] is result:
+			return cached[1]
+		
+		value = self.transformer.native(result, FieldContext(self, obj))
+		cache[self.__name__] = (obj.__data__.get(self.__name__, result), value)
+		
+		return value
 	
 	def __set__(self, obj, value):
 		"""Executed when assigning a value to a Field instance attribute."""
@@ -183,12 +226,22 @@ class Field(Attribute):
 			value = self.transformer.foreign(value, FieldContext(self, obj))
 		
 		super(Field, self).__set__(obj, value)
+		
+		track = getattr(obj, '_track', None)
+		
+		if track:
+			track(self.__name__)
 	
 	def __delete__(self, obj):
 		"""Executed via the `del` statement with a Field instance attribute as the argument."""
 		
 		# Delete the data completely from the warehouse.
 		del obj.__data__[self.__name__]
+		
+		track = getattr(obj, '_track', None)
+		
+		if track:
+			track(self.__name__)
 	
 	# Other Python Protocols
 	
@@ -243,6 +296,12 @@ class _HasKind(Field):
 
 
 class _CastingKind(Field):
+	def _link(self, obj, value):
+		"""Associate an embedded document with the document containing it, allowing changes to be reported upwards."""
+		
+		value.__parent__ = (ref(obj), self.__name__, False)
+		return value
+	
 	def to_native(self, obj, name, value):  # pylint:disable=unused-argument
 		"""Transform the MongoDB value into a Marrow Mongo value."""
 		
@@ -255,12 +314,13 @@ class _CastingKind(Field):
 			if __debug__ and kind and issubclass(kind, Document) and not isinstance(value, kind):
 				raise ValueError("Not an instance of " + kind.__name__ + " or a sub-class: " + repr(value))
 			
-			return value
+			return self._link(obj, value)
 		
 		if isinstance(kind, Field):
-			return kind.transformer.native(value, (kind, obj))
+			value = kind.transformer.native(value, (kind, obj))
+			return self._link(obj, value) if isinstance(value, Document) else value
 		
-		return (kind or Derived).from_mongo(value)
+		return self._link(obj, (kind or Derived).from_mongo(value))
 	
 	def to_foreign(self, obj, name, value):  # pylint:disable=unused-argument
 		"""Transform to a MongoDB-safe value."""
@@ -273,13 +333,17 @@ class _CastingKind(Field):
 			if __debug__ and kind and issubclass(kind, Document) and not isinstance(value, kind):
 				raise ValueError("Not an instance of " + kind.__name__ + " or a sub-class: " + repr(value))
 			
-			return value
+			return value if isclass(obj) else self._link(obj, value)
 		
 		if isinstance(kind, Field):
 			kind.validator.validate(value, FieldContext(kind, obj))
-			return kind.transformer.foreign(value, FieldContext(kind, obj))
+			value = kind.transformer.foreign(value, FieldContext(kind, obj))
+			return self._link(obj, value) if isinstance(value, Document) and not isclass(obj) else value
 		
 		if kind:
 			value = kind(**value)
+			
+			if not isclass(obj):
+				self._link(obj, value)
 		
 		return value
@@ -4,6 +4,7 @@ from __future__ import unicode_literals
 
 from bson.binary import STANDARD
 from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 from bson.tz_util import utc
 from pymongo.collection import Collection as PyMongoCollection
 from pymongo.database import Database
@@ -13,6 +14,12 @@ from pymongo.write_concern import WriteConcern
 
 from ... import U, Update
 from ...trait import Identified
+from ...query.apply import applicable
+from ...util.bulk import Bulk
+from ...util.cache import cached
+from ...util.raw import RawDocument
+from ...util.stats import perf_counter, profiler
+from ...util.unit import current
 
 
 __all__ = ['Collection']
@@ -47,6 +54,8 @@ class Collection(Identified):
 	__read_preference__ = ReadPreference.PRIMARY  # Default read preference to assign when binding.
 	__read_concern__ = ReadConcern()  # Default read concern.
 	__write_concern__ = WriteConcern(w=1)  # Default write concern.
+	__raw__ = False  # Retrieve records as raw BSON, decoding values only as they are accessed.
+	__profile__ = True  # Record per-query-shape statistics; see marrow.mongo.util.stats.
 	
 	# Storage Options
 	__capped__ = False  # The size of the capped collection to create in bytes.
@@ -167,7 +176,7 @@ class Collection(Identified):
 	def _collection_configuration(cls, creation=False):
 		config = {
 				'codec_options': CodecOptions(
-						document_class = cls.__store__,
+						document_class = RawBSONDocument if cls.__raw__ else cls.__store__,
 						tz_aware = True,
 						uuid_representation = STANDARD,
 						tzinfo = utc,
@@ -225,6 +234,33 @@ class Collection(Identified):
 		
 		return {field: True for field in projected}
 	
+	@classmethod
+	def _record(cls, operation, query, started, documents=0, size=0):
+		"""Record the execution of an operation begun at the given `perf_counter` time. For internal use only."""
+		
+		if cls.__profile__:
+			profiler.record(cls, operation, query, perf_counter() - started, documents, size)
+	
+	@classmethod
+	def bulk(cls, ordered=False, batch=1000, size=None, validate=True, source=None):
+		"""Prepare to write many documents in batches, returning a Bulk writer; use as a context manager.
+		
+		Requests are flushed automatically every `batch` requests, or `size` bytes of documents, if given. See
+		marrow.mongo.util.bulk for details.
+		
+		https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.bulk_write
+		"""
+		
+		return Bulk(cls, cls.get_collection(source), ordered, batch, size, validate)
+	
+	def _invalidate(self, collection):
+		"""Discard any cached copy of this record after it has been written. For internal use only."""
+		
+		cache = cached(collection)
+		
+		if cache is not None:
+			cache.invalidate(self.get('_id'))
+	
 	def insert_one(self, validate=True):
 		"""Insert this document.
 		
@@ -237,14 +273,23 @@ class Collection(Identified):
 		kw['bypass_document_validation'] = not validate
 		
 		collection = self.get_collection(kw.pop('source', None))
-		return collection.insert_one(self, **kw)
+		result = collection.insert_one(self, **kw)
+		self._clear_changes()
+		self._invalidate(collection)
+		
+		return result
 	
-	def update_one(self, update=None, validate=True, **kw):
-		"""Update this document in the database. Local representations will not be affected.
+	def update_one(self, update=None, validate=True, local=False, **kw):
+		"""Update this document in the database.
 		
 		A single positional parameter, `update`, may be provided as a mapping. Keyword arguments (other than those
 		identified in UPDATE_MAPPING) are interpreted as parametric updates, added to any `update` passed in.
 		
+		Local representations will not be affected unless `local` is truthy, in which case the update is also applied
+		to this instance if the record was found, as per `Document.apply`, avoiding the need to `reload()`. Updates
+		which can not be applied locally, such as those utilizing positional operators, are instead followed by the
+		retrieval of the updated record.
+		
 		https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.update_one
 		"""
 		
@@ -259,7 +304,47 @@ class Collection(Identified):
 		if not update:
 			raise TypeError("Must provide an update operation.")
 		
-		return collection.update_one(D.id == self, update, bypass_document_validation=not validate)
+		query = D.id == self
+		started = perf_counter()
+		result = collection.update_one(query, update, bypass_document_validation=not validate)
+		D._record('update_one', query, started, result.modified_count if result.acknowledged else 0)
+		self._invalidate(collection)
+		
+		if local and (not result.acknowledged or result.matched_count):
+			if applicable(update):
+				self.apply(update)
+			
+			else:
+				record = collection.find_one(query)
+				
+				if record is not None:
+					self.__data__ = RawDocument(record) if isinstance(record, RawBSONDocument) else record
+					self._clear_changes()
+		
+		return result
+	
+	def save(self, upsert=True, validate=True, source=None):
+		"""Persist only the changes made to this document since it was loaded or last persisted.
+		
+		Changed fields are `$set` and removed fields `$unset`, as determined by `changes()`; the primary key is used to
+		locate the record, which will be created if missing when `upsert` is truthy. Returns `None` if there was
+		nothing to save.
+		
+		https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.update_one
+		"""
+		
+		update = self.changes()
+		
+		if not update:
+			return None
+		
+		collection = self.get_collection(source)
+		result = collection.update_one(self.__class__.id == self, update, upsert=upsert,
+				bypass_document_validation=not validate)
+		self._clear_changes()
+		self._invalidate(collection)
+		
+		return result
 	
 	def delete_one(self, source=None, **kw):
 		"""Remove this document from the database, passing additional arguments through to PyMongo.
@@ -267,5 +352,17 @@ class Collection(Identified):
 		https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.delete_one
 		"""
 		
+		D = self.__class__
 		collection = self.get_collection(source)
-		return collection.delete_one(self.__class__.id == self, **kw)
+		query = D.id == self
+		started = perf_counter()
+		result = collection.delete_one(query, **kw)
+		D._record('delete_one', query, started, result.deleted_count if result.acknowledged else 0)
+		self._invalidate(collection)
+		
+		unit = current()
+		
+		if unit is not None:
+			unit.discard(self, collection)
+		
+		return result
@@ -3,20 +3,76 @@
 from __future__ import unicode_literals
 
 from collections import Mapping
+from copy import deepcopy
 from functools import reduce
 from operator import and_
 
+from bson.raw_bson import RawBSONDocument
 from pymongo.cursor import CursorType
 
-from ... import F, Filter, P, S
+from ... import F, Filter, P, S, Update
+from ...query import keyset
+from ...query.optimize import _regex, optimize
 from ...trait import Collection
+from ...util import SENTINEL
+from ...util.cache import cache_for, cached, identify
+from ...util.cursor import DocumentCursor
+from ...util.insert import insert_many
+from ...util.raw import RawDocument
+from ...util.scan import scan
+from ...util.unit import current
+from ...util.stats import perf_counter
 from ....schema.compat import odict
 from ....package.loader import traverse
 
 
+def _merged(local, remote, path):
+	"""Update a local value with the value at a dot-separated path within its retrieved (projected) counterpart.
+	
+	Returns the new value, or SENTINEL if the value is absent. Arrays of embedded documents are merged element-wise
+	where they correspond in length, otherwise, as their elements can not be correlated, replaced.
+	"""
+	
+	if not path or remote is SENTINEL or not isinstance(remote, (Mapping, list)):
+		return remote
+	
+	if isinstance(remote, list):
+		if isinstance(local, list) and len(local) == len(remote) and \
+				all(isinstance(i, Mapping) for i in local + remote):
+			return [_merged(i, j, path) for i, j in zip(local, remote)]
+		
+		return remote
+	
+	name, _, path = path.partition('.')
+	merged = odict(local) if isinstance(local, Mapping) else odict()
+	value = _merged(merged.get(name, SENTINEL), remote.get(name, SENTINEL), path)
+	
+	if value is SENTINEL:
+		merged.pop(name, None)
+	else:
+		merged[name] = value
+	
+	return merged
+
+
+class _hybrid(object):
+	"""A method bound to the instance it is accessed through, or to the class when accessed through the class."""
+	
+	__slots__ = ('method', )
+	
+	def __init__(self, method):
+		self.method = method
+	
+	def __get__(self, obj, cls=None):
+		return self.method.__get__(cls if obj is None else obj, cls)
+
+
 class Queryable(Collection):
 	"""EXPERIMENTAL: Extend active collection behaviours to include querying."""
 	
+	__optimize__ = True  # Simplify filter documents prior to use; see marrow.mongo.query.optimize.
+	__cache__ = None  # Cache primary key lookups, e.g. `{'size': 1000, 'ttl': 30}`; see marrow.mongo.util.cache.
+	
 	UNIVERSAL_OPTIONS = {
 			'collation',
 			'limit',
@@ -64,6 +120,41 @@ class Queryable(Collection):
 			'use_cursor': 'useCursor',
 		}
 	
+	MODIFY_OPTIONS = UNIVERSAL_OPTIONS - {'limit', 'skip'} | {
+			'array_filters',
+			'maxTimeMS',
+			'return_document',
+			'upsert',
+		}
+	
+	MODIFY_MAPPING = {
+			'arrayFilters': 'array_filters',
+			'maxTimeMs': 'maxTimeMS',  # Common typo.
+			'max_time_ms': 'maxTimeMS',
+			'returnDocument': 'return_document',
+		}
+	
+	@classmethod
+	def get_cache(cls, target=None):
+		"""Retrieve the cache of records retrieved by primary key, if one has been declared using `__cache__`.
+		
+		The cache is shared by all Document classes bound to the same collection.
+		"""
+		
+		if not cls.__cache__:
+			return None
+		
+		return cache_for(cls.get_collection(target), cls.__cache__)
+	
+	@staticmethod
+	def _measure(result):
+		"""Determine the number of documents, and bytes where known, of a single retrieved record."""
+		
+		if result is None:
+			return 0, 0
+		
+		return 1, len(result.raw) if isinstance(result, RawBSONDocument) else 0
+	
 	@classmethod
 	def _prepare_query(cls, mapping, valid, *args, **kw):
 		"""Process arguments to query methods. For internal use only.
@@ -107,6 +198,9 @@ class Queryable(Collection):
 		if kw:  # Remainder are parametric query fragments.
 			query &= F(cls, **kw)
 		
+		if cls.__optimize__:
+			query = optimize(query)
+		
 		return cls, collection, query, options
 	
 	@classmethod
@@ -199,11 +293,16 @@ class Queryable(Collection):
 		parameters are interpreted as query fragments, parametric keyword arguments combined, and other keyword
 		arguments passed along with minor transformation.
 		
+		Returns a DocumentCursor yielding instances of this class; pass `prefetch=True`, or a number of records to
+		buffer, to retrieve results on a background thread. See marrow.mongo.util.cursor for details.
+		
 		https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.find
 		"""
 		
+		prefetch = kw.pop('prefetch', False)
 		Doc, collection, query, options = cls._prepare_find(*args, **kw)
-		return collection.find(query, **options)
+		
+		return DocumentCursor(Doc, collection, query, options, prefetch)
 	
 	@classmethod
 	def find_one(cls, *args, **kw):
@@ -215,6 +314,10 @@ class Queryable(Collection):
 		
 		Automatically calls `to_mongo` with the retrieved data.
 		
+		Lookups by primary key alone, without other options, are answered by the instance registered with the current
+		unit of work, if any; see marrow.mongo.util.unit. If this class declares a `__cache__`, they are otherwise
+		served from a shared cache of recently retrieved records; see marrow.mongo.util.cache.
+		
 		https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.find_one
 		"""
 		
@@ -222,13 +325,207 @@ class Queryable(Collection):
 			args = (getattr(cls, cls.__pk__) == args[0], )
 		
 		Doc, collection, query, options = cls._prepare_find(*args, **kw)
-		result = Doc.from_mongo(collection.find_one(query, **options))
+		unit = current()
+		identifier = identify(query)  # Lookups by primary key alone may be answered from memory.
+		cache = None
+		
+		if Doc.__cache__ and identifier is not None and not options:
+			cache = cache_for(collection, Doc.__cache__)
+		
+		if unit is not None and not options:  # As with the cache, e.g. a projection asks for the server's state.
+			existing = unit.lookup(collection, query)
+			
+			if isinstance(existing, Doc):
+				return existing
+		
+		result = cache.get(identifier) if cache is not None else None
+		
+		if result is None:
+			generation = cache.generation if cache is not None else None  # Writes racing the retrieval prevent caching.
+			started = perf_counter()
+			result = collection.find_one(query, **options)
+			Doc._record('find_one', query, started, *Doc._measure(result))
+			
+			if cache is not None and result is not None:
+				cache.set(identifier, result, generation)
+		
+		result = Doc.from_mongo(result)
+		
+		if unit is not None and result is not None and 'projection' not in options:
+			result = unit.add(result, collection)
 		
 		return result
 	
-	# https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.find_one_and_delete
-	# https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.find_one_and_replace
-	# https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.find_one_and_update
+	@classmethod
+	def paginate(cls, *args, **kw):
+		"""Retrieve a page of results, continuing from a prior page using keyset ("seek") pagination.
+		
+		Accepts the arguments of `find`, with the addition of `after`, the continuation token returned alongside the
+		previous page, and `limit`, the page size, defaulting to 20. The `sort` (defaulting to the primary key) is made
+		unique by appending the primary key if absent, and must be supported by an index declared in `__indexes__`,
+		otherwise `ValueError` is raised. Skipping is not permitted.
+		
+		Returns a list of Document instances and the token for the following page, or None if this is the last.
+		
+		See marrow.mongo.query.keyset for details.
+		"""
+		
+		if 'skip' in kw:
+			raise TypeError("Keyset pagination can not be combined with skipping.")
+		
+		sort = S(cls, *kw.pop('sort', (cls.__pk__, )))
+		after = kw.pop('after', None)
+		limit = kw.pop('limit', 20)
+		
+		Doc, collection, query, options = cls._prepare_find(*args, **kw)
+		
+		operations = query.as_query if hasattr(query, 'as_query') else query
+		equal = {  # A literal regular expression is a pattern match, not a comparison for equality.
+				k for k, v in operations.items()
+				if (set(v) == {'$eq'} if isinstance(v, Mapping) else not _regex(v))
+			}
+		indexes = list(Doc.__indexes__.values())
+		sort = keyset.order(sort, indexes=indexes, equal=equal)
+		
+		if not keyset.supported(indexes, sort, equal):
+			raise ValueError("No index declared by " + Doc.__name__ + " supports sorting by: " + repr(sort))
+		
+		if after is not None:
+			query &= keyset.seek(sort, keyset.decode(after, sort))
+		
+		options = dict(options)  # The caller's options, and projection, must not be altered.
+		projection = options.get('projection')
+		
+		if projection:  # The sort keys must be retrieved in order to produce the continuation token.
+			projection = options['projection'] = odict(projection)
+			inclusive = any(projection.values())
+			
+			for field, direction in sort:
+				if inclusive:
+					projection[field] = True
+				else:
+					projection.pop(field, None)
+		
+		options['sort'] = sort
+		options['limit'] = limit + 1
+		
+		results = list(DocumentCursor(Doc, collection, query, options))
+		
+		if len(results) <= limit:
+			return results, None
+		
+		del results[limit:]
+		
+		return results, keyset.encode(sort, keyset.values(results[-1], sort))
+	
+	@classmethod
+	def scan(cls, *args, **kw):
+		"""Iterate all matching records concurrently, split into partitions by ranges of `_id`.
+		
+		Accepts the arguments of `find`, other than `skip` and `limit`, with the addition of: `partitions`, the number
+		of ranges to divide the results into, defaulting to four per worker; `workers`, the number of threads to query
+		them with, defaulting to the number of processors; `map`, a callable applied to each Document within the
+		worker; and `reduce`, `initial`, and `combine` to fold the results of each partition, after any `map`, instead
+		of yielding them.
+		
+		See marrow.mongo.util.scan for details.
+		"""
+		
+		if 'skip' in kw or 'limit' in kw:
+			raise TypeError("Partitioned scans can not be combined with skipping or limiting.")
+		
+		arguments = {k: kw.pop(k) for k in ('partitions', 'workers', 'map', 'reduce', 'initial', 'combine') if k in kw}
+		Doc, collection, query, options = cls._prepare_find(*args, **kw)
+		
+		return scan(Doc, collection, query, options, **arguments)
+	
+	@_hybrid
+	def _find_one_and(self, operation, args, kw, *payload):
+		"""Issue a findAndModify command, returning the affected record as a Document. For internal use only.
+		
+		When called on an instance, the query is additionally restricted to that instance's record.
+		"""
+		
+		D = self if isinstance(self, type) else self.__class__
+		
+		if self is not D:
+			args = (D.id == self, ) + args
+		
+		Doc, collection, query, options = D._prepare_query(D.MODIFY_MAPPING, D.MODIFY_OPTIONS, *args, **kw)
+		
+		if operation == 'delete' and {'upsert', 'return_document'} & set(options):
+			raise TypeError("Deletion does not support the upsert or return_document options.")
+		
+		started = perf_counter()
+		result = getattr(collection, 'find_one_and_' + operation)(query, *payload, **options)
+		Doc._record('find_one_and_' + operation, query, started, *Doc._measure(result))
+		
+		identifier = result.get('_id') if result is not None else identify(query)
+		cache = cached(collection)
+		
+		if cache is not None and identifier is not None:
+			cache.invalidate(identifier)
+		
+		unit = current()
+		
+		if operation == 'delete' and unit is not None and identifier is not None:
+			registered = unit.get(collection, identifier)
+			
+			if registered is not None:
+				unit.discard(registered, collection)
+		
+		return Doc.from_mongo(result)
+	
+	@_hybrid
+	def find_one_and_update(self, update, *args, **kw):
+		"""Atomically update a single matching record, returning it as a Document, in a single round trip.
+		
+		The `update` may be an Update, such as constructed by U, or mapping. Remaining arguments are processed as per
+		`find_one`, with the options: `projection`, `sort`, `upsert`, `return_document`, `array_filters`, `collation`,
+		and `max_time_ms`. The record is returned as it was before modification unless `return_document` is
+		`ReturnDocument.AFTER` (or `True`); None is returned if no record matched.
+		
+		When called on an instance, only that instance's record is considered.
+		
+		https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.find_one_and_update
+		"""
+		
+		update = Update(update or {})
+		
+		if not update:
+			raise TypeError("Must provide an update operation.")
+		
+		return self._find_one_and('update', args, kw, update)
+	
+	@_hybrid
+	def find_one_and_replace(self, replacement=None, *args, **kw):
+		"""Atomically replace a single matching record, returning it as a Document, in a single round trip.
+		
+		Arguments are as per `find_one_and_update`. When called on an instance, only that instance's record is
+		considered, and the instance itself is the default replacement.
+		
+		https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.find_one_and_replace
+		"""
+		
+		if replacement is None:
+			if isinstance(self, type):
+				raise TypeError("Must provide a replacement document.")
+			
+			replacement = self
+		
+		return self._find_one_and('replace', args, kw, replacement)
+	
+	@_hybrid
+	def find_one_and_delete(self, *args, **kw):
+		"""Atomically delete a single matching record, returning it as a Document, in a single round trip.
+		
+		Arguments are processed as per `find_one`, with the options: `projection`, `sort`, `collation`, and
+		`max_time_ms`. When called on an instance, only that instance's record is considered.
+		
+		https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.find_one_and_delete
+		"""
+		
+		return self._find_one_and('delete', args, kw)
 	
 	@classmethod
 	def find_in_sequence(cls, field, order, *args, **kw):
@@ -257,7 +554,11 @@ class Queryable(Collection):
 			if tuple(collection.database.client.server_info()['versionArray'][:2]) < (3, 4):  # pragma: no cover
 				raise RuntimeError("Queryable.find_in_sequence only works against MongoDB server versions 3.4 or newer.")
 		
-		return collection.aggregate(stages, **options)
+		started = perf_counter()
+		result = collection.aggregate(stages, **options)
+		cls._record('find_in_sequence', stages, started)
+		
+		return result
 	
 	# https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.count
 	# https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.distinct
@@ -265,26 +566,97 @@ class Queryable(Collection):
 	# https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.map_reduce
 	# https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.inline_map_reduce
 	# https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.parallel_scan
-	# https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.initialize_unordered_bulk_op
-	# https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.initialize_ordered_bulk_op
 	
 	def reload(self, *fields, **kw):
-		"""Reload the entire document from the database, or refresh specific named top-level fields."""
+		"""Reload the entire document from the database, or refresh specific named fields.
+		
+		Fields may be nested, e.g. `reload('address.city')`; only the values at the requested paths are replaced,
+		leaving the remainder of any containing embedded documents intact.
+		"""
 		
 		Doc, collection, query, options = self._prepare_find(id=self.id, projection=fields, **kw)
+		started = perf_counter()
 		result = collection.find_one(query, **options)
+		Doc._record('reload', query, started, *Doc._measure(result))
 		
-		if fields:  # Refresh only the requested data.
-			for k in result:  # TODO: Better merge algorithm.
-				if k == ~Doc.id: continue
-				self.__data__[k] = result[k]
-		else:
-			self.__data__ = result
+		self._refresh(result, options['projection'] if fields else None, collection)
 		
 		return self
 	
+	@classmethod
+	def reload_many(cls, documents, *fields, **kw):
+		"""Reload, or refresh specific named fields of, many documents at once, returning those no longer found.
+		
+		Records are retrieved using one query per `chunk` (default: 1000) documents, selecting by primary key, and are
+		merged into the given instances in place, as per `reload`.
+		"""
+		
+		chunk = kw.pop('chunk', 1000)
+		instances = odict()  # Mapping of primary key to the list of instances representing that record.
+		
+		for document in documents:
+			instances.setdefault(document['_id'], []).append(document)
+		
+		identifiers = list(instances)
+		
+		for i in range(0, len(identifiers), chunk):
+			batch = identifiers[i:i + chunk]
+			Doc, collection, query, options = cls._prepare_find(cls.id.any(batch), projection=fields, **kw)
+			
+			started = perf_counter()
+			results = list(collection.find(query, **options))
+			Doc._record('reload_many', query, started, len(results))
+			
+			for result in results:
+				for j, document in enumerate(instances.pop(result['_id'], ())):
+					if j and not isinstance(result, RawBSONDocument):  # Duplicates must not share mutable state.
+						result = deepcopy(result)
+					
+					document._refresh(result, options['projection'] if fields else None, collection)
+		
+		return [document for remaining in instances.values() for document in remaining]
+	
+	def _refresh(self, result, projection, collection):
+		"""Merge a retrieved record into this document, wholesale or only at the projected paths. Internal use only."""
+		
+		if isinstance(result, RawBSONDocument):
+			result = RawDocument(result)
+		
+		if projection is None:
+			self.__data__ = result
+			self._clear_changes()
+			
+			unit = current()
+			
+			if unit is not None:
+				unit.add(self, collection)
+			
+			return
+		
+		for path in projection:
+			if path == '_id':
+				continue
+			
+			name, _, path = path.partition('.')
+			value = _merged(self.__data__.get(name, SENTINEL), result.get(name, SENTINEL), path)
+			
+			if value is SENTINEL:
+				self.apply({'$unset': {name: True}})
+			else:
+				self.apply({'$set': {name: value}})
 	
-	# https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.insert_many
+	@classmethod
+	def insert_many(cls, iterable, chunk=1000, workers=None, processes=None, validate=True, source=None):
+		"""Insert the Documents produced by an iterable, in chunks, concurrently, without consuming it all at once.
+		
+		Chunks of `chunk` documents are inserted, unordered, by a pool of `workers` threads; pass `processes` to
+		also encode them in a pool of processes. Returns a BulkResult, whose `rate` is the number of records inserted
+		per second. See marrow.mongo.util.insert for details.
+		
+		https://api.mongodb.com/python/current/api/pymongo/collection.html#pymongo.collection.Collection.insert_many
+		"""
+		
+		return insert_many(cls, cls.get_collection(source), iterable, chunk, workers, processes, validate)
 	
 	#def replace(self, *args, **kw):
 	#	"""Replace a single document matching the filter with this document, passing additional arguments to PyMongo.
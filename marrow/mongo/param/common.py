@@ -32,22 +32,59 @@ def _operator_choice(conversion, lookup, **kw):
 	return _operator_choice_inner
 
 
+def _cache(Document):
+	"""Retrieve the per-class cache of parametric name resolutions, discarding it if the class has been redefined.
+	
+	Resolution depends on the alias and operation mappings in use at the time; modifications to those mappings are
+	not reflected for names which have already been resolved.
+	"""
+	
+	cache = Document.__dict__.get('__parametric__')
+	
+	if cache is None or cache[0] is not Document.__attributes__:
+		cache = Document.__parametric__ = (Document.__attributes__, {})
+	
+	return cache[1]
+
+
+def _resolve(Document, prefixes, suffixes, passthrough, name):
+	"""Resolve a keyword argument name to its (prefix operation, suffix operation, field, needs casting) tuple.
+	
+	Resolutions are memoized by the identity of the given mappings, which are expected to be module-level constants.
+	"""
+	
+	cache = _cache(Document)
+	key = (name, id(prefixes), id(suffixes), id(passthrough))
+	entry = cache.get(key)
+	
+	if entry is not None and entry[0] is prefixes and entry[1] is suffixes and entry[2] is passthrough:
+		return entry[3]
+	
+	prefix, _, nname = name.partition('__')
+	if prefix in prefixes:
+		name = nname
+	
+	nname, _, suffix = name.rpartition('__')
+	if suffix in suffixes:
+		name = nname
+	
+	field = traverse(Document, name.replace('__', '.'))  # Find the target field.
+	cast = bool(passthrough and not passthrough & {prefix, suffix})  # Typecast the value to MongoDB-safe as needed.
+	
+	resolved = (prefixes.get(prefix or None, None), suffixes.get(suffix, None), field, cast)
+	cache[key] = (prefixes, suffixes, passthrough, resolved)  # Referenced, so their identities can not be reused.
+	
+	return resolved
+
+
 def _process_arguments(Document, prefixes, suffixes, arguments, passthrough=None):
 	for name, value in arguments.items():
-		prefix, _, nname = name.partition('__')
-		if prefix in prefixes:
-			name = nname
-		
-		nname, _, suffix = name.rpartition('__')
-		if suffix in suffixes:
-			name = nname
-		
-		field = traverse(Document, name.replace('__', '.'))  # Find the target field.
+		prefix, suffix, field, cast = _resolve(Document, prefixes, suffixes, passthrough, name)
 		
-		if passthrough and not passthrough & {prefix, suffix}:  # Typecast the value to MongoDB-safe as needed.
+		if cast:
 			value = field._field.transformer.foreign(value, (field, Document))  # pylint:disable=protected-access
 		
-		yield prefixes.get(prefix or None, None), suffixes.get(suffix, None), field, value
+		yield prefix, suffix, field, value
 
 
 def _current_date(value):
@@ -6,12 +6,25 @@ from __future__ import unicode_literals
 
 from ...package.loader import traverse
 from ...schema.compat import unicode
+from .common import _cache
 
 
 def P(Document, *fields, **kw):
-	"""Generate a MongoDB projection dictionary using the Django ORM style."""
+	"""Generate a MongoDB projection dictionary using the Django ORM style.
+	
+	Projections are cached per Document class and set of arguments; a new dictionary is returned each call.
+	"""
 	
 	__always__ = kw.pop('__always__', set())
+	default = getattr(Document, '__projection__', None)  # Invalidates the cached projection if reassigned.
+	
+	cache = _cache(Document)
+	key = (P, fields, frozenset(__always__))
+	cached = cache.get(key)
+	
+	if cached is not None and cached[0] is default:
+		return dict(cached[1])
+	
 	projected = set()
 	omitted = set()
 	
@@ -24,7 +37,7 @@ def P(Document, *fields, **kw):
 			projected.add(field)
 	
 	if not projected:  # We only have exclusions from the default projection.
-		names = set(getattr(Document, '__projection__', Document.__fields__) or Document.__fields__)
+		names = set(default or Document.__fields__)
 		projected = {name for name in (names - omitted)}
 	
 	projected |= __always__
@@ -32,4 +45,7 @@ def P(Document, *fields, **kw):
 	if not projected:
 		projected = {'_id'}
 	
-	return {unicode(traverse(Document, name, name)): True for name in projected}
+	result = {unicode(traverse(Document, name, name)): True for name in projected}
+	cache[key] = (default, result)
+	
+	return dict(result)
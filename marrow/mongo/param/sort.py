@@ -7,11 +7,13 @@ from __future__ import unicode_literals
 from pymongo import ASCENDING, DESCENDING
 
 from ...package.loader import traverse
+from .common import _cache
 
 
 def S(Document, *fields):
 	"""Generate a MongoDB sort order list using the Django ORM style."""
 	
+	cache = _cache(Document)
 	result = []
 	
 	for field in fields:
@@ -20,19 +22,34 @@ def S(Document, *fields):
 			result.append((field, direction))
 			continue
 		
-		direction = ASCENDING
-		
-		if not field.startswith('__'):
-			field = field.replace('__', '.')
-		
-		if field[0] == '-':
-			direction = DESCENDING
-		
-		if field[0] in ('+', '-'):
-			field = field[1:]
-		
-		_field = traverse(Document, field, default=None)
-		
-		result.append(((~_field) if _field else field, direction))
+		result.append(_resolve(Document, cache, field))
 	
 	return result
+
+
+def _resolve(Document, cache, name):
+	"""Resolve a single parametric sort specification to a (field name, direction) tuple, memoized per class."""
+	
+	key = (S, name)
+	resolved = cache.get(key)
+	
+	if resolved is not None:
+		return resolved
+	
+	field = name
+	direction = ASCENDING
+	
+	if not field.startswith('__'):
+		field = field.replace('__', '.')
+	
+	if field[0] == '-':
+		direction = DESCENDING
+	
+	if field[0] in ('+', '-'):
+		field = field[1:]
+	
+	_field = traverse(Document, field, default=None)
+	
+	resolved = cache[key] = ((~_field) if _field else field, direction)
+	
+	return resolved
@@ -34,6 +34,8 @@ def _push_position(value):
 # Identify the casting functions we pass the field definition to, as these will need to utilize it in some way.
 UPDATE_MAGIC = {_push_each}
 
+UPDATE_SUFFIXES = {}  # Updates have no operation suffixes.
+
 
 # These allow us to easily override the interpretation of any particular operation and introduce new ones.
 # The keys represent prefixes, the values may be either a string (which will be prefixed with '$' automatically) or
@@ -106,7 +108,7 @@ def U(Document, __raw__=None, **update):
 	"""
 	
 	ops = Update(__raw__)
-	args = _process_arguments(Document, UPDATE_ALIASES, {}, update, UPDATE_PASSTHROUGH)
+	args = _process_arguments(Document, UPDATE_ALIASES, UPDATE_SUFFIXES, update, UPDATE_PASSTHROUGH)
 	
 	for operation, _, field, value in args:
 		if not operation:
@@ -8,7 +8,11 @@ These encapsulate the functionality of creating combinable mappings
 from __future__ import unicode_literals
 
 from .ops import Ops, Filter, Update
+from .apply import apply_update
+from .evaluate import matcher
+from .optimize import optimize
 from .query import Q  # noqa
+from .template import Placeholder, Template, prepare
 
 
-__all__ = ['Ops', 'Filter', 'Update', 'Q']
+__all__ = ['Ops', 'Filter', 'Update', 'Q', 'Placeholder', 'Template', 'prepare', 'optimize', 'matcher', 'apply_update']
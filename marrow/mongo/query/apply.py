@@ -0,0 +1,462 @@
+# encoding: utf-8
+
+"""Local application of update operations, reproducing in memory the effect an update will have on the server.
+	
+	apply_update(U(Person, inc__age=1, push__tags="staff"), person)
+
+The target may be a Document, whose backing store is modified directly (without recording changes, as the result is
+expected to mirror what has been, or will be, persisted), or any mutable mapping. As with updates issued to the
+server, values must already be in their MongoDB (foreign) representation, as produced by U() and the like.
+
+Positional (`$`, `$[]`, and `$[identifier]`) path components refer to the query used to select the document and can
+not be applied locally; `NotImplementedError` is raised if encountered. `$currentDate` uses the local clock, so may
+differ slightly from the value assigned by the server.
+"""
+
+from __future__ import unicode_literals
+
+from collections import Mapping
+from datetime import datetime
+from decimal import Decimal
+from time import time
+
+from bson import Binary, Int64, MaxKey, MinKey, ObjectId, Timestamp
+from bson.regex import Regex
+
+from ...schema.compat import odict
+from ..util import SENTINEL, utc
+from .evaluate import PATTERN, _clause, _condition, _equal, _kind, _native
+from .ops import Update
+
+try:
+	from bson.decimal128 import Decimal128
+except ImportError:  # pragma: no cover
+	Decimal128 = None
+
+
+__all__ = ['apply_update', 'applicable']
+
+
+ORDER = {  # The relative order of values of differing BSON types, as used by $min, $max, and $sort.
+		'null': 1,
+		'number': 2,
+		'string': 3,
+		'object': 4,
+		'array': 5,
+		bytes: 6,
+		Binary: 6,
+		ObjectId: 7,
+		'bool': 8,
+		datetime: 9,
+		Timestamp: 10,
+		Regex: 11,
+		PATTERN: 11,
+	}
+
+
+def apply_update(update, target, insert=False):
+	"""Apply the given Update, or update document, to the target Document or mapping in-place, returning the target.
+	
+	If `insert` is truthy the update is treated as having created the document through an upsert, applying any
+	`$setOnInsert` operations.
+	"""
+	
+	operations = update.operations if isinstance(update, Update) else update
+	
+	for operation, fields in operations.items():
+		if operation == '$setOnInsert' and not insert:
+			continue
+		
+		handler = OPERATIONS.get(operation)
+		
+		if handler is None:
+			raise ValueError("Unknown update operator: " + operation)
+		
+		for path, value in fields.items():
+			handler(target, path, value)
+	
+	return target
+
+
+# Value Semantics
+
+def applicable(update):
+	"""Determine if the given Update, or update document, can be applied locally using `apply_update`."""
+	
+	operations = update.operations if isinstance(update, Update) else update
+	
+	for operation, fields in operations.items():
+		if operation not in OPERATIONS:
+			return False
+		
+		for path in fields:
+			if any(part[:1] == '$' for part in path.split('.')):
+				return False
+	
+	return True
+
+
+def _rank(value):
+	"""Produce a key ordering values of any type as MongoDB would."""
+	
+	if isinstance(value, MinKey):
+		return (0, 0)
+	
+	if isinstance(value, MaxKey):
+		return (127, 0)
+	
+	kind = _kind(value)
+	
+	if kind == 'array':
+		return (ORDER[kind], [_rank(i) for i in value])
+	
+	if kind == 'object':
+		return (ORDER[kind], [(k, _rank(v)) for k, v in value.items()])
+	
+	return (ORDER.get(kind, 12), 0 if value is None else _native(value))
+
+
+def _number(value, path):
+	kind = _kind(value)
+	
+	if kind != 'number' or isinstance(value, bool):
+		raise TypeError("Can not apply arithmetic to the non-numeric value at: " + path)
+	
+	return _native(value)
+
+
+def _arithmetic(existing, value, combine, path):
+	"""Combine two numbers, preserving the widest of their types."""
+	
+	result = combine(_number(existing, path), _number(value, path))
+	
+	if Decimal128 is not None and isinstance(result, Decimal):
+		return Decimal128(result)
+	
+	if isinstance(existing, Int64) or isinstance(value, Int64):
+		return Int64(result)
+	
+	return result
+
+
+def _now():
+	"""The current time, at the millisecond precision of BSON dates."""
+	
+	now = datetime.utcnow().replace(tzinfo=utc)
+	return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+# Path Resolution
+
+def _storage(container, name):
+	"""Retrieve the mapping holding the values of the given container, invalidating any memoized native value."""
+	
+	data = getattr(container, '__data__', None)
+	
+	if data is None:
+		return container
+	
+	native = container.__dict__.get('__native__')
+	
+	if native:
+		native.pop(name, None)
+	
+	return data
+
+
+def _index(container, part, path):
+	if not part.isdigit():
+		raise TypeError("Can not reference field {0!r} of an array at: {1}".format(part, path))
+	
+	return int(part)
+
+
+def _locate(target, path, create):
+	"""Find the container holding the final component of a dot-separated path, and that component.
+	
+	Intermediate embedded documents are created if `create` is truthy, otherwise `(None, None)` is returned if any are
+	missing.
+	"""
+	
+	parts = path.split('.')
+	container = target
+	
+	for part in parts:
+		if part[:1] == '$':
+			raise NotImplementedError("Positional update operators can not be applied locally: " + path)
+	
+	for part in parts[:-1]:
+		if isinstance(container, list):
+			index = _index(container, part, path)
+			child = container[index] if index < len(container) else None
+		
+		else:
+			container = _storage(container, part)
+			child = container.get(part)
+		
+		if child is None:
+			if not create:
+				return None, None
+			
+			child = odict()
+			_assign(container, part, child, path)
+		
+		elif not isinstance(child, (Mapping, list)):
+			raise TypeError("Can not traverse into the scalar value of {0!r} at: {1}".format(part, path))
+		
+		container = child
+	
+	if not isinstance(container, list):
+		container = _storage(container, parts[-1])
+	
+	return container, parts[-1]
+
+
+def _get(container, name, path):
+	if isinstance(container, list):
+		index = _index(container, name, path)
+		return container[index] if index < len(container) else SENTINEL
+	
+	return container.get(name, SENTINEL)
+
+
+def _assign(container, name, value, path):
+	if isinstance(container, list):
+		index = _index(container, name, path)
+		
+		if index >= len(container):
+			container.extend([None] * (index - len(container) + 1))
+		
+		container[index] = value
+		return
+	
+	container[name] = value
+
+
+def _remove(container, name, path):
+	"""Remove the named value, returning it. Array elements are replaced with null, as MongoDB does."""
+	
+	if isinstance(container, list):
+		index = _index(container, name, path)
+		
+		if index >= len(container):
+			return SENTINEL
+		
+		value, container[index] = container[index], None
+		return value
+	
+	return container.pop(name, SENTINEL)
+
+
+def _array(container, name, path):
+	"""Retrieve a copy of the array at the given location, or a new empty array if missing."""
+	
+	existing = _get(container, name, path)
+	
+	if existing is SENTINEL or existing is None:
+		return []
+	
+	if not isinstance(existing, list):
+		raise TypeError("Can not apply an array operation to the non-array value at: " + path)
+	
+	return list(existing)  # Replaced, not modified in-place, to avoid change tracking by Array fields.
+
+
+# Update Operators
+
+def _set(target, path, value):
+	container, name = _locate(target, path, True)
+	_assign(container, name, value, path)
+
+
+def _unset(target, path, value):
+	container, name = _locate(target, path, False)
+	
+	if container is not None:
+		_remove(container, name, path)
+
+
+def _numeric(combine):
+	def operation(target, path, value):
+		container, name = _locate(target, path, True)
+		existing = _get(container, name, path)
+		
+		if existing is SENTINEL:  # Missing values are treated as a zero of the same type as the operand.
+			existing = 0
+		
+		_assign(container, name, _arithmetic(existing, value, combine, path), path)
+	
+	return operation
+
+
+def _extreme(keep):
+	def operation(target, path, value):
+		container, name = _locate(target, path, True)
+		existing = _get(container, name, path)
+		
+		if existing is SENTINEL or keep(_rank(value), _rank(existing)):
+			_assign(container, name, value, path)
+	
+	return operation
+
+
+def _rename(target, path, value):
+	container, name = _locate(target, path, False)
+	
+	if container is None:
+		return
+	
+	existing = _remove(container, name, path)
+	
+	if existing is not SENTINEL:
+		_set(target, value, existing)
+
+
+def _current_date(target, path, value):
+	if isinstance(value, Mapping) and value.get('$type') == 'timestamp':
+		value = Timestamp(int(time()), 1)
+	else:
+		value = _now()
+	
+	_set(target, path, value)
+
+
+def _sorted(values, order):
+	if isinstance(order, Mapping):
+		for field, direction in reversed(list(order.items())):  # Stable sorting permits mixed directions.
+			values = sorted(values, key=lambda value: _rank(value.get(field) if isinstance(value, Mapping) else None),
+					reverse=direction < 0)
+		
+		return values
+	
+	return sorted(values, key=_rank, reverse=order < 0)
+
+
+def _push(target, path, value):
+	container, name = _locate(target, path, True)
+	array = _array(container, name, path)
+	
+	if not isinstance(value, Mapping) or '$each' not in value:
+		array.append(value)
+		_assign(container, name, array, path)
+		return
+	
+	position = value.get('$position')
+	
+	if position is None:
+		array.extend(value['$each'])
+	else:
+		if position < 0:
+			position = max(len(array) + position, 0)
+		
+		array[position:position] = value['$each']
+	
+	if '$sort' in value:
+		array = _sorted(array, value['$sort'])
+	
+	if '$slice' in value:
+		limit = value['$slice']
+		array = array[:limit] if limit >= 0 else array[limit:]
+	
+	_assign(container, name, array, path)
+
+
+def _push_all(target, path, value):
+	_push(target, path, {'$each': value})
+
+
+def _add_to_set(target, path, value):
+	container, name = _locate(target, path, True)
+	array = _array(container, name, path)
+	
+	values = value['$each'] if isinstance(value, Mapping) and '$each' in value else (value, )
+	
+	for value in values:
+		for existing in array:
+			if _equal(existing, value):
+				break
+		else:
+			array.append(value)
+	
+	_assign(container, name, array, path)
+
+
+def _pull_test(value):
+	"""Produce a test identifying array elements to remove: a condition, a document query, or a value."""
+	
+	if isinstance(value, Mapping) and value:
+		if all(key.startswith('$') for key in value):
+			condition = _condition(value)
+			return lambda element: condition([element])
+		
+		clause = _clause(value)
+		return lambda element: isinstance(element, Mapping) and clause(element)
+	
+	return lambda element: _equal(element, value)
+
+
+def _reduce(target, path, transform):
+	"""Replace an existing array with a transformed copy of it. Missing arrays are not created."""
+	
+	container, name = _locate(target, path, False)
+	
+	if container is None:
+		return
+	
+	existing = _get(container, name, path)
+	
+	if existing is SENTINEL or existing is None:
+		return
+	
+	_assign(container, name, transform(_array(container, name, path)), path)
+
+
+def _pull(target, path, value):
+	test = _pull_test(value)
+	_reduce(target, path, lambda array: [i for i in array if not test(i)])
+
+
+def _pull_all(target, path, value):
+	_reduce(target, path, lambda array: [i for i in array if not any(_equal(i, v) for v in value)])
+
+
+def _pop(target, path, value):
+	_reduce(target, path, lambda array: array[1:] if value < 0 else array[:-1])
+
+
+def _bit(target, path, value):
+	container, name = _locate(target, path, True)
+	existing = _get(container, name, path)
+	result = 0 if existing is SENTINEL else existing
+	
+	for op, operand in value.items():
+		if op == 'and':
+			result &= operand
+		elif op == 'or':
+			result |= operand
+		elif op == 'xor':
+			result ^= operand
+		else:
+			raise ValueError("Unknown bitwise operation: " + op)
+	
+	_assign(container, name, result, path)
+
+
+OPERATIONS = {
+		'$set': _set,
+		'$setOnInsert': _set,
+		'$unset': _unset,
+		'$inc': _numeric(lambda a, b: a + b),
+		'$mul': _numeric(lambda a, b: a * b),
+		'$min': _extreme(lambda value, existing: value < existing),
+		'$max': _extreme(lambda value, existing: value > existing),
+		'$rename': _rename,
+		'$currentDate': _current_date,
+		'$push': _push,
+		'$pushAll': _push_all,
+		'$addToSet': _add_to_set,
+		'$pull': _pull,
+		'$pullAll': _pull_all,
+		'$pop': _pop,
+		'$bit': _bit,
+	}
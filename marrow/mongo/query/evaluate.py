@@ -0,0 +1,550 @@
+# encoding: utf-8
+
+"""Client-side evaluation of filter documents against documents already in memory.
+
+A filter is compiled once into nested closures, then called with each Document (or plain mapping, including raw BSON
+documents) to test:
+	
+	adult = matcher(Person.age >= 18)
+	adults = [person for person in people if adult(person)]
+
+Values are compared using MongoDB's semantics rather than Python's: dot-notation paths descend through arrays of
+embedded documents, comparisons against arrays match if any element matches, and values of differing BSON types
+never compare as greater or lesser than each other. As with queries issued to the server, values compared against
+must already be in their MongoDB (foreign) representation, as produced by Q, F(), and the like.
+
+Geospatial, text search, `$where`, and `$expr` operators can not be evaluated locally; `NotImplementedError` is raised
+when compiling filters making use of them.
+"""
+
+from __future__ import unicode_literals
+
+import operator
+import re
+
+from collections import Mapping
+from datetime import datetime
+from numbers import Integral, Number
+
+from bson import Binary, Code, Int64, MaxKey, MinKey, ObjectId, Timestamp
+from bson.regex import Regex
+
+from ...schema.compat import py3, str, unicode
+
+try:
+	from bson.decimal128 import Decimal128
+except ImportError:  # pragma: no cover
+	Decimal128 = None
+
+
+__all__ = ['matcher']
+
+
+PATTERN = type(re.compile(''))
+FLAGS = {'i': re.IGNORECASE, 'm': re.MULTILINE, 's': re.DOTALL, 'x': re.VERBOSE}
+COMPARISON = {'$gt': operator.gt, '$gte': operator.ge, '$lt': operator.lt, '$lte': operator.le}
+SCALAR = {type(None), bool, int, float, str, unicode, datetime, ObjectId}  # Directly comparable with their own kind.
+UNSUPPORTED = {'$where', '$text', '$expr', '$near', '$nearSphere', '$geoWithin', '$geoIntersects', '$within'}
+
+
+def _integer(value, bits):
+	return isinstance(value, Integral) and not isinstance(value, bool) and -2 ** (bits - 1) <= value < 2 ** (bits - 1)
+
+
+TYPES = {  # BSON type aliases (and their numeric codes) mapped to tests identifying values of that type.
+		'double': lambda v: isinstance(v, float),
+		'string': lambda v: isinstance(v, (str, unicode)),
+		'object': lambda v: isinstance(v, Mapping),
+		'array': lambda v: isinstance(v, list),
+		'binData': lambda v: isinstance(v, Binary) or (py3 and isinstance(v, bytes)),
+		'objectId': lambda v: isinstance(v, ObjectId),
+		'bool': lambda v: isinstance(v, bool),
+		'date': lambda v: isinstance(v, datetime),
+		'null': lambda v: v is None,
+		'regex': lambda v: isinstance(v, (PATTERN, Regex)),
+		'javascript': lambda v: isinstance(v, Code),
+		'int': lambda v: _integer(v, 32) and not isinstance(v, Int64),
+		'timestamp': lambda v: isinstance(v, Timestamp),
+		'long': lambda v: isinstance(v, Int64) or (_integer(v, 64) and not _integer(v, 32)),
+		'decimal': lambda v: Decimal128 is not None and isinstance(v, Decimal128),
+		'minKey': lambda v: isinstance(v, MinKey),
+		'maxKey': lambda v: isinstance(v, MaxKey),
+	}
+
+TYPES['integer'] = TYPES['int']  # As used by the Integer field.
+TYPES['number'] = lambda v: _kind(v) == 'number'
+TYPES.update({code: TYPES[name] for code, name in {1: 'double', 2: 'string', 3: 'object', 4: 'array', 5: 'binData',
+		7: 'objectId', 8: 'bool', 9: 'date', 10: 'null', 11: 'regex', 13: 'javascript', 16: 'int', 17: 'timestamp',
+		18: 'long', 19: 'decimal', -1: 'minKey', 127: 'maxKey'}.items()})
+
+
+def matcher(query):
+	"""Compile the given Filter or filter document into a callable accepting a document and returning a boolean."""
+	
+	test = _clause(query.as_query if hasattr(query, 'as_query') else query)
+	
+	def matches(document):
+		return test(getattr(document, '__data__', document))
+	
+	return matches
+
+
+# Value Semantics
+
+def _kind(value):
+	"""Identify the BSON comparison class of the given value, within which values may be ordered."""
+	
+	if value is None:
+		return 'null'
+	
+	if isinstance(value, bool):
+		return 'bool'
+	
+	if isinstance(value, Number) or (Decimal128 is not None and isinstance(value, Decimal128)):
+		return 'number'
+	
+	if isinstance(value, (str, unicode)):
+		return 'string'
+	
+	if isinstance(value, Mapping):
+		return 'object'
+	
+	if isinstance(value, (list, tuple)):
+		return 'array'
+	
+	return value.__class__
+
+
+def _native(value):
+	return value.to_decimal() if Decimal128 is not None and isinstance(value, Decimal128) else value
+
+
+def _equal(a, b):
+	"""Compare two values for equality, as MongoDB would."""
+	
+	if a.__class__ is b.__class__ and b.__class__ in SCALAR:
+		return a == b
+	
+	if isinstance(b, Mapping):
+		if not isinstance(a, Mapping) or len(a) != len(b):
+			return False
+		
+		for (ak, av), (bk, bv) in zip(a.items(), b.items()):  # Field order is significant.
+			if ak != bk or not _equal(av, bv):
+				return False
+		
+		return True
+	
+	if isinstance(b, (list, tuple)):
+		if not isinstance(a, (list, tuple)) or len(a) != len(b):
+			return False
+		
+		for av, bv in zip(a, b):
+			if not _equal(av, bv):
+				return False
+		
+		return True
+	
+	if _kind(a) != _kind(b):
+		return False
+	
+	try:
+		return _native(a) == _native(b)
+	except TypeError:  # E.g. naive and timezone-aware datetimes.
+		return False
+
+
+def _compare(comparison, a, b):
+	"""Order two values using the given comparison, if they are of the same BSON comparison class."""
+	
+	if a.__class__ is b.__class__ and b.__class__ in SCALAR and b is not None:
+		try:
+			return comparison(a, b)
+		except TypeError:
+			return False
+	
+	kind = _kind(a)
+	
+	if kind != _kind(b) or kind in ('object', 'array'):
+		return False
+	
+	if kind == 'null':  # All nulls are equal to each other.
+		return comparison(0, 0)
+	
+	try:
+		return comparison(_native(a), _native(b))
+	except TypeError:
+		return False
+
+
+def _expand(values):
+	"""Produce the values to compare against: each value found, and the elements of any arrays amongst them."""
+	
+	for value in values:
+		yield value
+		
+		if isinstance(value, list):
+			for element in value:
+				yield element
+
+
+def _resolve(value, parts, index, found):
+	"""Collect the values identified by a dot-notation path, descending through arrays of embedded documents."""
+	
+	if index == len(parts):
+		found.append(value)
+		return found
+	
+	part = parts[index]
+	
+	if isinstance(value, list):
+		if part.isdigit():
+			if int(part) < len(value):
+				_resolve(value[int(part)], parts, index + 1, found)
+		
+		else:
+			for element in value:
+				if isinstance(element, dict) or isinstance(element, Mapping):
+					_resolve(element, parts, index, found)
+	
+	elif isinstance(value, dict) or isinstance(value, Mapping):  # The former avoids a costly abstract check.
+		if part in value:
+			_resolve(value[part], parts, index + 1, found)
+	
+	return found
+
+
+def _regex(pattern, options=''):
+	"""Compile a pattern and optional MongoDB regular expression options, or an existing pattern, for searching."""
+	
+	if isinstance(pattern, Regex):
+		pattern = pattern.try_compile()
+	
+	if isinstance(pattern, PATTERN):
+		if not options:
+			return pattern
+		
+		pattern = pattern.pattern
+	
+	flags = 0
+	
+	for option in options:
+		flags |= FLAGS.get(option, 0)
+	
+	return re.compile(pattern, flags)
+
+
+def _searcher(pattern):
+	def search(value):
+		return isinstance(value, (str, unicode)) and pattern.search(value) is not None
+	
+	return search
+
+
+# Compilation
+
+def _clause(query):
+	"""Compile a complete filter document, or a member of a logical operation."""
+	
+	tests = []
+	
+	for key, value in query.items():
+		if key == '$and':
+			tests.append(_all([_clause(member) for member in value]))
+		
+		elif key == '$or':
+			tests.append(_any([_clause(member) for member in value]))
+		
+		elif key == '$nor':
+			tests.append(_negate(_any([_clause(member) for member in value])))
+		
+		elif key == '$not':  # Produced by the inversion of a Filter.
+			tests.append(_negate(_clause(value)))
+		
+		elif key == '$comment':
+			continue
+		
+		elif key.startswith('$'):
+			raise NotImplementedError("The {0} operator can not be evaluated locally.".format(key))
+		
+		else:
+			tests.append(_field(key, _condition(value)))
+	
+	return _all(tests)
+
+
+def _all(tests):
+	if len(tests) == 1:
+		return tests[0]
+	
+	def conjunction(document):
+		for test in tests:
+			if not test(document):
+				return False
+		
+		return True
+	
+	return conjunction
+
+
+def _any(tests):
+	def disjunction(document):
+		for test in tests:
+			if test(document):
+				return True
+		
+		return False
+	
+	return disjunction
+
+
+def _negate(test):
+	def negation(value):
+		return not test(value)
+	
+	return negation
+
+
+def _field(path, condition):
+	"""Apply a condition to the values found at the given path within a document."""
+	
+	if '.' not in path:
+		def field(document):
+			return condition([document[path]] if path in document else [])
+		
+		return field
+	
+	parts = path.split('.')
+	
+	def nested(document):
+		return condition(_resolve(document, parts, 0, []))
+	
+	return nested
+
+
+def _condition(value):
+	"""Compile the comparison against a single field into a test of the list of values found at its path."""
+	
+	if not isinstance(value, Mapping) or not value or not all(key.startswith('$') for key in value):
+		return _equality(value)
+	
+	tests = []
+	
+	for op, arg in value.items():
+		if op == '$options':
+			if '$regex' not in value:
+				raise ValueError("The $options operator requires $regex.")
+			
+			continue
+		
+		if op in UNSUPPORTED:
+			raise NotImplementedError("The {0} operator can not be evaluated locally.".format(op))
+		
+		builder = OPERATORS.get(op)
+		
+		if builder is None:
+			raise ValueError("Unknown query operator: " + op)
+		
+		tests.append(builder(arg, value))
+	
+	return _all(tests)
+
+
+def _equality(target):
+	"""Match values equal to the target, arrays containing it, or regular expression matches; null matches missing."""
+	
+	if isinstance(target, (PATTERN, Regex)):
+		search = _searcher(_regex(target))
+		
+		def pattern(values):
+			for value in _expand(values):
+				if search(value) or _equal(value, target):
+					return True
+			
+			return False
+		
+		return pattern
+	
+	if target is None:
+		def null(values):
+			if not values:
+				return True
+			
+			for value in _expand(values):
+				if value is None:
+					return True
+			
+			return False
+		
+		return null
+	
+	def equality(values):
+		for value in _expand(values):
+			if _equal(value, target):
+				return True
+		
+		return False
+	
+	return equality
+
+
+def _eq(arg, operations):
+	return _equality(arg)
+
+
+def _ne(arg, operations):
+	return _negate(_equality(arg))
+
+
+def _comparison(op):
+	comparison = COMPARISON[op]
+	
+	def builder(arg, operations):
+		def compare(values):
+			for value in _expand(values):
+				if _compare(comparison, value, arg):
+					return True
+			
+			return False
+		
+		return compare
+	
+	return builder
+
+
+def _in(arg, operations):
+	return _any([_equality(i) for i in arg])
+
+
+def _nin(arg, operations):
+	return _negate(_in(arg, operations))
+
+
+def _exists(arg, operations):
+	expected = bool(arg)
+	
+	def exists(values):
+		return bool(values) is expected
+	
+	return exists
+
+
+def _type(arg, operations):
+	checks = [TYPES[i] for i in (arg if isinstance(arg, (list, tuple, set)) else (arg, ))]
+	
+	def of_type(values):
+		for value in _expand(values):
+			for check in checks:
+				if check(value):
+					return True
+		
+		return False
+	
+	return of_type
+
+
+def _regex_op(arg, operations):
+	search = _searcher(_regex(arg, operations.get('$options', '')))
+	
+	def regex(values):
+		for value in _expand(values):
+			if search(value):
+				return True
+		
+		return False
+	
+	return regex
+
+
+def _mod(arg, operations):
+	divisor, remainder = arg
+	divisor, remainder = int(divisor), int(remainder)
+	
+	def mod(values):
+		for value in _expand(values):
+			if _kind(value) == 'number' and int(_native(value)) % divisor == remainder:
+				return True
+		
+		return False
+	
+	return mod
+
+
+def _size(arg, operations):
+	def size(values):
+		for value in values:
+			if isinstance(value, list) and len(value) == arg:
+				return True
+		
+		return False
+	
+	return size
+
+
+def _elem_match(arg, operations):
+	arg = arg.as_query if hasattr(arg, 'as_query') else arg
+	
+	if arg and all(key.startswith('$') for key in arg) and not {'$and', '$or', '$nor'} & set(arg):
+		condition = _condition(arg)  # Operators applying to the elements themselves.
+		
+		def element(value):
+			return condition([value])
+	
+	else:
+		test = _clause(arg)
+		
+		def element(value):
+			return isinstance(value, Mapping) and test(value)
+	
+	def elem_match(values):
+		for value in values:
+			if isinstance(value, list):
+				for item in value:
+					if element(item):
+						return True
+		
+		return False
+	
+	return elem_match
+
+
+def _all_op(arg, operations):
+	if not arg:
+		def nothing(values):
+			return False
+		
+		return nothing
+	
+	tests = []
+	
+	for item in arg:
+		if isinstance(item, Mapping) and '$elemMatch' in item:
+			tests.append(_elem_match(item['$elemMatch'], item))
+		else:
+			tests.append(_equality(item))
+	
+	return _all(tests)
+
+
+def _not(arg, operations):
+	return _negate(_condition(arg) if isinstance(arg, Mapping) else _regex_op(arg, {}))
+
+
+OPERATORS = {
+		'$eq': _eq,
+		'$ne': _ne,
+		'$gt': _comparison('$gt'),
+		'$gte': _comparison('$gte'),
+		'$lt': _comparison('$lt'),
+		'$lte': _comparison('$lte'),
+		'$in': _in,
+		'$nin': _nin,
+		'$exists': _exists,
+		'$type': _type,
+		'$regex': _regex_op,
+		'$mod': _mod,
+		'$size': _size,
+		'$elemMatch': _elem_match,
+		'$all': _all_op,
+		'$not': _not,
+	}
@@ -0,0 +1,159 @@
+# encoding: utf-8
+
+"""Keyset (or "seek") pagination: continuing a sorted query from the sort key values of the last record seen.
+
+Unlike skipping, the cost of retrieving a page does not grow with its depth; the server seeks directly to the
+continuation point within a supporting index. The sort order is made unique by appending the primary key, unless
+already present or the sort is that of a unique index, and the position within the results is carried between
+requests by an opaque, URL-safe token.
+	
+	token = encode(order, values(last, order))
+	query = seek(order, decode(token, order))
+
+Sort keys are expected to hold values of a consistent type; null (or missing) values are ordered first, as MongoDB
+does.
+"""
+
+from __future__ import unicode_literals
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as EncodingError
+
+from bson import BSON
+from bson.errors import BSONError
+from pymongo import ASCENDING, DESCENDING
+
+from ...schema.compat import odict, unicode
+from .ops import Filter
+
+
+__all__ = ['order', 'seek', 'values', 'encode', 'decode', 'supported']
+
+
+def order(sort, pk='_id', indexes=(), equal=()):
+	"""Normalize a sort specification into a list of `(field, direction)` tuples, unique through use of the key.
+	
+	The primary key is not appended if one of the given Index instances is unique over, and able to satisfy, the sort
+	as given; see `supported` for the meaning of `equal`.
+	"""
+	
+	sort = [(unicode(field), direction) for field, direction in sort]
+	
+	if any(field == pk for field, direction in sort):
+		return sort
+	
+	if sort and any(index.unique and _covers(index, sort, equal, True) for index in indexes):
+		return sort
+	
+	sort.append((pk, ASCENDING))
+	
+	return sort
+
+
+def seek(sort, values, pk='_id'):
+	"""Produce a Filter selecting the records following the given sort key values, in the given sort order."""
+	
+	branches = []
+	
+	for i, (field, direction) in enumerate(sort):
+		prefix = odict((name, value) for (name, _), value in zip(sort[:i], values[:i]))
+		value = values[i]
+		
+		if value is None:
+			if direction == DESCENDING:
+				continue  # Nothing sorts before null.
+			
+			branches.append(_branch(prefix, field, {'$ne': None}))
+			continue
+		
+		operator = '$gt' if direction == ASCENDING else '$lt'
+		branches.append(_branch(prefix, field, {operator: value}))
+		
+		if direction == DESCENDING and field != pk:  # Null and missing values are ordered last when descending.
+			branches.append(_branch(prefix, field, None))
+	
+	if len(branches) == 1:
+		return Filter(branches[0])
+	
+	return Filter({'$or': branches})
+
+
+def _branch(prefix, field, condition):
+	branch = odict(prefix)
+	branch[field] = condition
+	return branch
+
+
+def values(record, sort):
+	"""Retrieve the sort key values of the given Document or stored record."""
+	
+	record = getattr(record, '__data__', record)
+	result = []
+	
+	for field, direction in sort:
+		value = record
+		
+		for part in field.split('.'):
+			value = value.get(part) if hasattr(value, 'get') else None
+		
+		result.append(value)
+	
+	return result
+
+
+def encode(sort, values):
+	"""Produce an opaque, URL-safe token representing a position within results ordered as given."""
+	
+	data = BSON.encode({'s': [list(i) for i in sort], 'v': values})
+	return urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def decode(token, sort):
+	"""Recover the sort key values from a token, verifying it was produced for the given sort order."""
+	
+	try:
+		token = token.encode('ascii') if isinstance(token, unicode) else token
+		data = BSON(urlsafe_b64decode(token + b'=' * (-len(token) % 4))).decode()
+	
+	except (BSONError, EncodingError, TypeError, UnicodeError, ValueError):
+		raise ValueError("Invalid continuation token.")
+	
+	if [tuple(i) for i in data.get('s', ())] != [tuple(i) for i in sort] or len(data.get('v', ())) != len(sort):
+		raise ValueError("Continuation token does not match the requested sort order.")
+	
+	return data['v']
+
+
+def supported(indexes, sort, equal=(), pk='_id'):
+	"""Determine if one of the given Index instances can satisfy the sort, and therefore the seek, efficiently.
+	
+	Leading index fields constrained by equality (`equal`) are skipped. Sparse and partial indexes are not considered,
+	as the records they omit could not be returned. The entire sort, including any primary key tie-breaker, must be
+	covered by the index, otherwise the server would need to sort the results in memory.
+	"""
+	
+	sort = [tuple(i) for i in sort]
+	
+	if not sort or sort == [(pk, ASCENDING)] or sort == [(pk, DESCENDING)]:
+		return True
+	
+	return any(_covers(index, sort, equal) for index in indexes)
+
+
+def _covers(index, sort, equal, exactly=False):
+	"""Determine if the given index can satisfy the sort, forwards or backwards; if `exactly`, with no extra fields."""
+	
+	if index.sparse or index.partial:
+		return False
+	
+	fields = list(index.fields)
+	
+	while fields and fields[0][0] in equal and fields[0][0] not in dict(sort):
+		fields.pop(0)
+	
+	if exactly and len(fields) != len(sort):
+		return False
+	
+	prefix = [tuple(i) for i in fields[:len(sort)]]
+	
+	return prefix == sort or prefix == [(field, -direction) for field, direction in sort]
@@ -8,20 +8,85 @@ These encapsulate the functionality of creating combinable mappings
 from __future__ import unicode_literals
 
 from collections import Mapping, MutableMapping
-from copy import deepcopy
 
 from ...schema.compat import odict, py3
 from ..util import SENTINEL
 
 
 class Ops(MutableMapping):
-	__slots__ = ('operations', 'collection', 'document')
+	"""A combinable mapping of MongoDB operations.
+	
+	Combination may be deferred by subclasses: the result shares the operations of its source, recording only the
+	(copied) operations being combined with them as a link in a chain. The chain is applied by `_fold` once, upon
+	first access to the resulting operations; the operations shared between links are never modified.
+	"""
+	
+	__slots__ = ('_operations', '_chain', 'collection', 'document')
 	
 	def __init__(self, operations=None, collection=None, document=None):
 		self.operations = operations or odict()
 		self.collection = collection
 		self.document = document
 	
+	@property
+	def operations(self):
+		if self._chain is not None:
+			self._operations = self._fold()
+			self._chain = None
+		
+		return self._operations
+	
+	@operations.setter
+	def operations(self, value):
+		self._operations = value
+		self._chain = None  # Pairs of (prior link, operations), or None if the operations are complete.
+	
+	def _pending(self):
+		"""Retrieve the operations awaiting combination, in the order they were combined."""
+		
+		pending = []
+		link = self._chain
+		
+		while link is not None:
+			link, other = link
+			pending.append(other)
+		
+		pending.reverse()
+		return pending
+	
+	def _fold(self):
+		"""Produce new operations by applying the pending combinations to the shared operations.
+		
+		By default the operations combined later replace those of the same name; subclasses merge them as appropriate.
+		"""
+		
+		operations = self._operations.copy()
+		
+		for other in self._pending():
+			operations.update(other)
+		
+		return operations
+	
+	def _snapshot(self):
+		"""Produce operations which are not referenced by any other instance, and thus safe to modify."""
+		
+		return self._operations.copy() if self._chain is None else self._fold()
+	
+	def _defer(self, other):
+		"""Return a new instance sharing our operations, with the given operations pending combination."""
+		
+		result = self.__class__(collection=self.collection, document=self.document)
+		
+		if self._chain is None:  # We may be modified later, so the result must not reference our operations.
+			result._operations = self._snapshot()  # pylint:disable=protected-access
+			result._chain = (None, other)  # pylint:disable=protected-access
+		
+		else:  # Operations pending combination are never modified; they are safe to share.
+			result._operations = self._operations  # pylint:disable=protected-access
+			result._chain = (self._chain, other)  # pylint:disable=protected-access
+		
+		return result
+	
 	def __repr__(self, extra=None):
 		return "{}({}{}{}{})".format(
 				self.__class__.__name__,
@@ -108,53 +173,95 @@ class Ops(MutableMapping):
 
 
 
-class Filter(Ops):
-	__slots__ = ('operations', 'collection', 'document')
+def _merge(operations, other, owned):
+	"""Boolean AND merge the other filter document into the operations given, in-place.
 	
-	# Binary Operator Protocols
+	Values are shared, never copied, unless they need to be modified; only containers whose identity is within the
+	`owned` set may be modified directly. Those copied or created here are added to it.
+	"""
 	
-	def __and__(self, other):
-		"""Boolean AND joining of filter operations."""
-		operations = deepcopy(self.operations)
-		other = other.as_query if hasattr(other, 'as_query') else other
+	for k, v in other.items():
+		if k not in operations:
+			operations[k] = v
+			continue
 		
-		for k, v in other.items():
-			if k not in operations:
-				operations[k] = v
-				continue
+		if k == '$and':
+			current = operations[k]
 			
-			if k == '$and':
-				operations.setdefault('$and', [])
-				operations['$and'].extend(v)
-				continue
-			
-			elif k == '$or':
-				operations.setdefault('$and', [])
-				operations['$and'].append(odict(((k, v), )))
-				
-				if '$or' in operations:
-					operations['$and'].append(odict((('$or', operations.pop('$or')), )))
-				
-				continue
+			if id(current) not in owned:
+				current = operations[k] = list(current)
+				owned.add(id(current))
 			
-			if not isinstance(operations[k], Mapping):
-				operations[k] = odict((('$eq', operations[k]), ))
+			current.extend(v)
+			continue
+		
+		elif k == '$or':
+			current = operations.get('$and')
 			
-			if not isinstance(v, Mapping):
-				v = odict((('$eq', v), ))
+			if current is None or id(current) not in owned:
+				current = operations['$and'] = list(current or ())
+				owned.add(id(current))
 			
-			operations[k].update(v)
+			current.append(odict(((k, v), )))
+			current.append(odict((('$or', operations.pop('$or')), )))
+			continue
+		
+		current = operations[k]
+		
+		if not isinstance(current, Mapping):
+			current = odict((('$eq', current), ))
 		
-		return self.__class__(operations=operations, collection=self.collection, document=self.document)
+		elif id(current) not in owned:
+			current = odict(current)
+		
+		owned.add(id(current))
+		operations[k] = current
+		
+		if not isinstance(v, Mapping):
+			v = odict((('$eq', v), ))
+		
+		current.update(v)
+
+
+class Filter(Ops):
+	"""A combinable MongoDB filter document.
+	
+	Boolean AND combination is deferred; nested values are copied upon evaluation only if they need to be modified.
+	"""
+	
+	__slots__ = ()
+	
+	def _fold(self):
+		operations = self._operations.copy()
+		owned = set()
+		
+		for other in self._pending():
+			_merge(operations, other, owned)
+		
+		return operations
+	
+	# Binary Operator Protocols
+	
+	def __and__(self, other):
+		"""Boolean AND joining of filter operations."""
+		
+		if isinstance(other, Filter):
+			other = other._snapshot()  # pylint:disable=protected-access
+		
+		else:
+			other = other.as_query if hasattr(other, 'as_query') else other
+			other = other.copy() if hasattr(other, 'copy') else odict(other.items())
+		
+		return self._defer(other)
 	
 	def __or__(self, other):
-		operations = deepcopy(self.operations)
+		operations = self._snapshot()
 		
 		other = other.as_query if hasattr(other, 'as_query') else other
 		
 		if len(operations) == 1 and '$or' in operations:
 			# Update existing $or.
-			operations['$or'].append(other)
+			operations['$or'] = operations['$or'] + [other]
 			return self.__class__(
 					operations = operations,
 					collection = self.collection,
@@ -172,34 +279,58 @@ class Filter(Ops):
 		
 		Equivalent to the MongoDB `$not` operator.
 		"""
-		operations = deepcopy(self.operations)
 		
 		return self.__class__(
-				operations = {'$not': operations},
+				operations = {'$not': self._snapshot()},
 				collection = self.collection,
 				document = self.document
 			)
 
 
 class Update(Ops):
-	__slots__ = ('operations', 'collection', 'document')
+	"""A combinable MongoDB update document.
+	
+	Combination is deferred. The operator-level mappings are copied upon evaluation; the values within them are shared.
+	"""
+	
+	__slots__ = ()
 	
 	EACH_COMBINING = {'$addToSet', '$push'}
 	
-	def __init__(self, operations=None, collection=None, document=None):
-		self.operations = operations or odict()
-		self.collection = collection
-		self.document = document
+	def _fold(self):
+		# Assignments from sources combined later have lower priority, but their operators and fields come first.
+		sources = self._pending()
+		sources.reverse()
+		sources.append(self._operations)
+		
+		operations = odict()
+		
+		for source in sources:
+			for op, fields in source.items():
+				current = operations.get(op)
+				
+				if current is None:
+					current = operations[op] = odict()
+				
+				# TODO: Handle EACH_COMBINING updates to auto-transform multiple instances.
+				current.update(fields)
+		
+		return operations
+	
+	def _snapshot(self):
+		if self._chain is not None:
+			return self._fold()
+		
+		return odict((op, odict(fields)) for op, fields in self._operations.items())
 	
 	# Binary Operator Protocols
 	
 	def __and__(self, other):
-		operations = deepcopy(odict(other.operations if hasattr(other, 'operations') else other))
+		if isinstance(other, Update):
+			other = other._snapshot()  # pylint:disable=protected-access
 		
-		for op in self:
-			for field in self[op]:
-				operations.setdefault(op, odict())
-				# TODO: Handle EACH_COMBINING updates to auto-transform multiple instances.
-				operations[op][field] = self[op][field]
+		else:
+			other = other.operations if hasattr(other, 'operations') else other
+			other = odict((op, odict(fields)) for op, fields in other.items())
 		
-		return self.__class__(operations=operations, collection=self.collection, document=self.document)
+		return self._defer(other)
@@ -0,0 +1,323 @@
+# encoding: utf-8
+
+"""Normalization of filter documents prior to submission to the server.
+
+Filters constructed through combination of Q operations, parametric F() calls, and Filter instances are frequently
+more complex than they need to be: nested `$and` and `$or` lists, `$or` of equality comparisons against a single field,
+wrapping of equality comparisons in `$eq`, redundant range bounds, and clauses which match everything. These are
+simplified to equivalent, canonical forms, which are smaller to transmit, faster to parse, and more likely to share a
+cached plan on the server.
+"""
+
+from __future__ import unicode_literals
+
+import re
+
+from collections import Mapping
+from numbers import Number
+
+from bson.regex import Regex
+
+from ...schema.compat import odict, str, unicode
+from .ops import Filter
+
+__all__ = ['optimize']
+
+
+LOWER = ('$gt', '$gte')  # Exclusive, then inclusive.
+UPPER = ('$lt', '$lte')
+PATTERN = type(re.compile(''))
+REGEX = ('$regex', '$options')  # Operators interpreted together, which can not be merged individually.
+ANYTHING = object()  # Produced by _predicate for comparisons matching every value, distinct from a literal null.
+
+
+def optimize(query):
+	"""Return an equivalent, simplified version of the given Filter or filter document.
+	
+	The original is not modified; unmodified portions of it may be shared with the result. If given a Filter, a Filter
+	bound to the same collection and document class is returned.
+	"""
+	
+	operations = query.as_query if hasattr(query, 'as_query') else query
+	result = _clause(operations)
+	
+	if isinstance(query, Filter):
+		return Filter(result, collection=query.collection, document=query.document)
+	
+	return result
+
+
+def _operators(value):
+	"""Determine if the given value is an operator expression, as opposed to a literal value to compare against."""
+	
+	if not isinstance(value, Mapping) or not value:
+		return False
+	
+	for key in value:
+		if not key.startswith('$'):
+			return False
+	
+	return True
+
+
+def _regex(value):
+	return isinstance(value, (PATTERN, Regex))
+
+
+def _identical(a, b):
+	"""Determine if two values are equal and of the same BSON type, e.g. distinguishing `1` from `True`."""
+	
+	if type(a) is not type(b):
+		return False
+	
+	if isinstance(a, Mapping):
+		return list(a) == list(b) and all(_identical(a[key], b[key]) for key in a)
+	
+	if isinstance(a, (list, tuple)):
+		return len(a) == len(b) and all(_identical(i, j) for i, j in zip(a, b))
+	
+	return a == b
+
+
+def _comparable(a, b):
+	"""Determine if Python's comparison of the two values agrees with MongoDB's.
+	
+	Strings are never considered comparable, as their order on the server depends upon the collation in effect.
+	"""
+	
+	if type(a) is type(b):
+		return not isinstance(a, (Mapping, list, str, unicode))
+	
+	return isinstance(a, Number) and isinstance(b, Number) and not isinstance(a, bool) and not isinstance(b, bool)
+
+
+def _tighter(op, a, b):
+	"""Select the more restrictive of two bounds of the same kind, or None if they can not be compared."""
+	
+	if not _comparable(a, b):
+		return None
+	
+	try:
+		if op in LOWER:
+			return a if a >= b else b
+		
+		return a if a <= b else b
+	
+	except TypeError:  # E.g. naive and timezone-aware datetimes.
+		return None
+
+
+def _tighten(operations):
+	"""Discard an exclusive or inclusive bound made redundant by the other, in-place."""
+	
+	for exclusive, inclusive, larger in (('$gt', '$gte', True), ('$lt', '$lte', False)):
+		if exclusive not in operations or inclusive not in operations:
+			continue
+		
+		a, b = operations[exclusive], operations[inclusive]
+		
+		if not _comparable(a, b):
+			continue
+		
+		try:
+			keep = a >= b if larger else a <= b
+		except TypeError:
+			continue
+		
+		del operations[inclusive if keep else exclusive]
+	
+	return operations
+
+
+def _predicate(value):
+	"""Normalize the comparison against a single field. Returns ANYTHING if it matches everything."""
+	
+	if not _operators(value):
+		return value
+	
+	operations = odict()
+	
+	for op, arg in value.items():
+		if op == '$nin' and isinstance(arg, (list, tuple)) and not arg:
+			continue  # Not in nothing; a tautology.
+		
+		operations[op] = arg
+	
+	if not operations:
+		return ANYTHING
+	
+	_tighten(operations)
+	
+	if len(operations) == 1 and '$eq' in operations:
+		literal = operations['$eq']
+		
+		if not isinstance(literal, Mapping) and not _regex(literal):
+			return literal
+	
+	return operations
+
+
+def _combine(a, b):
+	"""AND two comparisons against the same field into one, if possible, otherwise returning None."""
+	
+	if not _operators(a):
+		if isinstance(a, Mapping) or _regex(a):
+			return None
+		
+		a = odict((('$eq', a), ))
+	
+	if not _operators(b):
+		if isinstance(b, Mapping) or _regex(b):
+			return None
+		
+		b = odict((('$eq', b), ))
+	
+	if any(op in a or op in b for op in REGEX):
+		return _predicate(odict(a)) if _identical(a, b) else None
+	
+	result = odict(a)
+	
+	for op, arg in b.items():
+		if op not in result:
+			result[op] = arg
+			continue
+		
+		if op in LOWER or op in UPPER:
+			arg = _tighter(op, result[op], arg)
+			
+			if arg is None:
+				return None
+		
+		elif not _identical(result[op], arg):
+			return None
+		
+		result[op] = arg
+	
+	return _predicate(result)
+
+
+def _merge(result, remainder, clause):
+	"""AND a normalized clause into the clause being built, deferring to `$and` those parts which can not be."""
+	
+	for key, value in clause.items():
+		if key == '$and':  # Those which could not be merged with each other may yet be merged with us.
+			for member in value:
+				_merge(result, remainder, member)
+		
+		elif key not in result:
+			result[key] = value
+		
+		else:
+			combined = None if key.startswith('$') else _combine(result[key], value)
+			
+			if combined is None:
+				remainder.append(odict(((key, value), )))
+			else:
+				result[key] = combined
+
+
+def _disjunction(clauses):
+	"""Normalize the members of an `$or`, returning None if any matches everything."""
+	
+	members = []
+	
+	for clause in clauses:
+		clause = _clause(clause)
+		
+		if not clause:
+			return None
+		
+		if len(clause) == 1 and '$or' in clause:
+			members.extend(clause['$or'])
+		else:
+			members.append(clause)
+	
+	# Identify comparisons for equality (or inclusion) against the same field, to be replaced with a single `$in`.
+	
+	fields = odict()
+	
+	for i, clause in enumerate(members):
+		if len(clause) != 1:
+			continue
+		
+		key, value = next(iter(clause.items()))
+		
+		if key.startswith('$'):
+			continue
+		
+		if _operators(value):
+			if len(value) != 1 or '$in' not in value:
+				continue
+			
+			values = list(value['$in'])
+		
+		elif isinstance(value, Mapping):
+			continue
+		
+		else:
+			values = [value]
+		
+		fields.setdefault(key, []).append((i, values))
+	
+	replaced = {}
+	
+	for key, found in fields.items():
+		if len(found) < 2:
+			continue
+		
+		values = []
+		
+		for i, candidates in found:
+			replaced[i] = None
+			
+			for value in candidates:
+				if not any(type(value) is type(other) and value == other for other in values):
+					values.append(value)
+		
+		replaced[found[0][0]] = odict(((key, odict((('$in', values), ))), ))
+	
+	if replaced:
+		members = [replaced.get(i, clause) for i, clause in enumerate(members)]
+		members = [clause for clause in members if clause is not None]
+	
+	return members
+
+
+def _clause(clause):
+	"""Normalize a complete filter document, or a member of a logical operation."""
+	
+	result = odict()
+	remainder = []  # Clauses which could not be merged, to be ANDed explicitly.
+	
+	for key, value in clause.items():
+		if key == '$and':
+			for member in value:
+				_merge(result, remainder, _clause(member))
+		
+		elif key == '$or':
+			members = _disjunction(value)
+			
+			if members is None:
+				continue
+			
+			if len(members) == 1:
+				_merge(result, remainder, members[0])
+			else:
+				_merge(result, remainder, {'$or': members})
+		
+		elif key == '$nor':
+			_merge(result, remainder, {'$nor': [_clause(member) for member in value]})
+		
+		elif key.startswith('$'):  # Other top-level operators, such as $text, $where, or $expr, are left as-is.
+			_merge(result, remainder, {key: value})
+		
+		else:
+			value = _predicate(value)
+			
+			if value is not ANYTHING:
+				_merge(result, remainder, {key: value})
+	
+	if remainder:
+		result['$and'] = remainder
+	
+	return result
@@ -15,6 +15,7 @@ from operator import __and__, __or__, __xor__
 
 from ...schema.compat import py3, str, unicode
 from .ops import Filter
+from .template import Placeholder
 
 if __debug__:
 	_simple_safety_check = lambda s, o: (s.__allowed_operators__ and o not in s.__allowed_operators__) \
@@ -56,7 +57,7 @@ class Q(object):
 	* size
 	"""
 	
-	__slots__ = ('_document', '_field', '_name', '_combining')
+	__slots__ = ('_document', '_field', '_name', '_combining', '_resolved', '_cache')
 	
 	def __init__(self, document, field, path=None, combining=None):
 		"""Do not construct instances of Q yourself."""
@@ -65,6 +66,8 @@ class Q(object):
 		self._field = field
 		self._name = None if isinstance(field, list) else ((path or '') + unicode(field))
 		self._combining = combining
+		self._resolved = None  # The resolved type of a complex field, once nested fields have been referenced.
+		self._cache = None  # Proxies for nested fields, by name, once any have been referenced.
 	
 	def __repr__(self):
 		"""Programmers' representation for Q instances."""
@@ -80,12 +83,29 @@ class Q(object):
 		if not hasattr(self._field, '_kind'):
 			return getattr(self._field, name)
 		
-		kind = self._field
-		while getattr(kind, '_kind', None):
-			kind = kind._kind(self._document)
+		kind = self._resolved
+		
+		if kind is None:  # Resolving the kind may involve plugin lookup; only do so once.
+			kind = self._field
+			while getattr(kind, '_kind', None):
+				kind = kind._kind(self._document)
+			
+			self._resolved = kind
+		
+		cache = self._cache
+		
+		if cache is None:
+			cache = self._cache = {}
+		
+		nested = cache.get(name)
+		
+		# Re-use a prior proxy unless the nested field has since been redefined.
+		if nested is not None and getattr(kind, '__attributes__', {}).get(name) is nested._field:
+			return nested
 		
 		if hasattr(kind, '__fields__') and name in kind.__fields__:
-				return self.__class__(self._document, kind.__fields__[name], self._name + '.')
+			nested = cache[name] = self.__class__(self._document, kind.__fields__[name], self._name + '.')
+			return nested
 		
 		try:
 			return getattr(kind, name)
@@ -164,7 +184,10 @@ class Q(object):
 		if __debug__ and _complex_safety_check(f, {operation} | set(allowed)):  # pragma: no cover
 			raise NotImplementedError("{self!r} does not allow {op} comparison.".format(self=self, op=operation))
 		
-		if other is not None:
+		if isinstance(other, Placeholder):
+			other = other.bind(f, self._document)
+		
+		elif other is not None:
 			other = f.transformer.foreign(other, (f, self._document))
 		
 		return Filter({self._name: {operation: other}})
@@ -188,9 +211,16 @@ class Q(object):
 		
 		def _t(o):
 			for value in o:
-				yield None if value is None else f.transformer.foreign(value, (f, self._document))
+				if isinstance(value, Placeholder):
+					yield value.bind(f, self._document)
+				else:
+					yield None if value is None else f.transformer.foreign(value, (f, self._document))
 		
 		other = other if len(other) > 1 else other[0]
+		
+		if isinstance(other, Placeholder):  # A single placeholder stands in for the whole iterable of values.
+			return Filter({self._name: {operation: other.bind(f, self._document, many=True)}})
+		
 		values = list(_t(other))
 		
 		return Filter({self._name: {operation: values}})
@@ -233,6 +263,9 @@ class Q(object):
 		if __debug__ and _simple_safety_check(self._field, '$eq'):  # pragma: no cover
 			raise NotImplementedError("{self!r} does not allow $eq comparison.".format(self=self))
 		
+		if isinstance(other, Placeholder):
+			return Filter({self._name: other.bind(f, self._document)})
+		
 		return Filter({self._name: None if other is None else f.transformer.foreign(other, (f, self._document))})
 	
 	def __gt__(self, other):
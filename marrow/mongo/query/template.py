@@ -0,0 +1,242 @@
+# encoding: utf-8
+
+"""Prepared query templates, compiled once and populated with values many times.
+
+For example, given a document like:
+	
+	class Post(Document):
+		author = ObjectId()
+		published = Date()
+
+A query built with placeholders in place of values may be prepared:
+	
+	recent = prepare(Post, lambda D, p: (D.author == p.author) & (D.published <= p.now))
+
+Then populated with values; these are converted by the field each placeholder was compared against:
+	
+	Post.find(recent(author=user.id, now=utcnow()))
+"""
+
+from __future__ import unicode_literals
+
+from collections import Mapping
+
+from ...schema.compat import odict
+from .ops import Filter
+
+
+__all__ = ['Placeholder', 'Template', 'prepare']
+
+LIMIT = 128  # The number of templates retained per Document class, least recently used are discarded first.
+
+
+class Placeholder(object):
+	"""A named stand-in for a value to be supplied later, used in place of values when building a template."""
+	
+	__slots__ = ('name', )
+	
+	def __init__(self, name):
+		self.name = name
+	
+	def __repr__(self):
+		return "Placeholder({0!r})".format(self.name)
+	
+	def bind(self, field, document, many=False):
+		"""Associate this placeholder with the field, and document class, whose values it stands in for."""
+		
+		return Slot(self.name, field, document, many)
+
+
+class Slot(object):
+	"""A placeholder bound to a field, converting the values supplied for it. For internal use only."""
+	
+	__slots__ = ('name', 'field', 'document', 'many')
+	
+	def __init__(self, name, field, document, many=False):
+		self.name = name
+		self.field = field
+		self.document = document
+		self.many = many  # The value is an iterable of values, each of which is to be converted.
+	
+	def __repr__(self):
+		return "Slot({0!r}, {1!r}{2})".format(self.name, self.field, ", many=True" if self.many else "")
+	
+	def convert(self, values):
+		value = values[self.name]
+		foreign = self.field.transformer.foreign
+		context = (self.field, self.document)
+		
+		if self.many:
+			return [None if i is None else foreign(i, context) for i in value]
+		
+		return None if value is None else foreign(value, context)
+
+
+class Placeholders(object):
+	"""Produce placeholders through attribute access, e.g. `p.author`."""
+	
+	__slots__ = ()
+	
+	def __getattr__(self, name):
+		if name.startswith('__'):
+			raise AttributeError(name)
+		
+		return Placeholder(name)
+
+
+def _compile(value, names):
+	"""Produce a callable constructing a copy of the given value with its slots populated, or None if it has none.
+	
+	Containers not containing slots are shared between every result, rather than copied.
+	"""
+	
+	if isinstance(value, Slot):
+		names.add(value.name)
+		return value.convert
+	
+	if isinstance(value, Mapping):
+		static = value.__class__() if isinstance(value, dict) else odict()
+		dynamic = []
+		
+		for key, item in value.items():
+			build = _compile(item, names)
+			
+			if build is None:
+				static[key] = item
+			else:
+				static[key] = None  # Preserve the key's position.
+				dynamic.append((key, build))
+		
+		if not dynamic:
+			return None
+		
+		def build_mapping(values):
+			result = static.copy()
+			
+			for key, build in dynamic:
+				result[key] = build(values)
+			
+			return result
+		
+		return build_mapping
+	
+	if isinstance(value, (list, tuple)):
+		builders = [_compile(item, names) for item in value]
+		
+		if not any(builders):
+			return None
+		
+		items = [(item, build) for item, build in zip(value, builders)]
+		
+		def build_sequence(values):
+			return [item if build is None else build(values) for item, build in items]
+		
+		return build_sequence
+	
+	return None
+
+
+class Template(object):
+	"""A compiled query shape, producing a new Filter each time it is called with values for its placeholders."""
+	
+	__slots__ = ('document', 'names', 'shape', 'hits', 'calls', '_build')
+	
+	def __init__(self, document, builder):
+		"""Build the query, using placeholders for values, and compile the result."""
+		
+		shape = builder(document, Placeholders())
+		shape = shape.as_query if hasattr(shape, 'as_query') else shape
+		names = set()
+		
+		self.document = document
+		self.shape = shape  # The query as built, containing Slot instances in place of values.
+		self._build = _compile(shape, names)
+		self.names = frozenset(names)
+		self.hits = 0  # The number of times this template was retrieved from cache by `prepare`.
+		self.calls = 0  # The number of queries produced from this template.
+	
+	def __repr__(self):
+		return "Template({0}, {1!r})".format(self.document.__name__, self.shape)
+	
+	def __call__(self, **values):
+		"""Produce a Filter from this template using the given values for its placeholders."""
+		
+		if len(values) != len(self.names) or not self.names.issuperset(values):
+			missing = self.names.difference(values)
+			unknown = set(values).difference(self.names)
+			
+			raise TypeError("Template {0}{1}{2}".format(
+					"missing values for: " + ", ".join(sorted(missing)) if missing else "",
+					"; " if missing and unknown else "",
+					"given unknown values: " + ", ".join(sorted(unknown)) if unknown else "",
+				))
+		
+		self.calls += 1
+		
+		operations = self.shape.copy() if self._build is None else self._build(values)
+		
+		return Filter(operations, document=self.document)
+	
+	bind = __call__
+
+
+def _key(builder):
+	"""Identify a template builder by its code, and the values it closes over or defaults to, if able.
+	
+	Captured values are identified by type as well as value, as equal values of differing type, such as `1` and
+	`True`, may produce differing queries.
+	
+	Returns None if the builder can not safely be identified; repeated definition of the same lambda or function
+	within a function produces distinct function objects sharing the same code.
+	"""
+	
+	code = getattr(builder, '__code__', None)
+	
+	if code is None:
+		return None
+	
+	try:
+		captured = [cell.cell_contents for cell in builder.__closure__ or ()]
+		captured.extend(builder.__defaults__ or ())
+		key = (code, tuple((type(value), value) for value in captured))
+		
+		hash(key)
+	
+	except (TypeError, ValueError):  # Unhashable, or a closure cell not yet populated.
+		return None
+	
+	return key
+
+
+def prepare(document, builder):
+	"""Prepare a query template for the given Document class, re-using one previously compiled if possible.
+	
+	The builder is called with the Document class and an object producing placeholders through attribute access. It
+	must use placeholders for any value varying between uses. Templates are cached per Document class; any values
+	captured by the builder through closure or defaults are considered when identifying it. At most `LIMIT` templates
+	are retained per class, discarding the least recently used, so builders capturing ever-changing values are safe,
+	if wasteful.
+	"""
+	
+	templates = document.__dict__.get('__templates__')
+	
+	if templates is None:
+		templates = document.__templates__ = odict()
+	
+	key = _key(builder)
+	template = templates.pop(key, None) if key is not None else None
+	
+	if template is not None:
+		templates[key] = template  # Mark as most recently used.
+		template.hits += 1
+		return template
+	
+	template = Template(document, builder)
+	
+	if key is not None:
+		templates[key] = template
+		
+		while len(templates) > LIMIT:
+			templates.popitem(last=False)
+	
+	return template
@@ -0,0 +1,220 @@
+# encoding: utf-8
+
+"""Accumulate writes of many Documents, issuing them to the server in batches.
+	
+	with Person.bulk(batch=1000) as bulk:
+		for person in people:
+			bulk.insert(person)
+		
+		bulk.update(alice, inc__age=1)
+		bulk.delete(bob)
+	
+	print(bulk.result.inserted, bulk.result.errors)
+
+Requests are flushed automatically once `batch` requests, or, if given, `size` bytes of inserted and replacement
+documents, have accumulated, and once more when the block completes without error. Errors are reported per Document
+rather than raised; when `ordered`, the first error stops all remaining requests, which are reported as `skipped`.
+
+Should the block raise an exception, requests not yet flushed are discarded rather than issued, and their Documents
+reported as `skipped`; batches already flushed are not undone. Call `flush` before leaving the block to issue them.
+"""
+
+from __future__ import division, unicode_literals
+
+from bson import BSON
+from bson.raw_bson import RawBSONDocument
+from pymongo import DeleteOne, InsertOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from ..param import U
+from ..query import Update
+from .stats import perf_counter
+
+
+__all__ = ['Bulk', 'BulkResult']
+
+
+class BulkResult(object):
+	"""The aggregated outcome of the batches issued by a Bulk writer."""
+	
+	__slots__ = ('batches', 'inserted', 'matched', 'modified', 'deleted', 'upserted', 'errors', 'skipped', 'elapsed')
+	
+	def __init__(self):
+		self.batches = 0
+		self.inserted = 0
+		self.matched = 0
+		self.modified = 0
+		self.deleted = 0
+		self.upserted = []  # The identifiers of records created by upserts.
+		self.errors = []  # Tuples of (document, error details) for requests rejected by the server.
+		self.skipped = []  # Documents whose requests were never attempted, due to an earlier error when ordered.
+		self.elapsed = 0.0  # The number of seconds spent writing.
+	
+	def __repr__(self):
+		return "BulkResult(inserted={0.inserted}, matched={0.matched}, modified={0.modified}, " \
+				"deleted={0.deleted}, upserted={1}, errors={2})".format(self, len(self.upserted), len(self.errors))
+	
+	def __bool__(self):
+		return not self.errors and not self.skipped
+	
+	__nonzero__ = __bool__  # Python 2
+	
+	@property
+	def rate(self):
+		"""The number of records written per second."""
+		
+		written = self.inserted + self.matched + self.deleted + len(self.upserted)
+		return written / self.elapsed if self.elapsed else 0.0
+	
+	def add(self, details):
+		"""Accumulate the counts from the raw result of a bulk write, or the details of a BulkWriteError."""
+		
+		self.batches += 1
+		self.inserted += details.get('nInserted', 0)
+		self.matched += details.get('nMatched', 0)
+		self.modified += details.get('nModified', 0)
+		self.deleted += details.get('nRemoved', 0)
+		self.upserted.extend(i['_id'] for i in details.get('upserted', ()))
+
+
+class Bulk(object):
+	"""Accumulate requests to insert, update, replace, and delete Documents, writing them in batches."""
+	
+	__slots__ = ('document', 'collection', 'ordered', 'batch', 'size', 'validate', 'result', '_requests',
+			'_documents', '_clear', '_bytes')
+	
+	def __init__(self, document, collection, ordered=False, batch=1000, size=None, validate=True):
+		self.document = document
+		self.collection = collection
+		self.ordered = ordered
+		self.batch = batch
+		self.size = size
+		self.validate = validate
+		self.result = BulkResult()
+		
+		self._requests = []
+		self._documents = []  # The Document each request was made on behalf of.
+		self._clear = []  # Whether each request persists the complete state of its Document.
+		self._bytes = 0
+	
+	def __len__(self):
+		"""The number of requests pending."""
+		
+		return len(self._requests)
+	
+	def __enter__(self):
+		return self
+	
+	def __exit__(self, kind, value, traceback):
+		"""Flush pending requests on success; on failure discard them, reporting their Documents as `skipped`."""
+		
+		if kind is None:
+			self.flush()
+		else:
+			self.result.skipped.extend(self.discard())
+	
+	def _add(self, request, document, clear=False, payload=None):
+		if self.ordered and self.result.errors:  # An earlier failure prevents any further requests.
+			self.result.skipped.append(document)
+			return self
+		
+		self._requests.append(request)
+		self._documents.append(document)
+		self._clear.append(clear)
+		
+		if self.size and payload is not None:
+			self._bytes += len(payload.raw) if isinstance(payload, RawBSONDocument) else len(BSON.encode(payload))
+		
+		if len(self._requests) >= self.batch or (self.size and self._bytes >= self.size):
+			self.flush()
+		
+		return self
+	
+	def insert(self, document):
+		return self._add(InsertOne(document), document, True, document)
+	
+	def replace(self, document, upsert=False):
+		return self._add(ReplaceOne({'_id': document['_id']}, document, upsert=upsert), document, True, document)
+	
+	def update(self, document, update=None, upsert=False, **kw):
+		"""Queue an update to a Document, given as an Update or mapping, and/or parametrically, as per `update_one`."""
+		
+		update = Update(update or {})
+		
+		if kw:
+			update &= U(document.__class__, **kw)
+		
+		if not update:
+			raise TypeError("Must provide an update operation.")
+		
+		return self._add(UpdateOne({'_id': document['_id']}, update, upsert=upsert), document)
+	
+	def save(self, document, upsert=True):
+		"""Queue the persistence of the changes made to a Document, as per `save`. Unchanged Documents are ignored."""
+		
+		update = document.changes()
+		
+		if not update:
+			return self
+		
+		return self._add(UpdateOne({'_id': document['_id']}, update, upsert=upsert), document, True)
+	
+	def delete(self, document):
+		return self._add(DeleteOne({'_id': document['_id']}), document)
+	
+	def discard(self):
+		"""Forget any pending requests, returning the Documents they were made on behalf of."""
+		
+		documents = self._documents
+		self._requests, self._documents, self._clear, self._bytes = [], [], [], 0
+		
+		return documents
+	
+	def flush(self):
+		"""Issue any pending requests, returning the aggregated result of all batches issued so far."""
+		
+		if not self._requests:
+			return self.result
+		
+		requests, documents, clear = self._requests, self._documents, self._clear
+		self._requests, self._documents, self._clear, self._bytes = [], [], [], 0
+		
+		failed = set()
+		started = perf_counter()
+		
+		try:
+			result = self.collection.bulk_write(requests, ordered=self.ordered,
+					bypass_document_validation=not self.validate)
+		
+		except BulkWriteError as e:
+			self.result.add(e.details)
+			
+			for error in e.details.get('writeErrors', ()):
+				failed.add(error['index'])
+				self.result.errors.append((documents[error['index']], error))
+			
+			if self.ordered and failed:  # Requests following the failure were not attempted.
+				last = max(failed)
+				self.result.skipped.extend(documents[last + 1:])
+				documents = documents[:last + 1]
+		
+		else:
+			if result.acknowledged:
+				self.result.add(result.bulk_api_result)
+		
+		self.result.elapsed += perf_counter() - started
+		
+		if hasattr(self.document, '_record'):
+			self.document._record('bulk_write', {}, started, len(documents) - len(failed))
+		
+		for i, document in enumerate(documents):
+			if i in failed:
+				continue
+			
+			if clear[i]:
+				document._clear_changes()
+			
+			if hasattr(document, '_invalidate'):
+				document._invalidate(self.collection)
+		
+		return self.result
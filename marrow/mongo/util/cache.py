@@ -0,0 +1,259 @@
+# encoding: utf-8
+
+"""A read-through, size and age bounded cache of records retrieved by primary key.
+
+Enabled per Document class by declaration:
+	
+	class Profile(Queryable):
+		__cache__ = {'size': 10000, 'ttl': 30}  # Retain up to 10,000 records for up to 30 seconds each.
+
+`Queryable.find_one` lookups by primary key alone are then answered from the cache when possible. Caches are shared
+by all Document classes bound to the same collection on the same server, and are invalidated by this process' own
+writes through `insert_one`, `update_one`, `save`, and `delete_one`. Changes made by other processes are only observed
+once cached records expire, unless a listener is running to invalidate them as they happen; declare `'listen': True`
+to watch a change stream (requiring a replica set), or start one explicitly, optionally tailing the oplog instead:
+	
+	Profile.get_cache().listen(Profile.get_collection(), oplog=client.local.oplog.rs)
+
+The stored representation of each record is cached; a new Document instance is produced for each hit.
+"""
+
+from __future__ import unicode_literals
+
+from collections import Mapping, OrderedDict
+from copy import deepcopy
+from threading import Event, Lock, Thread
+
+from bson.raw_bson import RawBSONDocument
+
+from .capped import tail
+from .stats import perf_counter
+
+
+__all__ = ['DocumentCache', 'Listener', 'identify', 'caches', 'cached', 'cache_for']
+
+
+def identify(query):
+	"""Return the primary key a query selects by, if it selects by primary key alone, otherwise None."""
+	
+	query = query.as_query if hasattr(query, 'as_query') else query
+	
+	if len(query) != 1 or '_id' not in query:
+		return None
+	
+	identifier = query['_id']
+	
+	if isinstance(identifier, Mapping):
+		if list(identifier) != ['$eq']:
+			return None
+		
+		identifier = identifier['$eq']
+	
+	return identifier
+
+
+class DocumentCache(object):
+	"""A thread-safe least-recently-used mapping of primary keys to stored records, expiring records after `ttl` seconds.
+	
+	Counters of `hits`, `misses`, `evictions` (due to size or age), and `invalidations` are maintained. The
+	`generation` is advanced by every invalidation; pass the value observed prior to retrieving a record to `set` to
+	avoid caching a record which may have been changed while it was being retrieved.
+	"""
+	
+	__slots__ = ('size', 'ttl', 'hits', 'misses', 'evictions', 'invalidations', 'generation', '_entries', '_lock')
+	
+	def __init__(self, size=1000, ttl=None):
+		self.size = size
+		self.ttl = ttl
+		self.hits = self.misses = self.evictions = self.invalidations = self.generation = 0
+		self._entries = OrderedDict()  # Mapping of primary key to (expiry, record) tuples, least recently used first.
+		self._lock = Lock()
+	
+	def __repr__(self):
+		return "DocumentCache({0}/{1}, ttl={2})".format(len(self._entries), self.size, self.ttl)
+	
+	def __len__(self):
+		return len(self._entries)
+	
+	def __contains__(self, identifier):
+		return identifier in self._entries
+	
+	def get(self, identifier):
+		"""Retrieve a copy of the record cached under the given primary key, or None."""
+		
+		with self._lock:
+			entry = self._entries.get(identifier)
+			
+			if entry is None:
+				self.misses += 1
+				return None
+			
+			expires, record = entry
+			
+			if expires is not None and expires <= perf_counter():
+				del self._entries[identifier]
+				self.evictions += 1
+				self.misses += 1
+				return None
+			
+			self._entries[identifier] = self._entries.pop(identifier)  # Mark as most recently used.
+			self.hits += 1
+		
+		return record if isinstance(record, RawBSONDocument) else deepcopy(record)
+	
+	def set(self, identifier, record, generation=None):
+		"""Cache a copy of a record, as retrieved from the server, under the given primary key.
+		
+		If a `generation` is given and any invalidation has happened since, the record is not cached.
+		"""
+		
+		if not isinstance(record, RawBSONDocument):
+			record = deepcopy(record)
+		
+		expires = perf_counter() + self.ttl if self.ttl else None
+		
+		with self._lock:
+			if generation is not None and generation != self.generation:
+				return
+			
+			self._entries.pop(identifier, None)
+			self._entries[identifier] = (expires, record)
+			
+			while len(self._entries) > self.size:
+				self._entries.popitem(last=False)
+				self.evictions += 1
+	
+	def invalidate(self, identifier):
+		"""Discard any record cached under the given primary key."""
+		
+		with self._lock:
+			self.generation += 1
+			
+			if self._entries.pop(identifier, None) is not None:
+				self.invalidations += 1
+	
+	def clear(self):
+		with self._lock:
+			self.generation += 1
+			self.invalidations += len(self._entries)
+			self._entries.clear()
+	
+	def as_dict(self):
+		return {
+				'size': len(self._entries),
+				'capacity': self.size,
+				'ttl': self.ttl,
+				'hits': self.hits,
+				'misses': self.misses,
+				'evictions': self.evictions,
+				'invalidations': self.invalidations,
+			}
+	
+	def listen(self, collection, oplog=None):
+		"""Start invalidating records as they are changed by any client, returning the running Listener."""
+		
+		listener = Listener(self, collection, oplog)
+		listener.start()
+		
+		return listener
+
+
+class Listener(Thread):
+	"""A background thread invalidating cached records as changes to them are reported by the server.
+	
+	Changes are observed using a change stream on the collection, or, if given an oplog collection, by tailing it.
+	Should the stream fail, the entire cache is cleared, as changes may have been missed.
+	"""
+	
+	def __init__(self, cache, collection, oplog=None):
+		super(Listener, self).__init__(name="DocumentCache listener for " + collection.full_name)
+		
+		self.daemon = True
+		self.cache = cache
+		self.collection = collection
+		self.oplog = oplog
+		self._stopping = Event()
+	
+	def stop(self):
+		self._stopping.set()
+	
+	def run(self):
+		try:
+			if self.oplog is None:
+				self._changes()
+			else:
+				self._tail()
+		
+		finally:
+			self.cache.clear()
+	
+	def _changes(self):
+		with self.collection.watch(max_await_time_ms=1000) as stream:
+			while not self._stopping.is_set():
+				change = stream.try_next()
+				
+				if change is None:
+					continue
+				
+				if 'documentKey' in change:
+					self.cache.invalidate(change['documentKey']['_id'])
+				
+				elif change.get('operationType') in ('drop', 'rename', 'dropDatabase', 'invalidate'):
+					self.cache.clear()
+					return
+	
+	def _tail(self):
+		query = {'ns': self.collection.full_name}
+		latest = next(iter(self.oplog.find({}, {'ts': 1}, sort=[('$natural', -1)], limit=1)), None)
+		
+		while not self._stopping.is_set():
+			if latest is not None:  # Resume from the last entry seen.
+				query['ts'] = {'$gt': latest['ts']}
+			
+			for latest in tail(self.oplog, query, timeout=1):
+				if self._stopping.is_set():
+					return
+				
+				identifier = (latest.get('o2') or latest.get('o') or {}).get('_id')
+				
+				if identifier is not None:
+					self.cache.invalidate(identifier)
+
+
+caches = {}  # The process-wide mapping of (client identity, collection name) to the caches of records within them.
+_creation = Lock()
+
+
+def _key(collection):
+	# The client's address would require server selection, on every write, and is unavailable when load balancing.
+	return (id(collection.database.client), collection.full_name)
+
+
+def cached(collection):
+	"""Retrieve the cache of the given collection, if one has been created."""
+	
+	if not caches:  # The common case; no Document class declares a cache.
+		return None
+	
+	return caches.get(_key(collection))
+
+
+def cache_for(collection, declaration):
+	"""Retrieve, or create, the cache of the given collection as declared by a Document class."""
+	
+	key = _key(collection)
+	cache = caches.get(key)
+	
+	if cache is not None:
+		return cache
+	
+	with _creation:
+		cache = caches.get(key)
+		
+		if cache is None:
+			cache = caches[key] = DocumentCache(declaration.get('size', 1000), declaration.get('ttl'))
+			
+			if declaration.get('listen'):
+				cache.listen(collection)
+	
+	return cache
@@ -0,0 +1,378 @@
+# encoding: utf-8
+
+"""A typed, lazily hydrating wrapper around PyMongo cursors, as returned by `Queryable.find`.
+	
+	for person in Person.find(Person.age > 18).sort('name').batch_size(500):
+		print(person.name)
+
+Records are converted to Document instances only as they are iterated, with the classes referenced by any
+`__type_store__` values loaded once per distinct value. Several fast paths avoid hydration entirely, projecting only
+the data they require: `exists`, `ids`, and `scalar`.
+
+Passing `prefetch=True` (or a number of records to buffer) to `find` retrieves records on a background thread, so
+that the next batch is fetched from the server while the caller is still processing the current one. Such cursors
+should be closed, or used as context managers, if not fully consumed.
+"""
+
+from __future__ import unicode_literals
+
+from functools import wraps
+from threading import Event, Thread
+
+from ...package.loader import traverse
+from ..param import S
+from .stats import perf_counter
+from .unit import current
+
+try:
+	from queue import Empty, Full, Queue
+except ImportError:  # pragma: no cover
+	from Queue import Empty, Full, Queue
+
+
+__all__ = ['DocumentCursor']
+
+
+_DONE = object()  # Marker placed on the prefetch queue once the underlying cursor has been exhausted.
+
+
+class _Failure(object):
+	"""Wrap an exception raised within the prefetching thread, to be re-raised within the consumer."""
+	
+	__slots__ = ('exception', )
+	
+	def __init__(self, exception):
+		self.exception = exception
+
+
+def _produce(cursor, queue, stop):
+	"""Feed records from the cursor into the queue until exhausted, or until asked to stop."""
+	
+	def put(item):
+		while not stop.is_set():
+			try:
+				queue.put(item, timeout=0.1)
+			except Full:
+				continue
+			
+			return True
+		
+		return False  # The consumer has gone away.
+	
+	try:
+		for record in cursor:
+			if not put(record):
+				return
+	
+	except Exception as e:  # pylint:disable=broad-except -- propagated to the consumer.
+		put(_Failure(e))
+		return
+	
+	put(_DONE)
+
+
+def _extract(record, path):
+	"""Retrieve the value at the given dot-separated path of a record, or None if missing."""
+	
+	for part in path.split('.'):
+		if not hasattr(record, 'get'):
+			return None
+		
+		record = record.get(part)
+	
+	return record
+
+
+class DocumentCursor(object):
+	"""Iterate the results of a query as instances of the Document class that issued it.
+	
+	Methods and attributes not otherwise defined are passed through to the wrapped PyMongo cursor, with chained calls
+	returning this wrapper. The `options` recorded are those the query was issued with, updated by use of `sort`,
+	`skip`, `limit`, `batch_size`, and slicing.
+	"""
+	
+	__slots__ = ('document', 'collection', 'query', 'options', 'cursor', 'prefetch', 'unit', '_kinds', '_thread',
+			'_queue', '_stop', '_elapsed', '_count', '_size', '_recorded')
+	
+	def __init__(self, document, collection, query, options, prefetch=False):
+		self.document = document
+		self.collection = collection
+		self.query = query
+		self.options = options
+		self.cursor = collection.find(query, **options)
+		self.prefetch = prefetch
+		self.unit = None if 'projection' in options else current()  # Partially loaded records are not registered.
+		
+		self._kinds = {}  # Memoized `__type_store__` class lookups.
+		self._thread = self._queue = self._stop = None
+		self._elapsed = 0.0  # Time spent waiting on the server (or prefetching thread).
+		self._count = 0
+		self._size = 0
+		self._recorded = False
+	
+	def __repr__(self):
+		return "{0}({1}, {2!r})".format(self.__class__.__name__, self.document.__name__, self.query)
+	
+	def __getattr__(self, name):
+		if name in self.__slots__:  # Not yet assigned; avoid infinite recursion.
+			raise AttributeError(name)
+		
+		attribute = getattr(self.cursor, name)
+		
+		if not callable(attribute):
+			return attribute
+		
+		@wraps(attribute)
+		def passthrough(*args, **kw):
+			result = attribute(*args, **kw)
+			return self if result is self.cursor else result
+		
+		return passthrough
+	
+	def __enter__(self):
+		return self
+	
+	def __exit__(self, kind, value, traceback):
+		self.close()
+	
+	def __del__(self):
+		if getattr(self, '_stop', None) is not None:
+			self._stop.set()
+	
+	# Iteration
+	
+	def __iter__(self):
+		return self
+	
+	def __next__(self):
+		while True:
+			record = self._fetch()
+			
+			if record is None:
+				raise StopIteration()
+			
+			if self.unit is not None:  # Records already loaded within the unit of work are not hydrated again.
+				existing = self.unit.get(self.collection, record.get('_id'))
+				
+				if existing is not None:
+					return existing
+			
+			instance = self.document.from_mongo(record, kinds=self._kinds)
+			
+			if instance is None:  # Cooperative behaviours, such as Expires, may elect to omit records.
+				continue
+			
+			if self.unit is not None:
+				instance = self.unit.add(instance, self.collection)
+			
+			return instance
+	
+	next = __next__  # Python 2
+	
+	def _fetch(self):
+		"""Retrieve the next raw record, or None once exhausted."""
+		
+		started = perf_counter()
+		
+		try:
+			if self.prefetch:
+				record = self._receive()
+			else:
+				record = next(self.cursor, None)
+		finally:
+			self._elapsed += perf_counter() - started
+		
+		if record is None:
+			self._record()
+			return None
+		
+		count, size = self.document._measure(record)
+		self._count += count
+		self._size += size
+		
+		return record
+	
+	def _receive(self):
+		if self._thread is None:
+			size = self.prefetch if self.prefetch is not True else (self.options.get('batch_size') or 101)
+			
+			self._queue = Queue(size)
+			self._stop = Event()
+			self._thread = Thread(target=_produce, args=(self.cursor, self._queue, self._stop))
+			self._thread.daemon = True
+			self._thread.start()
+		
+		if self._stop.is_set():
+			return None
+		
+		item = self._queue.get()
+		
+		if item is _DONE:
+			self._stop.set()
+			return None
+		
+		if isinstance(item, _Failure):
+			self._stop.set()
+			raise item.exception
+		
+		return item
+	
+	def _record(self):
+		"""Record the cost of the query once the results have been consumed, or the cursor closed."""
+		
+		if self._recorded:
+			return
+		
+		self._recorded = True
+		
+		# Attributed as if begun the accumulated waiting time ago, excluding time spent by the caller between records.
+		self.document._record('find', self.query, perf_counter() - self._elapsed, self._count, self._size)
+	
+	def close(self):
+		"""Stop any prefetching and release the server-side cursor."""
+		
+		if self._stop is not None:
+			self._stop.set()
+			
+			try:  # Release a producer blocked on a full queue.
+				self._queue.get_nowait()
+			except Empty:
+				pass
+			
+			self._thread.join()
+		
+		self.cursor.close()
+		self._record()
+	
+	# Chained Options
+	
+	def clone(self):
+		"""Produce an unevaluated copy of this cursor, with the same query and options."""
+		
+		return self.__class__(self.document, self.collection, self.query, dict(self.options), self.prefetch)
+	
+	def _peek(self, limit, offset=0):
+		"""Produce a copy of this cursor retrieving at most a few records, from an offset into the results."""
+		
+		cursor = self.__class__(self.document, self.collection, self.query, dict(self.options))
+		
+		if offset:
+			cursor.skip(self.options.get('skip', 0) + offset)
+		
+		return cursor.limit(limit)
+	
+	def sort(self, *fields):
+		"""Order the results, accepting parametric field references as per `S`, or `(field, direction)` tuples."""
+		
+		self.options['sort'] = S(self.document, *fields)
+		self.cursor.sort(self.options['sort'])
+		return self
+	
+	def skip(self, count):
+		self.options['skip'] = count
+		self.cursor.skip(count)
+		return self
+	
+	def limit(self, count):
+		self.options['limit'] = count
+		self.cursor.limit(count)
+		return self
+	
+	def batch_size(self, count):
+		"""Adjust the number of records retrieved from the server per round trip."""
+		
+		self.options['batch_size'] = count
+		self.cursor.batch_size(count)
+		return self
+	
+	def __getitem__(self, index):
+		"""Retrieve the Document at a given position, or limit the results to a slice of them."""
+		
+		if isinstance(index, slice):
+			if index.step is not None:
+				raise IndexError("Cursor slices do not support a step.")
+			
+			start = index.start or 0
+			
+			if start:
+				self.skip(self.options.get('skip', 0) + start)
+			
+			if index.stop is not None:
+				if index.stop <= start:
+					raise IndexError("Cursor slices must select at least one record.")
+				
+				self.limit(index.stop - start)
+			
+			return self
+		
+		if index < 0:
+			raise IndexError("Cursors do not support negative indexes.")
+		
+		for instance in self._peek(-1, index):
+			return instance
+		
+		raise IndexError("No such item in cursor.")
+	
+	# Retrieval Shortcuts
+	
+	def first(self):
+		"""Return the first matching Document, or None if there are no results."""
+		
+		for instance in self._peek(-1):
+			return instance
+	
+	def one(self):
+		"""Return the only matching Document, raising LookupError if there are none, ValueError if there are several."""
+		
+		results = list(self._peek(2))
+		
+		if not results:
+			raise LookupError("No document matched the query.")
+		
+		if len(results) > 1:
+			raise ValueError("More than one document matched the query.")
+		
+		return results[0]
+	
+	def _derive(self, projection, limit=None):
+		"""Issue a variant of this query retrieving only the given projection, bypassing hydration."""
+		
+		options = {k: v for k, v in self.options.items() if k not in ('projection', 'cursor_type')}
+		options['projection'] = projection
+		
+		if limit is not None:
+			options['limit'] = limit
+		
+		return self.collection.find(self.query, **options)
+	
+	def exists(self):
+		"""Determine if any record matches, retrieving only the identifier of, at most, one."""
+		
+		for record in self._derive({'_id': 1}, -1):
+			return True
+		
+		return False
+	
+	def ids(self):
+		"""Iterate the identifiers of the matching records, without retrieving any other data."""
+		
+		for record in self._derive({'_id': 1}):
+			yield record['_id']
+	
+	def scalar(self, field):
+		"""Iterate the values of a single field, by name or reference, across the matching records, in stored form.
+		
+		Missing values are yielded as None.
+		"""
+		
+		if not hasattr(field, '__name__'):
+			field = traverse(self.document, field)
+		
+		path = ~field
+		projection = {path: 1}
+		
+		if path != '_id':
+			projection['_id'] = 0
+		
+		for record in self._derive(projection):
+			yield _extract(record, path)
@@ -0,0 +1,143 @@
+# encoding: utf-8
+
+"""Insert a large, lazily produced, sequence of Documents in chunks, concurrently.
+	
+	result = Article.insert_many(parse(feed), chunk=1000, workers=4)
+	print(result.inserted, "articles imported at", result.rate, "per second")
+
+The iterable is consumed one chunk at a time; at most a small, fixed number of chunks per worker are held in memory
+at any moment, regardless of the size of the input. Chunks are sent using unordered `insert_many` calls from a pool of
+threads sharing the Document class' collection, and thus its client and write concern.
+
+Encoding BSON is CPU-bound and, within a single process, serialized by the GIL. Pass `processes` to encode chunks in
+a pool of that many processes instead, handing the threads pre-encoded documents; this requires the values stored
+within the documents be picklable, and is only of benefit for documents expensive to encode.
+
+Write errors, such as duplicate keys, are collected per document rather than raised.
+"""
+
+from __future__ import unicode_literals
+
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import ThreadPool
+
+from bson import BSON, ObjectId
+from bson.raw_bson import RawBSONDocument
+from pymongo.errors import BulkWriteError
+
+from .bulk import BulkResult
+from .stats import perf_counter
+
+
+__all__ = ['insert_many']
+
+
+def _chunked(iterable, size):
+	iterator = iter(iterable)
+	
+	while True:
+		chunk = list(islice(iterator, size))
+		
+		if not chunk:
+			return
+		
+		yield chunk
+
+
+def _encode(records, codec_options):
+	"""Encode a chunk of records as BSON. Executed within a worker process."""
+	
+	return [BSON.encode(record, codec_options=codec_options) for record in records]
+
+
+def _send(document, collection, documents, payload, validate):
+	"""Insert a chunk, returning the raw result details. Executed within a worker thread."""
+	
+	started = perf_counter()
+	
+	try:
+		result = collection.insert_many(payload, ordered=False, bypass_document_validation=not validate)
+	
+	except BulkWriteError as e:
+		details = e.details
+	
+	else:
+		details = {'nInserted': len(result.inserted_ids) if result.acknowledged else 0}
+	
+	if hasattr(document, '_record'):
+		document._record('insert_many', {}, started, details.get('nInserted', 0))
+	
+	return documents, details
+
+
+def insert_many(document, collection, iterable, chunk=1000, workers=None, processes=None, validate=True):
+	"""Insert the documents produced by the given iterable, returning a BulkResult.
+	
+	Up to `workers` chunks, defaulting to the number of processors, are inserted at once.
+	"""
+	
+	workers = workers or cpu_count()
+	result = BulkResult()
+	threads = ThreadPool(workers)
+	encoder = Pool(processes) if processes else None
+	encoding = deque()  # Chunks being encoded, in the order they were read.
+	sending = deque()  # Chunks being inserted.
+	started = perf_counter()
+	
+	def received(documents, details):
+		result.add(details)
+		failed = set()
+		
+		for error in details.get('writeErrors', ()):
+			failed.add(error['index'])
+			result.errors.append((documents[error['index']], error))
+		
+		for i, record in enumerate(documents):
+			if i not in failed and hasattr(record, '_clear_changes'):
+				record._clear_changes()
+	
+	def send(documents, payload):
+		sending.append(threads.apply_async(_send, (document, collection, documents, payload, validate)))
+		
+		if len(sending) > workers:  # Wait for the oldest outstanding chunk before reading any more.
+			received(*sending.popleft().get())
+	
+	def encoded():
+		documents, payload = encoding.popleft()
+		send(documents, [RawBSONDocument(i) for i in payload.get()])
+	
+	try:
+		for documents in _chunked(iterable, chunk):
+			if encoder is None:
+				send(documents, documents)
+				continue
+			
+			for record in documents:
+				if '_id' not in record:  # As the driver would, were it encoding the record itself.
+					record['_id'] = ObjectId()
+			
+			records = [getattr(record, '__data__', record) for record in documents]
+			encoding.append((documents, encoder.apply_async(_encode, (records, collection.codec_options))))
+			
+			if len(encoding) > processes:
+				encoded()
+		
+		while encoding:
+			encoded()
+		
+		while sending:
+			received(*sending.popleft().get())
+	
+	finally:
+		threads.close()
+		threads.join()
+		
+		if encoder is not None:
+			encoder.close()
+			encoder.join()
+	
+	result.elapsed = perf_counter() - started
+	
+	return result
@@ -0,0 +1,126 @@
+# encoding: utf-8
+
+"""A mutable, lazily decoded view over raw BSON data as retrieved from MongoDB."""
+
+from __future__ import unicode_literals
+
+from collections import MutableMapping
+
+from bson.codec_options import _RAW_BSON_DOCUMENT_MARKER
+from bson.raw_bson import RawBSONDocument
+
+from ...schema.compat import odict
+
+
+__all__ = ['RawDocument', 'adopt']
+
+
+def adopt(value):
+	"""Wrap raw BSON documents, including those nested within arrays, to permit their in-place modification."""
+	
+	if isinstance(value, RawBSONDocument):
+		return RawDocument(value)
+	
+	if isinstance(value, list):
+		return [adopt(i) for i in value]
+	
+	return value
+
+
+class RawDocument(MutableMapping):
+	"""Present a `RawBSONDocument` as a mutable mapping, decoding values only as they are requested.
+	
+	The top-level of the underlying document is decoded by the driver, in one native pass, upon first retrieval of a
+	value; embedded documents remain raw until they, too, are accessed. Retrieved values are cached, allowing nested
+	documents and arrays to be modified in place. The first modification of this mapping itself (assignment or
+	deletion) upgrades the storage to an ordered dictionary copy, after which the raw data is no longer consulted.
+	
+	While nothing which could have been modified has been handed out, the original BSON is reused verbatim when
+	encoding, avoiding a round trip through Python types entirely.
+	"""
+	
+	__slots__ = ('_raw', '_cache', '_data')
+	
+	def __init__(self, raw):
+		self._raw = raw  # The RawBSONDocument we are providing a view of.
+		self._cache = {}  # Values retrieved so far, as handed out.
+		self._data = None  # Our mutable copy, once one has been required.
+	
+	@property
+	def raw(self):
+		"""The raw BSON bytes of the original document."""
+		
+		return self._raw.raw
+	
+	@property
+	def pristine(self):
+		"""Determine if the original BSON still accurately represents this document."""
+		
+		if self._data is not None:
+			return False
+		
+		for value in self._cache.values():
+			if isinstance(value, RawDocument):
+				if not value.pristine:
+					return False
+			
+			elif isinstance(value, (list, MutableMapping)):
+				return False  # Potentially modified in-place; we can not know.
+		
+		return True
+	
+	@property
+	def _type_marker(self):
+		"""Identify ourselves to the BSON encoder as raw BSON while unmodified, passing the original bytes through."""
+		
+		return _RAW_BSON_DOCUMENT_MARKER if self.pristine else None
+	
+	def _materialize(self):
+		"""Upgrade to a mutable copy of the data, preserving any values already retrieved."""
+		
+		if self._data is None:
+			cache = self._cache
+			self._data = odict((k, cache[k] if k in cache else adopt(v)) for k, v in self._raw.items())
+			self._cache = None
+		
+		return self._data
+	
+	# Mapping Protocol
+	
+	def __getitem__(self, name):
+		if self._data is not None:
+			return self._data[name]
+		
+		try:
+			return self._cache[name]
+		except KeyError:
+			pass
+		
+		value = self._cache[name] = adopt(self._raw[name])
+		return value
+	
+	def __setitem__(self, name, value):
+		self._materialize()[name] = value
+	
+	def __delitem__(self, name):
+		del self._materialize()[name]
+	
+	def __contains__(self, name):
+		return name in (self._raw if self._data is None else self._data)
+	
+	def __iter__(self):
+		return iter(self._raw if self._data is None else self._data)
+	
+	def __len__(self):
+		return len(self._raw if self._data is None else self._data)
+	
+	def copy(self):
+		"""Return a mutable, shallow copy of the current data."""
+		
+		if self._data is not None:
+			return self._data.copy()
+		
+		return odict((k, self[k]) for k in self._raw)
+	
+	def __repr__(self):
+		return "{0}({1!r})".format(self.__class__.__name__, dict(self.items()))
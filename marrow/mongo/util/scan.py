@@ -0,0 +1,202 @@
+# encoding: utf-8
+
+"""Concurrent iteration of the entirety of a query's results, split into partitions over ranges of `_id` values.
+	
+	for article in Article.scan(Article.published != None, workers=8):
+		index(article)
+	
+	total = Article.scan(reduce=lambda n, article: n + article.views, initial=0, combine=operator.add)
+
+Partition boundaries are derived from the creation times embedded within ObjectId identifiers, where the smallest and
+largest matching identifiers are ObjectIds, otherwise from the `$bucketAuto` grouping of a random sample of matching
+identifiers. In the latter case identifiers are expected to be of a consistent type.
+
+Partitions are queried by a pool of threads; PyMongo releases the GIL while waiting on the network and decoding BSON,
+so a single process may keep several server-side cursors busy. Documents are yielded in no particular order.
+"""
+
+from __future__ import division, unicode_literals
+
+from copy import deepcopy
+from datetime import datetime
+from functools import reduce as fold
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+from threading import Event
+
+from bson import ObjectId
+
+from . import SENTINEL, utc
+from .cursor import _DONE, DocumentCursor, _Failure, _produce
+
+try:
+	from queue import Empty, Queue
+except ImportError:  # pragma: no cover
+	from Queue import Empty, Queue
+
+
+__all__ = ['partition', 'scan']
+
+
+SAMPLE = 100  # The number of identifiers sampled per partition when the identifiers are not ObjectIds.
+
+
+def partition(collection, query, count):
+	"""Determine the boundaries dividing the records matching the query into roughly `count` ranges of `_id`.
+	
+	Returns a list of `(lower, upper)` tuples, each inclusive of the lower bound, exclusive of the upper; the first
+	lower and last upper bounds are None, to ensure the ranges cover every possible value.
+	"""
+	
+	first = collection.find_one(query, {'_id': 1}, sort=[('_id', 1)])
+	last = collection.find_one(query, {'_id': 1}, sort=[('_id', -1)])
+	
+	if first is None or count < 2:
+		return [(None, None)]
+	
+	first, last = first['_id'], last['_id']
+	
+	if isinstance(first, ObjectId) and isinstance(last, ObjectId):
+		boundaries = _chronological(first, last, count)
+	
+	else:
+		boundaries = _sampled(collection, query, count)
+	
+	bounds = [None] + boundaries + [None]
+	return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _seconds(identifier):
+	return int((identifier.generation_time - datetime(1970, 1, 1, tzinfo=utc)).total_seconds())
+
+
+def _chronological(first, last, count):
+	"""Evenly divide the span of creation times between two ObjectIds."""
+	
+	start = _seconds(first)
+	span = _seconds(last) + 1 - start
+	boundaries = []
+	
+	for i in range(1, count):
+		boundary = ObjectId.from_datetime(datetime.fromtimestamp(start + span * i // count, utc))
+		
+		if boundary > first and (not boundaries or boundary > boundaries[-1]):
+			boundaries.append(boundary)
+	
+	return boundaries
+
+
+def _sampled(collection, query, count):
+	"""Divide a random sample of the matching identifiers into groups of roughly equal size."""
+	
+	buckets = collection.aggregate([
+			{'$match': query},
+			{'$sample': {'size': count * SAMPLE}},
+			{'$bucketAuto': {'groupBy': '$_id', 'buckets': count}},
+		])
+	
+	return [bucket['_id']['min'] for bucket in buckets][1:]
+
+
+def _bounded(query, lower, upper):
+	"""Restrict the given Filter to a range of identifiers."""
+	
+	condition = {}
+	
+	if lower is not None:
+		condition['$gte'] = lower
+	
+	if upper is not None:
+		condition['$lt'] = upper
+	
+	return query & {'_id': condition} if condition else query
+
+
+def scan(document, collection, query, options, partitions=None, workers=None, map=None, reduce=None,
+		initial=SENTINEL, combine=None):
+	"""Query each partition of the results concurrently.
+	
+	Each Document is passed through `map`, if given, within the pool. If `reduce` is given, each partition's results
+	are then folded using it, beginning with its own copy of `initial`, within the pool; the partial results are then
+	combined using `combine` and the result returned, or the list of them returned if `combine` is omitted. As with
+	`functools.reduce`, if `initial` is omitted each partition is folded from its first result, and partitions without
+	any contribute no partial result; combining no partial results at all produces None. Otherwise a generator is
+	returned, yielding each Document, or the result of calling `map` with it, as they arrive.
+	"""
+	
+	workers = workers or cpu_count()
+	ranges = partition(collection, query, partitions or workers * 4)
+	
+	def cursor(bounds):
+		return DocumentCursor(document, collection, _bounded(query, *bounds), dict(options))
+	
+	if reduce is not None:
+		pool = ThreadPool(min(workers, len(ranges)))
+		
+		def reduced(bounds):
+			records = cursor(bounds)
+			results = iter(records) if map is None else (map(i) for i in records)
+			
+			try:
+				if initial is SENTINEL:
+					first = next(results, SENTINEL)
+					return first if first is SENTINEL else fold(reduce, results, first)
+				
+				return fold(reduce, results, deepcopy(initial))  # A mutable initial must not be shared between threads.
+			
+			finally:
+				records.close()
+		
+		try:
+			partials = [i for i in pool.map(reduced, ranges) if i is not SENTINEL]
+		finally:
+			pool.close()
+			pool.join()
+		
+		if combine is None:
+			return partials
+		
+		return fold(combine, partials) if partials else None
+	
+	return _gather([cursor(bounds) for bounds in ranges], workers, map)
+
+
+def _gather(cursors, workers, map):
+	"""Yield the results of the given cursors, iterated concurrently, as they become available."""
+	
+	pool = ThreadPool(min(workers, len(cursors)))
+	queue = Queue(workers * 64)
+	stop = Event()
+	remaining = len(cursors)
+	
+	for cursor in cursors:
+		pool.apply_async(_produce, (cursor if map is None else (map(i) for i in cursor), queue, stop))
+	
+	pool.close()
+	
+	try:
+		while remaining:
+			item = queue.get()
+			
+			if item is _DONE:
+				remaining -= 1
+				continue
+			
+			if isinstance(item, _Failure):
+				raise item.exception
+			
+			yield item
+	
+	finally:  # Completed, failed, or abandoned by the caller; stop any outstanding producers.
+		stop.set()
+		
+		try:
+			while True:
+				queue.get_nowait()
+		except Empty:
+			pass
+		
+		pool.join()
+		
+		for cursor in cursors:  # Release the server-side cursors of any partitions not yet exhausted.
+			cursor.close()
@@ -0,0 +1,182 @@
+# encoding: utf-8
+
+"""In-process, per-query-shape statistics, identifying which queries issued by which Document classes cause load.
+
+Queries are grouped by their "shape": the structure of the filter (or pipeline) with the values compared against
+removed and mapping keys sorted. Thus `{'age': {'$gt': 18}, 'name': "Alice"}` and `{'name': "Bob", 'age': {'$gt':
+27}}` share the fingerprint `{age:{$gt:?},name:?}`.
+
+Statistics are gathered for Collection and Queryable operations automatically; disable collection for a given
+Document class by setting `__profile__ = False`. To examine the collected statistics, most expensive first:
+	
+	from marrow.mongo.util.stats import profiler
+	
+	for entry in profiler.dump(10):
+		print(entry['document'], entry['operation'], entry['shape'], entry['count'], entry['p90'])
+"""
+
+from __future__ import division, unicode_literals
+
+from collections import Mapping, deque
+from math import ceil
+from threading import Lock
+
+try:
+	from time import perf_counter
+except ImportError:  # pragma: no cover
+	from time import time as perf_counter
+
+
+__all__ = ['Statistics', 'Profiler', 'fingerprint', 'profiler']
+
+
+def fingerprint(query):
+	"""Produce the canonical shape of the given Filter, filter document, or aggregate pipeline, as a string."""
+	
+	return _shape(query.as_query if hasattr(query, 'as_query') else query)
+
+
+def _shape(value):
+	if isinstance(value, Mapping):
+		return '{' + ','.join(key + ':' + _shape(value[key]) for key in sorted(value)) + '}'
+	
+	if isinstance(value, (list, tuple)):
+		if value and all(isinstance(i, Mapping) for i in value):  # Logical clauses, or pipeline stages.
+			return '[' + ','.join(_shape(i) for i in value) + ']'
+		
+		return '[?]'  # An array of values, regardless of length.
+	
+	return '?'
+
+
+def _rank(samples, percent):
+	"""Select the value at the given percentile of an ordered, non-empty list of samples, by nearest rank."""
+	
+	rank = int(ceil(percent / 100 * len(samples))) - 1
+	return samples[min(max(rank, 0), len(samples) - 1)]
+
+
+class Statistics(object):
+	"""Accumulated measurements for a single operation of a single query shape against a single Document class.
+	
+	Durations are in seconds. Percentiles are calculated from a window of the most recent samples only.
+	"""
+	
+	__slots__ = ('document', 'operation', 'shape', 'count', 'total', 'minimum', 'maximum', 'documents', 'size',
+			'samples')
+	
+	WINDOW = 1024  # The number of recent durations retained for the calculation of percentiles.
+	
+	def __init__(self, document, operation, shape):
+		self.document = document
+		self.operation = operation
+		self.shape = shape
+		self.count = 0
+		self.total = 0.0
+		self.minimum = None
+		self.maximum = None
+		self.documents = 0  # The number of records retrieved, or affected.
+		self.size = 0  # The number of bytes retrieved, where known; only raw BSON retrievals are measured.
+		self.samples = deque(maxlen=self.WINDOW)
+	
+	def __repr__(self):
+		return "Statistics({0}.{1}, {2}, count={3}, total={4:.6f})".format(
+				self.document.__name__, self.operation, self.shape, self.count, self.total)
+	
+	def add(self, duration, documents=0, size=0):
+		self.count += 1
+		self.total += duration
+		self.documents += documents
+		self.size += size
+		self.samples.append(duration)
+		
+		if self.minimum is None or duration < self.minimum:
+			self.minimum = duration
+		
+		if self.maximum is None or duration > self.maximum:
+			self.maximum = duration
+	
+	@property
+	def mean(self):
+		return self.total / self.count if self.count else None
+	
+	def percentile(self, percent):
+		"""Return the duration at the given percentile (0-100) of the recent samples, by nearest rank."""
+		
+		return _rank(sorted(self.samples), percent) if self.samples else None
+	
+	def as_dict(self):
+		samples = sorted(self.samples)
+		
+		return {
+				'document': self.document.__module__ + '.' + self.document.__name__,
+				'operation': self.operation,
+				'shape': self.shape,
+				'count': self.count,
+				'total': self.total,
+				'mean': self.mean,
+				'min': self.minimum,
+				'max': self.maximum,
+				'p50': _rank(samples, 50) if samples else None,
+				'p90': _rank(samples, 90) if samples else None,
+				'p99': _rank(samples, 99) if samples else None,
+				'documents': self.documents,
+				'bytes': self.size,
+			}
+
+
+class Profiler(object):
+	"""A thread-safe registry of Statistics, keyed by Document class, operation, and query shape."""
+	
+	__slots__ = ('_entries', '_lock')
+	
+	def __init__(self):
+		self._entries = {}
+		self._lock = Lock()
+	
+	def __len__(self):
+		return len(self._entries)
+	
+	def __iter__(self):
+		return iter(list(self._entries.values()))
+	
+	def record(self, document, operation, query, duration, documents=0, size=0):
+		"""Record the execution of a query, returning the Statistics it was accumulated into."""
+		
+		shape = fingerprint(query)
+		key = (document, operation, shape)
+		
+		with self._lock:
+			entry = self._entries.get(key)
+			
+			if entry is None:
+				entry = self._entries[key] = Statistics(document, operation, shape)
+			
+			entry.add(duration, documents, size)
+		
+		return entry
+	
+	def get(self, document, operation, query):
+		"""Retrieve the Statistics for the shape of the given query, if any have been gathered."""
+		
+		return self._entries.get((document, operation, fingerprint(query)))
+	
+	def dump(self, limit=None):
+		"""Return the gathered statistics as a list of dictionaries, ordered by total time spent, descending."""
+		
+		with self._lock:
+			entries = sorted(self._entries.values(), key=lambda entry: entry.total, reverse=True)
+			
+			if limit is not None:
+				entries = entries[:limit]
+			
+			return [entry.as_dict() for entry in entries]
+	
+	def reset(self):
+		"""Discard all gathered statistics."""
+		
+		with self._lock:
+			self._entries.clear()
+
+
+profiler = Profiler()  # The default, process-wide registry used by Collection and Queryable.
@@ -0,0 +1,192 @@
+# encoding: utf-8
+
+"""An opt-in unit of work: an identity map of loaded documents, flushing their changes together upon completion.
+	
+	with UnitOfWork():
+		user = User.find_one(user_id)  # Retrieved from the server.
+		assert User.find_one(user_id) is user  # Served from memory.
+		
+		user.name = "Alice"
+	
+	# All changed documents are persisted here, in one bulk write per collection.
+
+While active (within the current thread, or asynchronous context where `contextvars` is available) `Queryable`
+consults the unit of work: documents retrieved in full by `find`, `find_one`, and `reload` are registered, records
+already registered are returned as the existing instance, and `find_one` lookups by primary key alone are answered
+without a round trip. Documents created within the unit of work may be registered explicitly using `add`.
+
+Changes are not flushed if the block exits due to an exception.
+"""
+
+from __future__ import unicode_literals
+
+from threading import Lock, local
+
+from pymongo import UpdateOne
+
+from .cache import cached, identify
+
+try:
+	from contextvars import ContextVar
+except ImportError:  # pragma: no cover
+	ContextVar = None
+
+
+__all__ = ['UnitOfWork', 'current']
+
+
+if ContextVar is not None:
+	_current = ContextVar('marrow.mongo.unit', default=None)
+	
+	def current():
+		"""Return the active UnitOfWork, if any."""
+		
+		return _current.get()
+	
+	def _activate(unit):
+		return _current.set(unit)
+	
+	def _deactivate(token):
+		_current.reset(token)
+
+else:  # pragma: no cover
+	_local = local()
+	
+	def current():
+		"""Return the active UnitOfWork, if any."""
+		
+		return getattr(_local, 'unit', None)
+	
+	def _activate(unit):
+		previous = current()
+		_local.unit = unit
+		return previous
+	
+	def _deactivate(previous):
+		_local.unit = previous
+
+
+class UnitOfWork(object):
+	"""An identity map of documents, keyed by collection and primary key, which persists their changes on exit.
+	
+	Use as a context manager to activate; units of work may be nested, the innermost being consulted. Pass
+	`flush=False` to discard, rather than persist, changes on exit. Registration is thread-safe.
+	"""
+	
+	__slots__ = ('identities', 'autoflush', '_lock', '_tokens')
+	
+	def __init__(self, flush=True):
+		self.identities = {}  # Mapping of (collection name, primary key) to (document, collection) tuples.
+		self.autoflush = flush
+		self._lock = Lock()
+		self._tokens = []
+	
+	def __repr__(self):
+		return "UnitOfWork({0} documents)".format(len(self.identities))
+	
+	def __len__(self):
+		return len(self.identities)
+	
+	def __iter__(self):
+		return iter([document for document, collection in list(self.identities.values())])
+	
+	def __contains__(self, document):
+		return any(document is registered for registered in self)
+	
+	def __enter__(self):
+		self._tokens.append(_activate(self))
+		return self
+	
+	def __exit__(self, kind, value, traceback):
+		_deactivate(self._tokens.pop())
+		
+		if kind is None and self.autoflush:
+			self.flush()
+	
+	@staticmethod
+	def _key(collection, identifier):
+		key = (collection.full_name, identifier)
+		
+		try:
+			hash(key)
+		except TypeError:  # Unhashable identifiers, such as embedded documents, are not tracked.
+			return None
+		
+		return key
+	
+	def get(self, collection, identifier):
+		"""Return the registered document with the given primary key in the given collection, if any."""
+		
+		if identifier is None:
+			return None
+		
+		key = self._key(collection, identifier)
+		entry = self.identities.get(key) if key else None
+		
+		return entry[0] if entry else None
+	
+	def lookup(self, collection, query):
+		"""Return the registered document matched by a query selecting solely by primary key, if any."""
+		
+		return self.get(collection, identify(query))
+	
+	def add(self, document, collection=None):
+		"""Register a document, returning the instance registered under its identity: it, or the one already there."""
+		
+		if collection is None:
+			collection = document.get_collection()
+		
+		key = self._key(collection, document.get('_id'))
+		
+		if key is None:
+			return document
+		
+		with self._lock:
+			return self.identities.setdefault(key, (document, collection))[0]
+	
+	def discard(self, document, collection=None):
+		"""Forget a document, e.g. after its deletion."""
+		
+		if collection is None:
+			collection = document.get_collection()
+		
+		key = self._key(collection, document.get('_id'))
+		
+		with self._lock:
+			entry = self.identities.get(key) if key else None
+			
+			if entry and entry[0] is document:
+				del self.identities[key]
+	
+	def flush(self, validate=True):
+		"""Persist the changes made to all registered documents, one unordered bulk write per collection.
+		
+		Missing records are created, as per `save`. Returns the list of PyMongo bulk write results.
+		"""
+		
+		batches = {}
+		
+		with self._lock:
+			for document, collection in self.identities.values():
+				update = document.changes()
+				
+				if not update:
+					continue
+				
+				batch = batches.setdefault(collection.full_name, (collection, [], []))
+				batch[1].append(UpdateOne({'_id': document['_id']}, update, upsert=True))
+				batch[2].append(document)
+		
+		results = []
+		
+		for collection, operations, documents in batches.values():
+			results.append(collection.bulk_write(operations, ordered=False, bypass_document_validation=not validate))
+			cache = cached(collection)
+			
+			for document in documents:
+				document._clear_changes()
+				
+				if cache is not None:
+					cache.invalidate(document['_id'])
+		
+		return results
@@ -94,6 +94,7 @@ setup(
 			development = tests_require + ['pre-commit', 'bandit'],  # Development-time dependencies.
 			logger = ['tzlocal>=1.4'],  # Timezone support to store log times in UTC like a sane person.
 			markdown = ['misaka', 'pygments'],  # Markdown text storage.
+			orjson = ['orjson'],  # High-performance JSON serialization.
 			scripting = ['javascripthon<1.0'],  # Allow map/reduce functions and "stored functions" to be Python.
 			tz = ['pytz', 'tzlocal>=1.4'],  # Support for timezones.
 			timezone = ['pytz', 'tzlocal>=1.4'],  # Alias for the above timezone support.
@@ -117,6 +118,11 @@ setup(
 						'Point = marrow.mongo.geo:Point',
 						'Polygon = marrow.mongo.geo:Polygon',
 					],
+				'marrow.mongo.codec': [  # JSON serialization codecs registered by name.
+						'bson = marrow.mongo.core.codec:ExtendedJSON',
+						'json = marrow.mongo.core.codec:JSON',
+						'orjson = marrow.mongo.core.codec:ORJSON[orjson]',
+					],
 				'marrow.mongo.field': [  # Field classes registered by (optionaly namespaced) name.
 						'Alias = marrow.mongo.core.field.alias:Alias',
 						'Array = marrow.mongo.core.field.array:Array',
@@ -0,0 +1,103 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import pytest
+
+from marrow.mongo import Document
+from marrow.mongo.field import Array, Embed, Integer, String
+from marrow.mongo.trait import Identified
+
+
+class Address(Document):
+	city = String()
+	zip = String()
+
+
+class Person(Identified, Document):
+	name = String()
+	age = Integer()
+	address = Embed(Address)
+	history = Array(Embed(Address), assign=True)
+	tags = Array(String(), assign=True)
+
+
+@pytest.fixture
+def person(request):
+	return Person.from_mongo({
+			'_id': None,
+			'name': "Alice",
+			'age': 27,
+			'address': {'city': "Montréal", 'zip': "H0H 0H0"},
+			'history': [{'city': "Toronto"}],
+			'tags': ['a', 'b'],
+		})
+
+
+class TestChangeTracking(object):
+	def test_loaded_clean(self, person):
+		assert not person.changed
+		assert not person.changes()
+	
+	def test_lazy_loaded_clean(self):
+		person = Person.from_mongo({'name': "Bob"}, lazy=True)
+		person.name
+		assert not person.changed
+	
+	def test_new_instance(self):
+		person = Person(name="Bob", age=42)
+		assert {'name', 'age', 'history', 'tags'} <= person.changed
+		assert '_id' not in person.changes()['$set']
+	
+	def test_field_assignment(self, person):
+		person.name = "Bob"
+		assert person.changed == {'name'}
+		assert person.changes() == {'$set': {'name': "Bob"}}
+	
+	def test_field_deletion(self, person):
+		del person.age
+		assert person.changes() == {'$unset': {'age': ''}}
+	
+	def test_mapping(self, person):
+		person['extra'] = 1
+		del person['name']
+		person.pop('age')
+		person.update(more=2)
+		assert person.changed == {'extra', 'name', 'age', 'more'}
+		assert person.changes() == {'$set': {'extra': 1, 'more': 2}, '$unset': {'name': '', 'age': ''}}
+	
+	def test_pop_default(self, person):
+		assert person.pop('missing', None) is None
+		assert not person.changed
+	
+	def test_embedded(self, person):
+		person.address.city = "Ottawa"
+		assert person.changes() == {'$set': {'address.city': "Ottawa"}}
+	
+	def test_embedded_subsumed(self, person):
+		person.address.city = "Ottawa"
+		person.address = Address(city="Québec")
+		
+		assert person.changed == {'address', 'address.city'}
+		assert list(person.changes()['$set']) == ['address']
+	
+	def test_embedded_assigned_instance(self, person):
+		address = Address(city="Québec")
+		person.address = address
+		person._clear_changes()
+		
+		address.zip = "G1A"
+		assert person.changed == {'address.zip'}
+	
+	def test_array_mutation(self, person):
+		person.tags.append('c')
+		assert person.changes() == {'$set': {'tags': ['a', 'b', 'c']}}
+	
+	def test_array_embedded(self, person):
+		person.history[0].city = "Vancouver"
+		assert person.changed == {'history'}
+	
+	def test_clear(self, person):
+		person.name = "Bob"
+		person._clear_changes()
+		assert not person.changes()
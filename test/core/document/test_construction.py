@@ -0,0 +1,79 @@
+# encoding: utf-8
+
+import pytest
+
+from marrow.mongo import Document, Field
+from marrow.mongo.field import Integer, ObjectId, String
+from marrow.mongo.util import adjust_attribute_sequence
+
+
+class Sample(Document):
+	name = String()
+	age = Integer(default=42, assign=True)
+	hidden = String(positional=False)
+	tags = Field(default=lambda: [], assign=True)
+
+
+class TestConstructionPlan(object):
+	def test_plan_cached(self):
+		plan = Sample._get_plan()
+		
+		assert Sample._get_plan() is plan
+		assert plan.positional == ('name', 'age', 'tags')
+		assert [name for name, key, field in plan.assigned] == ['age', 'tags']
+	
+	def test_plan_per_class(self):
+		class Child(Sample):
+			extra = String()
+		
+		assert Child._get_plan() is not Sample._get_plan()
+		assert Child._get_plan().positional[-1] == 'extra'
+	
+	def test_plan_invalidated_by_reordering(self):
+		class Reordered(Document):
+			first = String()
+			second = String()
+		
+		assert Reordered._get_plan().positional == ('first', 'second')
+		adjust_attribute_sequence('first')(Reordered)
+		assert Reordered._get_plan().positional == ('second', 'first')
+		assert Reordered('a', 'b').__data__ == {'second': 'a', 'first': 'b'}
+	
+	def test_positional_and_keyword(self):
+		inst = Sample("Alice", tags=['x'])
+		
+		assert inst.name == "Alice"
+		assert inst.age == 42
+		assert inst.tags == ['x']
+		assert list(inst.__data__) == ['name', 'tags', 'age']
+	
+	def test_keyword_declaration_order(self):
+		inst = Sample(tags=[], hidden="yes", name="Bob")
+		assert list(inst.__data__)[:3] == ['name', 'hidden', 'tags']
+	
+	def test_too_many_positional(self):
+		with pytest.raises(TypeError):
+			Sample("Alice", 27, [], "extra")
+	
+	def test_unknown_keyword(self):
+		with pytest.raises(TypeError) as exc:
+			Sample(unknown=True)
+		
+		assert 'unknown' in str(exc.value)
+	
+	def test_factory_called_per_instance(self):
+		assert Sample().tags is not Sample().tags
+	
+	def test_static_default_tracks_field(self):
+		class Changing(Document):
+			value = Integer(default=1, assign=True)
+		
+		assert Changing().value == 1
+		Changing.__fields__['value'].default = 2
+		assert Changing().value == 2
+	
+	def test_late_default(self):
+		class Identified(Document):
+			id = ObjectId('_id', assign=True)
+		
+		assert Identified().id != Identified().id
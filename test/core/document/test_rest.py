@@ -0,0 +1,122 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+from marrow.mongo import Document
+from marrow.mongo.field import Array, Embed, Integer, ObjectId, String
+from marrow.mongo.trait import Queryable
+
+
+def staff(*args):
+	"""Only readable within a context identifying a staff member; called with only the field if there is none."""
+	return len(args) == 2 and bool(args[0].get('staff'))
+
+
+class Open(Document):
+	name = String()
+
+
+class Contact(Document):
+	email = String()
+	phone = String(read=staff)
+
+
+class Account(Document):
+	id = ObjectId('_id', read=False)
+	name = String('n')
+	secret = String(read=False)
+	notes = String(read=staff)
+	age = Integer(project=False)
+	contact = Embed(Contact)
+	others = Array(Embed(Contact), assign=True)
+
+
+class TestRestView(object):
+	def test_unrestricted_passthrough(self):
+		record = Open(name="Alice")
+		assert record.as_rest is record
+	
+	def test_restricted(self):
+		record = Account(name="Alice", secret="xyzzy", notes="VIP", age=27)
+		result = record.as_rest
+		
+		assert result == {'n': "Alice", 'age': 27, 'others': []}
+		assert type(result) is dict
+	
+	def test_context(self):
+		record = Account(name="Alice", notes="VIP")
+		
+		assert record.to_rest({'staff': True})['notes'] == "VIP"
+		assert 'notes' not in record.to_rest({'staff': False})
+	
+	def test_undeclared_omitted(self):
+		record = Account.from_mongo({'n': "Alice", 'extra': True})
+		assert record.to_rest() == {'n': "Alice", 'others': []}
+	
+	def test_embedded(self):
+		record = Account(contact=Contact(email="a@example.com", phone="555"))
+		record.others.append(Contact(email="b@example.com", phone="556"))
+		
+		assert record.to_rest() == {
+				'contact': {'email': "a@example.com"},
+				'others': [{'email': "b@example.com"}],
+			}
+		
+		assert record.to_rest({'staff': True})['others'][0]['phone'] == "556"
+	
+	def test_embedded_from_mongo(self):
+		record = Account.from_mongo({
+				'contact': {'email': "a@example.com", 'phone': "555"},
+				'others': [{'email': "b@example.com", 'phone': "556"}],
+			})
+		
+		assert record.to_rest() == {
+				'contact': {'email': "a@example.com"},
+				'others': [{'email': "b@example.com"}],
+			}
+		
+		assert record.to_rest({'staff': True})['contact']['phone'] == "555"
+	
+	def test_as_rest_context(self):
+		class Staffed(Account):
+			def rest_context(self):
+				return {'staff': True}
+		
+		record = Staffed.from_mongo({'notes': "VIP", 'contact': {'phone': "555"}})
+		
+		assert record.as_rest['notes'] == "VIP"
+		assert record.as_rest['contact'] == {'phone': "555"}
+		assert 'notes' not in Account.from_mongo({'notes': "VIP"}).as_rest
+	
+	def test_compiled_once(self):
+		assert Account._get_view() is Account._get_view()
+
+
+class TestRestProjection(object):
+	def test_static(self):
+		assert Account.rest_projection() == {'n': True, 'contact': True, 'others': True, '_id': False}
+	
+	def test_context(self):
+		projection = Account.rest_projection({'staff': True})
+		
+		assert projection['notes'] is True
+		assert 'secret' not in projection
+		assert 'age' not in projection
+	
+	def test_nothing_readable(self):
+		class Hidden(Document):
+			value = String(read=False)
+		
+		assert Hidden.rest_projection() == {'__nothing__': True, '_id': False}
+	
+	def test_nothing_readable_retrieved(self, connection):
+		class Hidden(Queryable):
+			__collection__ = 'rest_hidden'
+			
+			id = ObjectId('_id', read=False)
+			value = String(read=False)
+		
+		Hidden.bind(connection.test).create_collection(drop=True)
+		Hidden(value="secret").insert_one()
+		
+		assert Hidden.get_collection().find_one({}, Hidden.rest_projection()) == {}
@@ -1,6 +1,7 @@
 # encoding: utf-8
 
 import pytest
+from io import BytesIO, StringIO
 
 from marrow.mongo import Document
 from marrow.mongo.field import Number, String
@@ -91,6 +92,50 @@ class TestMongoSerialization(object):
 		assert record['foo'] == 'bar'
 
 
+class TestLazyMongoSerialization(object):
+	def test_deferred(self):
+		data = {'field': 'foo'}
+		record = Other.from_mongo(data, lazy=True)
+		
+		assert '__data__' not in record.__dict__
+		assert '_id' not in data  # Default processing has not happened yet.
+		assert record.field == 'foo'
+		assert record.__data__ is data
+		assert '_id' in data  # Now it has.
+	
+	def test_deferred_write(self):
+		record = Other.from_mongo({}, lazy=True)
+		record.field = 'bar'
+		assert record.__data__['field'] == 'bar'
+		assert record.id
+	
+	def test_class_default(self):
+		class LazySample(Sample):
+			__lazy__ = True
+		
+		record = LazySample.from_mongo({'string': 'foo'})
+		assert '__pending__' in record.__dict__
+		assert record.string == 'foo'
+		assert '__pending__' not in record.__dict__
+		assert Sample.from_mongo({'string': 'foo'}, lazy=False).__dict__['__data__'] == {'string': 'foo'}
+	
+	def test_mapping_access(self):
+		record = Sample.from_mongo({'string': 'foo', 'number': 27}, lazy=True)
+		assert len(record) == 2
+		assert dict(record) == {'string': 'foo', 'number': 27}
+	
+	def test_explicit_class(object):
+		record = Derived.from_mongo({'_cls': 'Document', 'foo': 'bar'}, lazy=True)
+		assert record.__class__.__name__ == 'Document'
+		assert record['foo'] == 'bar'
+	
+	def test_unhydratable(self):
+		record = Sample.__new__(Sample)
+		
+		with pytest.raises(AttributeError):
+			record.__data__
+
+
 class TestJsonSerialization(object):
 	def test_json_deserialization(self):
 		record = Sample.from_json('{"string": "bar"}')
@@ -99,3 +144,50 @@ class TestJsonSerialization(object):
 	def test_json_serialization(self):
 		result = Sample("foo", 27).to_json(sort_keys=True)
 		assert result == '{"number": 27, "string": "foo"}'
+	
+	def test_json_codec_override(self):
+		record = Sample("foo", 27)
+		
+		assert record.to_json(codec='json', sort_keys=True) == '{"number": 27, "string": "foo"}'
+		assert Sample.from_json('{"string": "bar"}', codec='json').string == 'bar'
+	
+	def test_json_codec_class(self):
+		class Fast(Sample):
+			__codec__ = 'json'
+		
+		record = Fast("foo", 27)
+		assert Fast.from_json(record.to_json()) == record
+	
+	def test_json_lines_text(self):
+		target = StringIO()
+		count = Sample.to_json_lines((Sample(str(i), i) for i in range(3)), target)
+		lines = target.getvalue().splitlines()
+		
+		assert count == 3
+		assert len(lines) == 3
+		assert Sample.from_json(lines[2]).number == 2
+	
+	def test_json_lines_binary(self):
+		target = BytesIO()
+		count = Sample.to_json_lines([Sample("foo", 27)], target, codec='json')
+		
+		assert count == 1
+		assert target.getvalue().endswith(b'\n')
+		assert Sample.from_json(target.getvalue(), codec='json').string == 'foo'
+	
+	def test_json_lines_socket(self):
+		class Socket(object):
+			def __init__(self):
+				self.sent = []
+			
+			def sendall(self, data):
+				self.sent.append(data)
+		
+		target = Socket()
+		
+		assert Sample.to_json_lines([Sample("foo"), Sample("bar")], target) == 2
+		assert all(isinstance(i, bytes) for i in target.sent)
+		assert len(target.sent) == 2
+	
+	def test_json_lines_empty(self):
+		assert Sample.to_json_lines([], StringIO()) == 0
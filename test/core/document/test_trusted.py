@@ -0,0 +1,56 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+from marrow.mongo import Document
+from marrow.mongo.field import Alias, Array, Integer, Number, String
+
+
+class Point(Document):
+	kind = String('type', default='Point', assign=True)
+	coordinates = Array(Number(), default=lambda: [0, 0], assign=True)
+	latitude = Alias('coordinates.1')
+
+
+class Sample(Document):
+	name = String('n')
+	age = Integer()
+	first = String(exclusive={'second'})
+	second = String()
+
+
+class TestTrustedConstruction(object):
+	def test_names(self):
+		inst = Sample.from_trusted({'name': "Alice", 'age': 27}, extra=True)
+		assert inst.__data__ == {'n': "Alice", 'age': 27, 'extra': True}
+	
+	def test_stored_names(self):
+		inst = Sample.from_trusted({'n': "Alice"})
+		assert inst.name == "Alice"
+	
+	def test_no_transformation(self):
+		inst = Sample.from_trusted(age="27")
+		assert inst.__data__['age'] == "27"
+	
+	def test_aliases_and_defaults(self):
+		inst = Point.from_trusted(latitude=45)
+		assert inst.__data__ == {'coordinates': [0, 45], 'type': 'Point'}
+	
+	def test_tracked(self):
+		inst = Sample.from_trusted(name="Alice")
+		assert inst.changed == {'n'}
+
+
+class TestBatchValidation(object):
+	def test_valid(self):
+		batch = [Sample.from_trusted(name="Alice", age=27), Sample.from_trusted(name="Bob")]
+		assert Sample.validate_many(batch) == []
+	
+	def test_failures(self):
+		good = Sample.from_trusted(name="Alice")
+		bad = Sample.from_trusted(age="lots")
+		conflict = Sample.from_trusted(first="x", second="y")
+		
+		failures = Sample.validate_many([good, bad, conflict])
+		
+		assert [(doc, name) for doc, name, e in failures] == [(bad, 'age'), (conflict, 'first')]
@@ -0,0 +1,104 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+from datetime import datetime
+
+import pytest
+from bson import Binary, ObjectId
+from bson.json_util import dumps, loads
+from bson.tz_util import utc
+
+from marrow.mongo.core.codec import Codec, ExtendedJSON, JSON, ORJSON, resolve
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+try:
+	from bson.decimal128 import Decimal128
+except ImportError:
+	Decimal128 = None
+
+
+CODECS = ['bson', 'json', pytest.param('orjson', marks=pytest.mark.skipif(orjson is None, reason="orjson required"))]
+
+
+@pytest.fixture
+def sample():
+	return {
+			'_id': ObjectId('5a0c6d1b9f5e8a0b2c3d4e5f'),
+			'name': "Alice",
+			'when': datetime(2017, 11, 15, 12, 30, 15, 250000, tzinfo=utc),
+			'blob': Binary(b'\x00\x01\x02', 128),
+			'tags': ['a', 'b'],
+			'nested': {'on': datetime(1969, 7, 20, 20, 17, tzinfo=utc), 'list': [{'ref': ObjectId('5a0c6d1b9f5e8a0b2c3d4e60')}]},
+		}
+
+
+class TestCodecResolution(object):
+	def test_by_name(self):
+		assert isinstance(resolve('bson'), ExtendedJSON)
+		assert isinstance(resolve('json'), JSON)
+	
+	def test_by_class(self):
+		assert isinstance(resolve(JSON), JSON)
+		assert resolve(JSON) is resolve(JSON)
+	
+	def test_by_instance(self):
+		codec = JSON()
+		assert resolve(codec) is codec
+	
+	def test_unknown(self):
+		with pytest.raises(LookupError):
+			resolve('xyzzy')
+	
+	def test_incomplete(self):
+		class Incomplete(Codec):
+			def dumps(self, value, *args, **kw):
+				return ""
+		
+		with pytest.raises(TypeError):
+			resolve(Incomplete)
+
+
+@pytest.mark.parametrize('name', CODECS)
+class TestCodecs(object):
+	def test_round_trip(self, name, sample):
+		codec = resolve(name)
+		result = codec.loads(codec.dumps(sample))
+		
+		assert result['_id'] == sample['_id']
+		assert result['when'].replace(tzinfo=utc) == sample['when']  # Awareness varies by driver version.
+		assert result['blob'] == sample['blob']
+		assert result['blob'].subtype == 128
+		assert result['nested']['on'].replace(tzinfo=utc) == sample['nested']['on']
+		assert result['nested']['list'][0]['ref'] == sample['nested']['list'][0]['ref']
+	
+	def test_reference_compatible(self, name, sample):
+		codec = resolve(name)
+		
+		assert loads(codec.dumps(sample)) == loads(dumps(sample))
+		assert codec.loads(dumps(sample)) == loads(dumps(sample))
+	
+	def test_encode(self, name, sample):
+		codec = resolve(name)
+		assert codec.loads(codec.encode(sample))['_id'] == sample['_id']
+	
+	@pytest.mark.skipif(Decimal128 is None, reason="Decimal128 support required")
+	def test_decimal(self, name):
+		codec = resolve(name)
+		value = Decimal128('3.14159')
+		
+		assert codec.loads(codec.dumps({'pi': value}))['pi'] == value
+	
+	def test_fallback(self, name):
+		codec = resolve(name)
+		value = {'pattern': Binary(b'\x00' * 16, 4)}
+		
+		assert codec.loads(codec.dumps(value)) == loads(dumps(value))
+	
+	def test_unserializable(self, name):
+		with pytest.raises(TypeError):
+			resolve(name).dumps({'value': object()})
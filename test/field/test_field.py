@@ -126,6 +126,106 @@ class TestField(object):
 		assert Updated.field.default == 27
 
 
+class CountingField(Field):
+	"""Track the number of native conversions performed."""
+	
+	conversions = 0
+	
+	def to_native(self, document, field, value):
+		CountingField.conversions += 1
+		return [value]
+
+
+class CopyingField(Field):
+	"""Produce a native value independent of the stored one."""
+	
+	def to_native(self, document, field, value):
+		return tuple(value)
+
+
+class Memoized(Document):
+	plain = CountingField()
+	cached = CountingField(memoize=True)
+
+
+class MemoizedByDefault(Document):
+	__memoize__ = True
+	
+	cached = CountingField()
+	plain = CountingField(memoize=False)
+	copied = CopyingField()
+	tags = field.Set(field.String())
+	names = field.Array(field.String())
+
+
+class TestFieldMemoization(object):
+	def conversions(self, inst, name, reads=3):
+		CountingField.conversions = 0
+		values = [getattr(inst, name) for i in range(reads)]
+		return CountingField.conversions, values
+	
+	def test_unmemoized(self):
+		count, values = self.conversions(Memoized(plain=1), 'plain')
+		assert count == 3
+		assert values[0] is not values[1]
+	
+	def test_memoized(self):
+		count, values = self.conversions(Memoized(cached=1), 'cached')
+		assert count == 1
+		assert values[0] is values[1] is values[2]
+	
+	def test_class_default(self):
+		inst = MemoizedByDefault(cached=1, plain=2)
+		assert self.conversions(inst, 'cached')[0] == 1
+		assert self.conversions(inst, 'plain')[0] == 3
+	
+	def test_invalidation(self):
+		inst = Memoized(cached=1)
+		assert inst.cached == [1]
+		
+		inst.cached = 2
+		assert inst.cached == [2]
+		
+		inst['cached'] = 3
+		assert inst.cached == [3]
+		
+		del inst.cached
+		assert 'cached' not in inst.__dict__['__native__']
+		
+		with pytest.raises(AttributeError):
+			inst.cached
+	
+	def test_untracked_modification(self):
+		inst = MemoizedByDefault.from_mongo({'copied': [1]})
+		assert inst.copied == (1, )
+		
+		inst['copied'].append(2)
+		assert inst.copied == (1, 2)
+	
+	def test_untracked_set(self):
+		inst = MemoizedByDefault.from_mongo({'tags': ['a']})
+		assert inst.tags == {'a'}
+		
+		inst['tags'].append('b')
+		assert inst.tags == {'a', 'b'}
+	
+	def test_tracked_modification(self):
+		inst = MemoizedByDefault.from_mongo({'names': ['a']})
+		assert inst.names is inst.names
+		assert '__native__' in inst.__dict__
+		
+		inst['names'].append('b')
+		assert 'names' not in inst.__dict__['__native__']
+		assert inst.names == ['a', 'b']
+	
+	def test_replaced_store(self):
+		inst = Memoized(cached=1)
+		assert inst.cached == [1]
+		
+		inst.__data__ = {'cached': 2}
+		assert inst.cached == [2]
+
+
 class TestFieldSecurity(object):
 	def test_writeable_predicate_simple(self):
 		f = Field(write=None)
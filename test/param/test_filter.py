@@ -47,3 +47,16 @@ class TestParametricFilterConstructor(object):
 		q = F(D, field__exists=True)
 		assert isinstance(q, Filter)
 		assert q == {'field': {'$exists': True}}
+	
+	def test_resolution_cached(self, D):
+		F(D, not__number__gt=27)
+		resolved = D.__parametric__[1]
+		
+		assert len(resolved) == 1
+		
+		prefix, suffix, field, cast = next(iter(resolved.values()))[3]
+		assert field is D.number
+		assert not cast
+		
+		assert F(D, not__number__gt=42) == ~(D.number > 42)
+		assert len(resolved) == 1
@@ -37,3 +37,15 @@ class TestParametricProjectionConstructor(object):
 		q = P(D, '-field')
 		assert isinstance(q, dict)
 		assert q == {'_id': True}
+	
+	def test_cached_copy(self, D):
+		q = P(D)
+		q['extra'] = True
+		
+		assert P(D) == {'field': True}
+	
+	def test_cache_invalidation(self, D):
+		assert P(D) == {'field': True}
+		
+		D.__projection__ = {'number': True}
+		assert P(D) == {'other': True}
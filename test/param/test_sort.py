@@ -36,3 +36,9 @@ class TestParametricSortConstructor(object):
 		q = S(D, 'field', '-number')
 		assert isinstance(q, list)
 		assert q == [('field', 1), ('other', -1)]
+	
+	def test_resolution_cached(self, D):
+		assert S(D, '-number') == [('other', -1)]
+		assert len(D.__parametric__[1]) == 1
+		assert S(D, '-number', 'field') == [('other', -1), ('field', 1)]
+		assert len(D.__parametric__[1]) == 2
@@ -18,6 +18,12 @@ class TestParametricUpdateConstructor(object):
 		
 		return Sample
 	
+	def test_resolution_cached(self, D):
+		for i in range(100):
+			U(D, field=str(i), inc__number=i)
+		
+		assert len(D.__parametric__[1]) == 2
+	
 	def test_set_default(self, D):
 		q = U(D, field=27, number=42)
 		assert isinstance(q, Update)
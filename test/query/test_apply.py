@@ -0,0 +1,174 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+from datetime import datetime
+
+import pytest
+from bson import Int64, Timestamp
+
+from marrow.mongo import Document, U, Update
+from marrow.mongo.field import Array, Embed, Integer, String
+from marrow.mongo.query import apply_update
+from marrow.mongo.query.apply import applicable
+
+
+class Person(Document):
+	class Address(Document):
+		city = String()
+	
+	name = String()
+	age = Integer()
+	tags = Array(String(), assign=True)
+	address = Embed(Address)
+
+
+@pytest.fixture
+def bob():
+	bob = Person(name="Bob", age=27, tags=["staff"], address=Person.Address(city="Montreal"))
+	bob._clear_changes()
+	
+	return bob
+
+
+class TestFields(object):
+	def test_set(self, bob):
+		bob.apply(U(Person, name="Robert"))
+		assert bob.name == "Robert"
+		assert not bob.changed
+	
+	def test_set_nested(self, bob):
+		bob.apply({'$set': {'address.city': "Paris"}})
+		assert bob.address.city == "Paris"
+	
+	def test_set_creates(self):
+		assert apply_update({'$set': {'a.b.c': 1}}, {}) == {'a': {'b': {'c': 1}}}
+	
+	def test_set_on_insert(self):
+		assert apply_update({'$setOnInsert': {'a': 1}}, {}) == {}
+		assert apply_update({'$setOnInsert': {'a': 1}}, {}, insert=True) == {'a': 1}
+	
+	def test_unset(self, bob):
+		bob.apply(U(Person, unset__age=True))
+		assert 'age' not in bob
+	
+	def test_unset_missing(self):
+		assert apply_update({'$unset': {'a.b': ''}}, {'c': 1}) == {'c': 1}
+	
+	def test_rename(self):
+		assert apply_update({'$rename': {'a': 'b.c'}}, {'a': 1}) == {'b': {'c': 1}}
+		assert apply_update({'$rename': {'x': 'y'}}, {'a': 1}) == {'a': 1}
+	
+	def test_current_date(self):
+		result = apply_update({'$currentDate': {'a': True, 'b': {'$type': 'timestamp'}}}, {})
+		
+		assert isinstance(result['a'], datetime)
+		assert result['a'].microsecond % 1000 == 0
+		assert isinstance(result['b'], Timestamp)
+	
+	def test_positional(self):
+		with pytest.raises(NotImplementedError):
+			apply_update({'$set': {'tags.$': "admin"}}, {'tags': ["staff"]})
+	
+	def test_unknown(self):
+		with pytest.raises(ValueError):
+			apply_update({'$bogus': {'a': 1}}, {})
+	
+	def test_applicable(self):
+		assert applicable(U(Person, inc__age=1, push__tags="admin"))
+		assert applicable({'$unset': {'address.city': True}})
+		assert not applicable({'$set': {'tags.$': "admin"}})
+		assert not applicable({'$set': {'tags.$[]': "admin"}})
+		assert not applicable({'$bogus': {'a': 1}})
+
+
+class TestArithmetic(object):
+	def test_inc(self, bob):
+		bob.apply(U(Person, inc__age=1))
+		assert bob.age == 28
+	
+	def test_inc_missing(self):
+		assert apply_update({'$inc': {'a': 2.5}}, {}) == {'a': 2.5}
+	
+	def test_inc_type(self):
+		result = apply_update({'$inc': {'a': Int64(1)}}, {'a': 1})
+		assert isinstance(result['a'], Int64)
+		
+		with pytest.raises(TypeError):
+			apply_update({'$inc': {'a': 1}}, {'a': "one"})
+	
+	def test_mul(self):
+		assert apply_update({'$mul': {'a': 3, 'b': 2}}, {'a': 2}) == {'a': 6, 'b': 0}
+	
+	def test_min_max(self):
+		assert apply_update({'$min': {'a': 5}, '$max': {'b': 5}}, {'a': 7, 'b': 7}) == {'a': 5, 'b': 7}
+		assert apply_update({'$min': {'a': None}}, {'a': 1}) == {'a': None}
+		assert apply_update({'$max': {'a': "x"}}, {'a': 1}) == {'a': "x"}
+	
+	def test_bit(self):
+		assert apply_update({'$bit': {'a': {'and': 6, 'or': 1}}}, {'a': 3}) == {'a': 3}
+
+
+class TestArrays(object):
+	def test_push(self, bob):
+		bob.apply(U(Person, push__tags="admin"))
+		assert bob.tags == ["staff", "admin"]
+		assert not bob.changed
+	
+	def test_push_each(self):
+		update = {'$push': {'a': {'$each': [5, 1, 4], '$sort': -1, '$slice': 3}}}
+		assert apply_update(update, {'a': [2, 3]}) == {'a': [5, 4, 3]}
+	
+	def test_push_position(self):
+		update = {'$push': {'a': {'$each': [0, 1], '$position': 1}}}
+		assert apply_update(update, {'a': [9, 8]}) == {'a': [9, 0, 1, 8]}
+	
+	def test_push_sort_documents(self):
+		update = {'$push': {'a': {'$each': [{'n': 2}], '$sort': {'n': 1}}}}
+		assert apply_update(update, {'a': [{'n': 3}, {'n': 1}]}) == {'a': [{'n': 1}, {'n': 2}, {'n': 3}]}
+	
+	def test_push_slice_negative(self):
+		update = {'$push': {'a': {'$each': [4, 5], '$slice': -2}}}
+		assert apply_update(update, {'a': [1, 2, 3]}) == {'a': [4, 5]}
+	
+	def test_push_type(self):
+		with pytest.raises(TypeError):
+			apply_update({'$push': {'a': 1}}, {'a': 1})
+	
+	def test_add_to_set(self, bob):
+		bob.apply(U(Person, add_to_set__tags="staff"))
+		assert bob.tags == ["staff"]
+		
+		bob.apply({'$addToSet': {'tags': {'$each': ["admin", "staff", "admin"]}}})
+		assert bob.tags == ["staff", "admin"]
+	
+	def test_pull(self):
+		assert apply_update({'$pull': {'a': 2}}, {'a': [1, 2, 3, 2]}) == {'a': [1, 3]}
+		assert apply_update({'$pull': {'a': {'$gte': 2}}}, {'a': [1, 2, 3]}) == {'a': [1]}
+		assert apply_update({'$pull': {'a': {'n': 1}}}, {'a': [{'n': 1, 'm': 2}, {'n': 2}]}) == {'a': [{'n': 2}]}
+		assert apply_update({'$pull': {'a': 1}}, {}) == {}
+	
+	def test_pull_all(self):
+		assert apply_update({'$pullAll': {'a': [1, 3]}}, {'a': [1, 2, 3]}) == {'a': [2]}
+	
+	def test_pop(self):
+		assert apply_update({'$pop': {'a': 1}}, {'a': [1, 2, 3]}) == {'a': [1, 2]}
+		assert apply_update({'$pop': {'a': -1}}, {'a': [1, 2, 3]}) == {'a': [2, 3]}
+	
+	def test_array_index(self):
+		assert apply_update({'$set': {'a.1': 5, 'a.3': 7}}, {'a': [1, 2]}) == {'a': [1, 5, None, 7]}
+		assert apply_update({'$inc': {'a.0.n': 1}}, {'a': [{'n': 1}]}) == {'a': [{'n': 2}]}
+
+
+class TestDocument(object):
+	def test_update_instance(self, bob):
+		bob.apply(Update({'$set': {'name': "Robert"}}) & U(Person, inc__age=3))
+		
+		assert bob.name == "Robert"
+		assert bob.age == 30
+	
+	def test_preserves_changes(self, bob):
+		bob.name = "Robert"
+		bob.apply(U(Person, inc__age=1))
+		
+		assert bob.changed == {'name'}
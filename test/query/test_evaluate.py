@@ -0,0 +1,178 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from bson import BSON
+from bson.raw_bson import RawBSONDocument
+
+from marrow.mongo import Document, F, Filter
+from marrow.mongo.field import Array, Embed, Integer, ObjectId, String
+from marrow.mongo.query import matcher
+from marrow.mongo.trait import Published
+
+
+class Person(Document):
+	class Address(Document):
+		city = String()
+		country = String()
+	
+	name = String()
+	age = Integer()
+	tags = Array(String(), assign=True)
+	scores = Array(Integer(), assign=True)
+	addresses = Array(Embed(Address), assign=True)
+	manager = ObjectId()
+
+
+class Article(Published):
+	title = String()
+
+
+@pytest.fixture
+def alice():
+	alice = Person(name="Alice", age=27, tags=["admin", "staff"], scores=[7, 42])
+	alice['addresses'] = [
+			Person.Address(city="Montreal", country="CA"),
+			Person.Address(city="Paris", country="FR"),
+		]
+	
+	return alice
+
+
+class TestComparison(object):
+	def test_equality(self, alice):
+		assert alice.matches(Person.name == "Alice")
+		assert not alice.matches(Person.name == "Bob")
+		assert alice.matches(F(Person, age=27))
+	
+	def test_ordering(self, alice):
+		assert alice.matches(Person.age > 18)
+		assert alice.matches(Person.age <= 27)
+		assert not alice.matches(Person.age < 27)
+		assert alice.matches(Person.age.range(20, 30))
+	
+	def test_type_bracketing(self, alice):
+		assert not alice.matches({'age': {'$gt': "1"}})
+		assert not alice.matches({'age': True})
+		assert not alice.matches({'name': {'$lt': 99}})
+	
+	def test_not_equal(self, alice):
+		assert alice.matches(Person.name != "Bob")
+		assert not alice.matches({'tags': {'$ne': "admin"}})
+	
+	def test_missing(self, alice):
+		assert alice.matches(Person.manager == None)  # noqa
+		assert not alice.matches(Person.manager != None)  # noqa
+		assert alice.matches(-Person.manager)
+		assert alice.matches(+Person.name)
+
+
+class TestArrays(object):
+	def test_element_equality(self, alice):
+		assert alice.matches({'tags': "staff"})
+		assert alice.matches({'tags': ["admin", "staff"]})
+		assert not alice.matches({'tags': ["staff", "admin"]})
+	
+	def test_element_comparison(self, alice):
+		assert alice.matches(Person.scores > 40)
+		assert not alice.matches(Person.scores > 42)
+	
+	def test_in(self, alice):
+		assert alice.matches({'tags': {'$in': ["staff", "guest"]}})
+		assert not alice.matches({'tags': {'$nin': ["staff", "guest"]}})
+		assert alice.matches(Person.name.any("Alice", "Bob"))
+		assert alice.matches({'name': {'$in': [re.compile('^Al')]}})
+	
+	def test_all(self, alice):
+		assert alice.matches({'tags': {'$all': ["staff", "admin"]}})
+		assert not alice.matches({'tags': {'$all': ["staff", "guest"]}})
+		assert not alice.matches({'tags': {'$all': []}})
+	
+	def test_size(self, alice):
+		assert alice.matches(Person.tags.size(2))
+		assert not alice.matches(Person.tags.size(3))
+	
+	def test_elem_match(self, alice):
+		assert alice.matches(Person.addresses.match({'city': "Paris", 'country': "FR"}))
+		assert not alice.matches(Person.addresses.match({'city': "Paris", 'country': "CA"}))
+		assert alice.matches({'scores': {'$elemMatch': {'$gt': 40, '$lt': 50}}})
+		assert not alice.matches({'scores': {'$elemMatch': {'$gt': 10, '$lt': 40}}})
+	
+	def test_nested_path(self, alice):
+		assert alice.matches({'addresses.city': "Paris"})
+		assert alice.matches({'addresses.1.country': "FR"})
+		assert not alice.matches({'addresses.0.country': "FR"})
+
+
+class TestElement(object):
+	def test_type(self, alice):
+		assert alice.matches(Person.name.of_type())
+		assert alice.matches(Person.age.of_type())
+		assert alice.matches({'age': {'$type': ['string', 16]}})
+		assert not alice.matches({'age': {'$type': 'string'}})
+	
+	def test_regex(self, alice):
+		assert alice.matches(Person.name.re(r'^A', r'l'))
+		assert alice.matches({'name': {'$regex': '^alice$', '$options': 'i'}})
+		assert alice.matches({'name': re.compile('ice$')})
+		assert not alice.matches({'name': {'$not': re.compile('ice$')}})
+	
+	def test_mod(self, alice):
+		assert alice.matches({'age': {'$mod': [9, 0]}})
+		assert not alice.matches({'age': {'$mod': [2, 0]}})
+
+
+class TestLogical(object):
+	def test_and_or(self, alice):
+		assert alice.matches((Person.age > 18) & (Person.name == "Alice"))
+		assert alice.matches((Person.age > 30) | (Person.name == "Alice"))
+		assert not alice.matches((Person.age > 30) | (Person.name == "Bob"))
+	
+	def test_not(self, alice):
+		assert not alice.matches(~(Person.name == "Alice"))
+		assert alice.matches({'age': {'$not': {'$gt': 30}}})
+	
+	def test_nor(self, alice):
+		assert alice.matches({'$nor': [{'name': "Bob"}, {'age': 99}]})
+		assert not alice.matches({'$nor': [{'name': "Alice"}, {'age': 99}]})
+	
+	def test_empty(self, alice):
+		assert alice.matches(Filter())
+	
+	def test_published(self):
+		now = datetime.utcnow()
+		
+		assert Article(title="Draft").matches(Article.only_published())
+		assert Article(title="Old", published=now - timedelta(days=1)).matches(Article.only_published())
+		assert not Article(title="New", published=now + timedelta(days=1)).matches(Article.only_published())
+
+
+class TestMatcher(object):
+	def test_compiled(self, alice):
+		adult = matcher(Person.age >= 18)
+		
+		assert adult(alice)
+		assert alice.matches(adult)
+		assert not adult(Person(name="Bobby", age=12))
+	
+	def test_mapping(self):
+		adult = matcher({'age': {'$gte': 18}})
+		
+		assert adult({'age': 27})
+		assert adult(RawBSONDocument(BSON.encode({'age': 27})))
+		assert not adult({})
+	
+	def test_unsupported(self):
+		with pytest.raises(NotImplementedError):
+			matcher({'$where': "this.age > 18"})
+		
+		with pytest.raises(NotImplementedError):
+			matcher({'location': {'$near': [0, 0]}})
+	
+	def test_unknown(self):
+		with pytest.raises(ValueError):
+			matcher({'age': {'$bogus': 1}})
@@ -0,0 +1,106 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from marrow.mongo import Index
+from marrow.mongo.query.keyset import decode, encode, order, seek, supported, values
+
+
+ID = ObjectId('59129d460aa7397ce3f9643e')
+
+
+class TestOrder(object):
+	def test_unique(self):
+		assert order([('published', -1)]) == [('published', -1), ('_id', 1)]
+		assert order([('_id', -1)]) == [('_id', -1)]
+	
+	def test_unique_index(self):
+		indexes = [Index('slug', unique=True), Index('-published', 'title', unique=True)]
+		
+		assert order([('slug', 1)], indexes=indexes) == [('slug', 1)]
+		assert order([('published', 1), ('title', -1)], indexes=indexes) == [('published', 1), ('title', -1)]
+		assert order([('published', -1)], indexes=indexes) == [('published', -1), ('_id', 1)]
+
+
+class TestSeek(object):
+	def test_single(self):
+		assert seek([('_id', 1)], [ID]).as_query == {'_id': {'$gt': ID}}
+	
+	def test_compound(self):
+		assert seek([('age', 1), ('_id', -1)], [27, ID]).as_query == {'$or': [
+				{'age': {'$gt': 27}},
+				{'age': 27, '_id': {'$lt': ID}},
+			]}
+	
+	def test_descending(self):
+		assert seek([('age', -1), ('_id', 1)], [27, ID]).as_query == {'$or': [
+				{'age': {'$lt': 27}},
+				{'age': None},
+				{'age': 27, '_id': {'$gt': ID}},
+			]}
+	
+	def test_null(self):
+		assert seek([('age', 1), ('_id', 1)], [None, ID]).as_query == {'$or': [
+				{'age': {'$ne': None}},
+				{'age': None, '_id': {'$gt': ID}},
+			]}
+		
+		assert seek([('age', -1), ('_id', 1)], [None, ID]).as_query == {'age': None, '_id': {'$gt': ID}}
+
+
+class TestToken(object):
+	def test_values(self):
+		assert values({'a': {'b': 1}, '_id': ID}, [('a.b', 1), ('c', 1), ('_id', 1)]) == [1, None, ID]
+	
+	def test_round_trip(self):
+		sort = [('published', -1), ('_id', 1)]
+		when = datetime(2017, 5, 10, 12, 30)
+		token = encode(sort, [when, ID])
+		
+		assert '=' not in token
+		assert decode(token, sort) == [when, ID]
+	
+	def test_mismatch(self):
+		token = encode([('_id', 1)], [ID])
+		
+		with pytest.raises(ValueError):
+			decode(token, [('_id', -1)])
+	
+	def test_invalid(self):
+		with pytest.raises(ValueError):
+			decode("bogus!", [('_id', 1)])
+
+
+class TestSupported(object):
+	def test_primary_key(self):
+		assert supported([], [('_id', -1)])
+	
+	def test_prefix(self):
+		indexes = [Index('-published', 'title', '_id')]
+		
+		assert supported(indexes, [('published', -1), ('title', 1)])
+		assert supported(indexes, [('published', -1), ('title', 1), ('_id', 1)])
+		assert supported(indexes, [('published', 1), ('title', -1), ('_id', -1)])
+		assert not supported(indexes, [('published', -1), ('title', -1)])
+		assert not supported(indexes, [('title', 1)])
+	
+	def test_primary_key_covered(self):
+		indexes = [Index('-published', 'title')]
+		
+		assert supported(indexes, [('published', -1), ('title', 1)])
+		assert not supported(indexes, [('published', -1), ('_id', 1)])  # Would require an in-memory sort.
+		assert not supported(indexes, [('published', -1), ('title', 1), ('_id', 1)])
+	
+	def test_equality(self):
+		indexes = [Index('author', '-published', '_id')]
+		
+		assert supported(indexes, [('published', -1), ('_id', 1)], {'author'})
+		assert not supported(indexes, [('published', -1), ('_id', 1)])
+	
+	def test_sparse(self):
+		assert not supported([Index('published', sparse=True)], [('published', 1)])
@@ -3,10 +3,12 @@
 from __future__ import unicode_literals
 
 import operator
+from functools import reduce
 
 import pytest
 
-from marrow.mongo import Filter
+from marrow.mongo import Filter, Update
+from marrow.mongo.query.ops import Ops
 from marrow.schema.compat import odict, py3
 
 
@@ -144,6 +146,10 @@ class TestOpsMapping(object):
 	
 	def test_ops_shallow_copy(self, single_ops):
 		assert single_ops.operations == single_ops.copy().operations
+	
+	def test_default_fold(self):
+		ops = Ops({'a': 1, 'b': 2})._defer({'b': 3, 'c': 4})
+		assert ops.operations == {'a': 1, 'b': 3, 'c': 4}
 
 
 class TestOperationsCombination(object):
@@ -176,3 +182,73 @@ class TestOperationsCombination(object):
 	def test_operations_soft_and(self):
 		comb = Filter({'$and': [{'a': 1}, {'b': 2}]}) & Filter({'c': 3})
 		assert comb.as_query == {'$and': [{'a': 1}, {'b': 2}], 'c': 3}
+
+
+class TestOperationsSharing(object):
+	def test_sources_unmodified(self):
+		first = Filter({'roll': {'$gte': 27}, '$and': [{'a': 1}]})
+		second = Filter({'roll': {'$lte': 42}, '$and': [{'b': 2}]})
+		comb = first & second
+		
+		assert comb.as_query == {'roll': {'$gte': 27, '$lte': 42}, '$and': [{'a': 1}, {'b': 2}]}
+		assert first.as_query == {'roll': {'$gte': 27}, '$and': [{'a': 1}]}
+		assert second.as_query == {'roll': {'$lte': 42}, '$and': [{'b': 2}]}
+	
+	def test_later_modification_isolated(self):
+		first = Filter({'roll': 27})
+		comb = first & Filter({'foo': 42})
+		first['bar'] = 'baz'
+		
+		assert comb.as_query == {'roll': 27, 'foo': 42}
+	
+	def test_divergent_chains(self):
+		base = Filter({'roll': {'$gte': 27}}) & Filter({'roll': {'$lte': 42}})
+		left = base & Filter({'roll': {'$ne': 30}})
+		right = base & Filter({'foo': 1})
+		
+		assert left.as_query == {'roll': {'$gte': 27, '$lte': 42, '$ne': 30}}
+		assert right.as_query == {'roll': {'$gte': 27, '$lte': 42}, 'foo': 1}
+		assert base.as_query == {'roll': {'$gte': 27, '$lte': 42}}
+	
+	def test_evaluated_once(self):
+		comb = Filter({'roll': 27}) & Filter({'foo': 42})
+		assert comb.as_query is comb.as_query
+	
+	def test_or_chain(self):
+		comb = Filter({'a': 1}) & Filter({'$or': [{'b': 2}]}) & Filter({'$or': [{'c': 3}]})
+		assert comb.as_query == {'a': 1, '$and': [{'$or': [{'c': 3}]}, {'$or': [{'b': 2}]}]}
+	
+	def test_many(self):
+		comb = reduce(operator.and_, (Filter({'f' + str(i // 2): {('$gte', '$lt')[i % 2]: i}}) for i in range(100)))
+		
+		assert len(comb) == 50
+		assert comb['f49'] == {'$gte': 98, '$lt': 99}
+
+
+class TestUpdateCombination(object):
+	def test_merge(self):
+		comb = Update({'$set': {'a': 1}}) & Update({'$set': {'b': 2}, '$inc': {'c': 1}})
+		assert comb.operations == {'$set': {'a': 1, 'b': 2}, '$inc': {'c': 1}}
+	
+	def test_priority(self):
+		comb = Update({'$set': {'a': 1}}) & Update({'$set': {'a': 2}}) & Update({'$set': {'a': 3, 'b': 4}})
+		
+		assert comb.operations == {'$set': {'a': 1, 'b': 4}}
+		assert list(comb.operations['$set']) == ['a', 'b']
+	
+	def test_ordering(self):
+		comb = Update(odict([('$set', odict([('a', 1)]))])) & Update(odict([('$inc', odict([('b', 1)]))]))
+		assert list(comb.operations) == ['$inc', '$set']
+	
+	def test_sources_unmodified(self):
+		first = Update({'$set': {'a': 1}})
+		second = Update({'$set': {'b': 2}})
+		comb = first & second
+		comb['$set']['c'] = 3
+		
+		assert first.operations == {'$set': {'a': 1}}
+		assert second.operations == {'$set': {'b': 2}}
+	
+	def test_plain_mapping(self):
+		comb = Update({'$set': {'a': 1}}) & {'$unset': {'b': ''}}
+		assert comb.operations == {'$set': {'a': 1}, '$unset': {'b': ''}}
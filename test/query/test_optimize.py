@@ -0,0 +1,134 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import re
+
+from marrow.mongo import Document, Filter
+from marrow.mongo.field import Integer, String
+from marrow.mongo.query import optimize
+
+
+class Sample(Document):
+	name = String()
+	age = Integer()
+
+
+class TestFlattening(object):
+	def test_nested_and(self):
+		query = {'$and': [{'$and': [{'a': 1}, {'b': 2}]}, {'c': 3}]}
+		assert optimize(query) == {'a': 1, 'b': 2, 'c': 3}
+	
+	def test_nested_or(self):
+		query = {'$or': [{'a': 1}, {'$or': [{'b': 2}, {'c': 3}]}]}
+		assert optimize(query) == {'$or': [{'a': 1}, {'b': 2}, {'c': 3}]}
+	
+	def test_single_member_or(self):
+		assert optimize({'$or': [{'a': 1}], 'b': 2}) == {'a': 1, 'b': 2}
+	
+	def test_conflicting_equality(self):
+		assert optimize({'$and': [{'a': 1}, {'a': 2}]}) == {'a': 1, '$and': [{'a': 2}]}
+	
+	def test_multiple_or(self):
+		query = {'$and': [{'$or': [{'a': 1}, {'b': 1}]}, {'$or': [{'c': 1}, {'d': 1}]}]}
+		result = optimize(query)
+		
+		assert result['$or'] == [{'a': 1}, {'b': 1}]
+		assert result['$and'] == [{'$or': [{'c': 1}, {'d': 1}]}]
+
+
+class TestDisjunction(object):
+	def test_equality_to_in(self):
+		assert optimize({'$or': [{'a': 1}, {'a': 2}]}) == {'a': {'$in': [1, 2]}}
+	
+	def test_in_merged(self):
+		query = {'$or': [{'a': 1}, {'a': {'$in': [1, 2, 3]}}, {'b': 1}]}
+		assert optimize(query) == {'$or': [{'a': {'$in': [1, 2, 3]}}, {'b': 1}]}
+	
+	def test_distinct_types_preserved(self):
+		assert optimize({'$or': [{'a': 1}, {'a': True}]}) == {'a': {'$in': [1, True]}}
+	
+	def test_embedded_documents_untouched(self):
+		query = {'$or': [{'a': {'b': 1}}, {'a': {'b': 2}}]}
+		assert optimize(query) == query
+	
+	def test_tautology(self):
+		assert optimize({'$or': [{'a': 1}, {}], 'b': 2}) == {'b': 2}
+	
+	def test_null_equality(self):
+		query = {'$or': [{'a': {'$lt': 7}}, {'a': None}]}
+		
+		assert optimize({'a': None}) == {'a': None}
+		assert optimize(query) == query
+
+
+class TestPredicates(object):
+	def test_eq_unwrapped(self):
+		assert optimize({'a': {'$eq': 1}}) == {'a': 1}
+	
+	def test_eq_retained(self):
+		pattern = re.compile('^a')
+		
+		assert optimize({'a': {'$eq': {'b': 1}}}) == {'a': {'$eq': {'b': 1}}}
+		assert optimize({'a': {'$eq': pattern}}) == {'a': {'$eq': pattern}}
+	
+	def test_empty_nin(self):
+		assert optimize({'a': {'$nin': []}, 'b': 1}) == {'b': 1}
+	
+	def test_range_merging(self):
+		query = {'$and': [{'a': {'$gt': 1}}, {'a': {'$gt': 5, '$lt': 20}}, {'a': {'$lte': 9}}]}
+		assert optimize(query) == {'a': {'$gt': 5, '$lte': 9}}
+	
+	def test_redundant_bound(self):
+		assert optimize({'a': {'$gte': 5, '$gt': 5}}) == {'a': {'$gt': 5}}
+		assert optimize({'a': {'$lte': 4, '$lt': 5}}) == {'a': {'$lte': 4}}
+	
+	def test_incomparable_bounds(self):
+		query = {'$and': [{'a': {'$gt': 1}}, {'a': {'$gt': "b"}}]}
+		assert optimize(query) == {'a': {'$gt': 1}, '$and': [{'a': {'$gt': "b"}}]}
+	
+	def test_string_bounds_retained(self):
+		query = {'$and': [{'a': {'$gte': "b"}}, {'a': {'$gte': "B", '$gt': "b"}}]}  # Collation dependent.
+		assert optimize(query) == {'a': {'$gte': "b"}, '$and': [{'a': {'$gte': "B", '$gt': "b"}}]}
+	
+	def test_equality_type_distinguished(self):
+		query = {'$and': [{'n': 1}, {'n': True}]}
+		assert optimize(query) == {'n': 1, '$and': [{'n': True}]}
+		
+		query = {'$and': [{'n': {'$in': [1]}}, {'n': {'$in': [True]}}]}
+		assert optimize(query) == {'n': {'$in': [1]}, '$and': [{'n': {'$in': [True]}}]}
+	
+	def test_identical_equality_merged(self):
+		assert optimize({'$and': [{'n': 1}, {'n': 1}]}) == {'n': 1}
+	
+	def test_regex_options_retained(self):
+		query = {'$and': [{'f': {'$regex': "a", '$options': "i"}}, {'f': {'$regex': "a"}}]}
+		assert optimize(query) == {'f': {'$regex': "a", '$options': "i"}, '$and': [{'f': {'$regex': "a"}}]}
+	
+	def test_identical_regex_merged(self):
+		query = {'$and': [{'f': {'$regex': "a", '$options': "i"}}, {'f': {'$regex': "a", '$options': "i"}}]}
+		assert optimize(query) == {'f': {'$regex': "a", '$options': "i"}}
+	
+	def test_other_operators_retained(self):
+		query = {'$text': {'$search': "hello"}, 'a': {'$exists': True}}
+		assert optimize(query) == query
+
+
+class TestOptimize(object):
+	def test_original_unmodified(self):
+		inner = {'a': {'$eq': 1, '$nin': []}}
+		query = {'$and': [inner, {'a': {'$gt': 0}}]}
+		
+		optimize(query)
+		
+		assert inner == {'a': {'$eq': 1, '$nin': []}}
+		assert len(query['$and']) == 2
+	
+	def test_filter_preserved(self):
+		query = ((Sample.age > 18) & (Sample.age > 21)) | (Sample.name == "Alice") | (Sample.name == "Bob")
+		query = Filter(query, document=Sample)
+		result = optimize(query)
+		
+		assert isinstance(result, Filter)
+		assert result.document is Sample
+		assert result.as_query == {'$or': [{'age': {'$gt': 21}}, {'name': {'$in': ["Alice", "Bob"]}}]}
@@ -146,6 +146,39 @@ class TestQueryable(object):  # TODO: Properly use pytest fixtures for this...
 			Sample.array['bar']
 
 
+class TestQueryableCaching(object):
+	def test_interned(self):
+		assert Sample.generic is Sample.generic
+		assert Sample.embed.name is Sample.embed.name
+	
+	def test_shared_name(self):
+		assert Sample.field._field is Sample.__attributes__['field']
+		assert Sample.number._field is Sample.__attributes__['number']
+		assert Sample.field is Sample.field
+	
+	def test_per_class(self):
+		class Derived(Sample):
+			pass
+		
+		assert Derived.generic is not Sample.generic
+		assert Derived.generic._document is Derived
+		assert Derived.embed.name._document is Derived
+	
+	def test_redefined(self):
+		class Derived(Sample):
+			pass
+		
+		original = Derived.generic
+		Derived.generic = Field('other')
+		
+		assert Derived.generic is not original
+		assert unicode(Derived.generic) == 'other'
+	
+	def test_positional_distinct(self):
+		assert Sample.embed.S is not Sample.embed
+		assert unicode(Sample.embed) == 'embed'
+
+
 class TestQueryableQueryableQueryable(object):
 	def test_left_merge(self, S):
 		a = (S.foo & S.bar)
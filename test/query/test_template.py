@@ -0,0 +1,170 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import pytest
+from bson import ObjectId as oid
+
+from marrow.mongo import Document, Filter
+from marrow.mongo.field import Array, Embed, Integer, ObjectId, String
+from marrow.mongo.query import Placeholder, Template, prepare
+from marrow.mongo.query.template import LIMIT
+
+
+class Post(Document):
+	class Comment(Document):
+		author = String()
+	
+	author = ObjectId()
+	title = String(strip=True)
+	views = Integer()
+	tags = Array(String())
+	comments = Array(Embed(Comment))
+
+
+def by_author(D, p):
+	return (D.author == p.author) & (D.views >= p.views)
+
+
+class TestTemplate(object):
+	def test_equivalence(self):
+		template = prepare(Post, by_author)
+		result = template(author='5a0c6d1b9f5e8a0b2c3d4e5f', views="27")
+		
+		assert isinstance(result, Filter)
+		assert result.document is Post
+		assert result.as_query == ((Post.author == '5a0c6d1b9f5e8a0b2c3d4e5f') & (Post.views >= "27")).as_query
+		assert result.as_query == {'author': oid('5a0c6d1b9f5e8a0b2c3d4e5f'), 'views': {'$gte': 27}}
+	
+	def test_names(self):
+		template = prepare(Post, by_author)
+		assert template.names == {'author', 'views'}
+	
+	def test_independent_results(self):
+		template = prepare(Post, lambda D, p: D.views.range(p.low, p.high))
+		first = template(low=1, high=2)
+		second = template(low=3, high=4)
+		
+		assert first.as_query == {'views': {'$gte': 1, '$lt': 2}}
+		assert second.as_query == {'views': {'$gte': 3, '$lt': 4}}
+	
+	def test_static_parts_preserved(self):
+		template = prepare(Post, lambda D, p: (D.title == " Hello ") & (D.views > p.views))
+		assert template(views=1).as_query == {'title': "Hello", 'views': {'$gt': 1}}
+	
+	def test_no_placeholders(self):
+		template = prepare(Post, lambda D, p: D.title == "Hello")
+		
+		assert template.names == frozenset()
+		assert template().as_query == {'title': "Hello"}
+		assert template().as_query is not template().as_query
+	
+	def test_iterable_placeholder(self):
+		template = prepare(Post, lambda D, p: D.views.any(p.counts))
+		assert template(counts=["1", 2]).as_query == {'views': {'$in': [1, 2]}}
+	
+	def test_individual_placeholders(self):
+		template = prepare(Post, lambda D, p: D.views.any(p.first, 2, p.second))
+		assert template(first="1", second=3).as_query == {'views': {'$in': [1, 2, 3]}}
+	
+	def test_nested(self):
+		template = prepare(Post, lambda D, p: D.comments.author == p.name)
+		assert template(name=27).as_query == {'comments.author': "27"}
+	
+	def test_or(self):
+		template = prepare(Post, lambda D, p: (D.views < p.low) | (D.views > p.high))
+		assert template(low=1, high=9).as_query == {'$or': [{'views': {'$lt': 1}}, {'views': {'$gt': 9}}]}
+	
+	def test_none(self):
+		template = prepare(Post, by_author)
+		assert template(author=None, views=None).as_query == {'author': None, 'views': {'$gte': None}}
+	
+	def test_missing(self):
+		with pytest.raises(TypeError):
+			prepare(Post, by_author)(author=None)
+	
+	def test_unknown(self):
+		with pytest.raises(TypeError):
+			prepare(Post, by_author)(author=None, views=1, extra=2)
+	
+	def test_placeholder_repr(self):
+		assert repr(Placeholder('name')) == "Placeholder('name')"
+
+
+class TestTemplateCache(object):
+	def test_cached_per_class(self):
+		class Cached(Post):
+			pass
+		
+		template = prepare(Cached, by_author)
+		hits = template.hits
+		
+		assert prepare(Cached, by_author) is template
+		assert template.hits == hits + 1
+		assert prepare(Post, by_author) is not template
+	
+	def test_repeated_definition(self):
+		class Cached(Post):
+			pass
+		
+		def query():
+			return prepare(Cached, lambda D, p: D.views == p.views)
+		
+		assert query() is query()
+	
+	def test_closure(self):
+		class Cached(Post):
+			pass
+		
+		def query(value):
+			return prepare(Cached, lambda D, p: (D.title == value) & (D.views == p.views))
+		
+		assert query("a") is query("a")
+		assert query("a") is not query("b")
+		assert query("b")(views=1).as_query == {'title': "b", 'views': 1}
+	
+	def test_unhashable_closure(self):
+		class Cached(Post):
+			pass
+		
+		def query(value):
+			return prepare(Cached, lambda D, p: D.views.any(value))
+		
+		assert query([1]) is not query([1])
+		assert query([1, 2])().as_query == {'views': {'$in': [1, 2]}}
+	
+	def test_closure_type(self):
+		class Cached(Post):
+			pass
+		
+		def query(value):
+			return prepare(Cached, lambda D, p: {'flag': value, 'title': D.title == p.title})
+		
+		assert query(1) is not query(True)
+		assert query(True)(title="a")['flag'] is True
+	
+	def test_bounded(self):
+		class Cached(Post):
+			pass
+		
+		def query(value):
+			return prepare(Cached, lambda D, p: (D.views == value) & (D.title == p.title))
+		
+		first = query(0)
+		second = query(1)
+		
+		for i in range(2, LIMIT + 1):
+			assert query(0) is first  # Recently used, thus retained.
+			query(i)
+		
+		assert len(Cached.__templates__) == LIMIT
+		assert query(0) is first
+		assert query(1) is not second  # The least recently used was discarded.
+	
+	def test_calls(self):
+		template = Template(Post, by_author)
+		template(author=None, views=1)
+		template.bind(author=None, views=2)
+		
+		assert template.calls == 2
+		assert template.hits == 0
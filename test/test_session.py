@@ -1,5 +1,26 @@
 # encoding: utf-8
 
+from bson import ObjectId
+
 from web.session.mongo import MongoSession, MongoSessionStorage
 
-MongoSessionStorage, MongoSession
+
+class Context(object):
+	def __init__(self, **session):
+		self.session = session
+
+
+class TestMongoSession(object):
+	def test_persist(self, connection):
+		engine = MongoSession()
+		engine.name = 'mongo'
+		MongoSessionStorage.bind(connection.test)
+		
+		session = MongoSessionStorage(ObjectId())
+		session.cart = []
+		engine.persist(Context(mongo=session))  # A new session is inserted.
+		
+		session.cart.append('widget')  # In-place modification of a plain container.
+		engine.persist(Context(mongo=session))
+		
+		assert MongoSessionStorage.get_collection().find_one(session.id)['cart'] == ['widget']
@@ -122,3 +122,43 @@ class TestDocumentBinding(object):
 		
 		with pytest.raises(TypeError):
 			Sample().update_one()
+
+
+class TestDeltaPersistence(object):
+	@pytest.fixture
+	def Person(self, request, db):
+		class Person(Collection):
+			__collection__ = 'people'
+			
+			name = Field()
+			age = Field()
+		
+		Person.bind(db)
+		Person.get_collection().delete_many({})
+		
+		return Person
+	
+	def test_save_new(self, Person):
+		person = Person(name="Alice", age=27)
+		person.save()
+		
+		assert not person.changed
+		assert Person.get_collection().find_one({'_id': person.id}) == {'_id': person.id, 'name': "Alice", 'age': 27}
+	
+	def test_save_nothing(self, Person):
+		person = Person(name="Alice")
+		person.insert_one()
+		
+		assert not person.changed
+		assert person.save() is None
+	
+	def test_save_changes(self, Person):
+		person = Person(name="Alice", age=27)
+		person.insert_one()
+		
+		person = Person.from_mongo(Person.get_collection().find_one({'_id': person.id}))
+		person.name = "Bob"
+		del person.age
+		person.save()
+		
+		assert Person.get_collection().find_one({'_id': person.id}) == {'_id': person.id, 'name': "Bob"}
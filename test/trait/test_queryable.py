@@ -2,14 +2,18 @@
 
 from __future__ import unicode_literals
 
+import re
+
 import pytest
 from bson import ObjectId
 from pymongo.cursor import CursorType
 from pymongo.errors import WriteError
 
 from marrow.mongo import Index, U
-from marrow.mongo.field import Integer, String
+from marrow.mongo import Document
+from marrow.mongo.field import Array, Embed, Integer, String
 from marrow.mongo.trait import Queryable
+from marrow.mongo.util.stats import profiler
 
 
 @pytest.fixture
@@ -26,6 +30,7 @@ def Sample(request, db):
 		integer = Integer()
 		
 		_field = Index('integer', background=False)
+		_paged = Index('integer', 'id', background=False)
 	
 	Sample.bind(db).create_collection(drop=True)
 	
@@ -40,6 +45,32 @@ def Sample(request, db):
 	return Sample
 
 
+class Address(Document):
+	city = String()
+	country = String()
+
+
+class Person(Queryable):
+	__collection__ = 'queryable_nested'
+	
+	name = String()
+	address = Embed(Address)
+	previous = Array(Embed(Address), assign=True)
+
+
+@pytest.fixture
+def People(request, db):
+	Person.bind(db).create_collection(drop=True)
+	
+	Person.__bound__.insert_many([
+			{'_id': ObjectId('59129d460aa7397ce3f96401'), 'name': 'Alice',
+				'address': {'city': 'Montréal', 'country': 'CA'},
+				'previous': [{'city': 'Paris', 'country': 'FR'}, {'city': 'Berlin', 'country': 'DE'}]},
+			{'_id': ObjectId('59129d460aa7397ce3f96402'), 'name': 'Bob'},
+		])
+	
+	return Person
+
 
 class TestQueryableCore(object):
 	def test_prepare_find_cursor_type_explicit(self, Sample):
@@ -101,6 +132,16 @@ class TestQueryableTrait(object):
 		doc = Sample.find_one(Sample.integer == 27)
 		assert doc.string == 'bar'
 	
+	def test_find_one_profiled(self, Sample):
+		profiler.reset()
+		Sample.find_one(Sample.integer == 27)
+		Sample.find_one(Sample.integer == 42)
+		
+		entry = profiler.get(Sample, 'find_one', Sample.integer == 0)
+		assert entry.count == 2
+		assert entry.documents == 2
+		assert entry.shape == '{integer:?}'
+	
 	def test_find_one_short(self, Sample):
 		doc = Sample.find_one('59129d460aa7397ce3f9643e')
 		assert doc.string == 'pre'
@@ -133,6 +174,177 @@ class TestQueryableTrait(object):
 		assert doc.string == 'hoi'
 		assert doc.integer == 42
 	
+	def test_reload_missing(self, Sample):
+		doc = Sample.find_one(integer=42)
+		Sample.get_collection().update_one(Sample.id == doc, {'$unset': {'string': True}})
+		doc.reload('string')
+		assert 'string' not in doc
+		assert doc.integer == 42
+	
+	def test_reload_nested(self, People):
+		alice = People.find_one(name='Alice')
+		People.get_collection().update_one(People.id == alice, {'$set': {
+				'name': 'Alicia',
+				'address.city': 'Toronto',
+				'address.country': 'XX',
+				'previous.0.city': 'Lyon',
+				'previous.1.country': 'XX',
+			}})
+		
+		alice.reload('address.city', 'previous.city')
+		
+		assert alice.name == 'Alice'
+		assert alice.address.city == 'Toronto'
+		assert alice.address.country == 'CA'  # Not refreshed, not clobbered.
+		assert [(i.city, i.country) for i in alice.previous] == [('Lyon', 'FR'), ('Berlin', 'DE')]
+		assert not alice.changed
+	
+	def test_reload_many(self, Sample):
+		docs = list(Sample.find(sort=('integer', )))
+		duplicate = Sample.find_one(integer=42)
+		Sample.get_collection().update_many({'integer': {'$ne': None}}, {'$inc': {'integer': 1}})
+		Sample.get_collection().delete_one({'integer': 8})
+		
+		profiler.reset()
+		missing = Sample.reload_many(docs + [duplicate], chunk=2)
+		
+		assert missing == [docs[1]]
+		assert [i.integer for i in docs] == [None, 7, 28, 43]
+		assert duplicate.integer == 43
+		assert duplicate.__data__ is not docs[3].__data__
+		assert {i['operation'] for i in profiler.dump()} == {'reload_many'}
+		assert profiler.dump()[0]['count'] == 2
+	
+	def test_reload_many_fields(self, Sample):
+		docs = list(Sample.find(sort=('integer', )))
+		Sample.get_collection().update_many({}, {'$set': {'string': 'hoi', 'integer': 0}})
+		
+		assert Sample.reload_many(docs, 'string') == []
+		assert [i.string for i in docs] == ['hoi'] * 4
+		assert [i.integer for i in docs] == [None, 7, 27, 42]
+	
+	def test_update_one_local(self, Sample):
+		doc = Sample.find_one(integer=42)
+		doc.update_one(inc__integer=1, string="hoi", local=True)
+		assert doc.string == 'hoi'
+		assert doc.integer == 43
+		assert not doc.changed
+		assert Sample.find_one(integer=43).string == 'hoi'
+	
+	def test_update_one_local_positional(self, People):
+		alice = People.find_one(name='Alice')
+		alice.update_one({'$set': {'previous.$[].country': 'XX'}}, local=True)
+		
+		assert [i.country for i in alice.previous] == ['XX', 'XX']
+		assert not alice.changed
+	
+	def test_find_one_and_update(self, Sample):
+		doc = Sample.find_one_and_update(U(Sample, inc__integer=1), integer=42)
+		assert isinstance(doc, Sample)
+		assert doc.integer == 42  # As it was.
+		
+		doc = Sample.find_one_and_update({'$inc': {'integer': 1}}, Sample.string == 'baz', return_document=True,
+				projection=('integer', ))
+		assert doc.integer == 44
+		assert 'string' not in doc
+		
+		assert Sample.find_one_and_update(U(Sample, integer=1), string='missing') is None
+	
+	def test_find_one_and_update_upsert(self, Sample):
+		doc = Sample.find_one_and_update(U(Sample, integer=1), string='new', upsert=True, return_document=True)
+		assert doc.string == 'new'
+		assert doc.integer == 1
+	
+	def test_find_one_and_update_requires_operation(self, Sample):
+		with pytest.raises(TypeError):
+			Sample.find_one_and_update(None, integer=42)
+	
+	def test_find_one_and_update_instance(self, Sample):
+		doc = Sample.find_one(integer=42)
+		result = doc.find_one_and_update(U(Sample, string="hoi"), return_document=True)
+		assert result == doc
+		assert result is not doc
+		assert result.string == 'hoi'
+		
+		assert doc.find_one_and_update(U(Sample, string="hoi"), Sample.integer == 7) is None
+	
+	def test_find_one_and_update_sort(self, Sample):
+		doc = Sample.find_one_and_update(U(Sample, string="first"), Sample.integer != None, sort=('-integer', ))
+		assert doc.integer == 42
+	
+	def test_find_one_and_replace(self, Sample):
+		doc = Sample.find_one(integer=42)
+		doc.string = "replaced"
+		
+		previous = doc.find_one_and_replace()
+		assert previous.string == 'baz'
+		assert Sample.find_one(integer=42).string == 'replaced'
+		
+		previous = Sample.find_one_and_replace({"string": "other"}, integer=7)
+		assert previous.string == 'foo'
+		assert 'integer' not in Sample.find_one(string="other")
+		
+		with pytest.raises(TypeError):
+			Sample.find_one_and_replace()
+	
+	def test_find_one_and_delete(self, Sample):
+		doc = Sample.find_one_and_delete(integer=42)
+		assert doc.string == 'baz'
+		assert Sample.find_one(integer=42) is None
+		
+		doc = Sample.find_one(integer=27)
+		assert doc.find_one_and_delete().string == 'bar'
+		assert Sample.get_collection().count() == 2
+		
+		with pytest.raises(TypeError):
+			Sample.find_one_and_delete(integer=7, upsert=True)
+	
+	def test_paginate(self, Sample):
+		page, token = Sample.paginate(sort=('integer', ), limit=2)
+		assert [i.string for i in page] == ['pre', 'foo']
+		
+		page, token = Sample.paginate(sort=('integer', ), limit=2, after=token)
+		assert [i.string for i in page] == ['bar', 'baz']
+		assert token is None
+	
+	def test_paginate_descending(self, Sample):
+		page, token = Sample.paginate(sort=('-integer', '-id'), limit=3)
+		assert [i.string for i in page] == ['baz', 'bar', 'foo']
+		
+		page, token = Sample.paginate(sort=('-integer', '-id'), limit=3, after=token)
+		assert [i.string for i in page] == ['pre']
+	
+	def test_paginate_projection(self, Sample):
+		page, token = Sample.paginate(sort=('integer', ), limit=2, projection=('string', ))
+		assert [i.string for i in page] == ['pre', 'foo']
+		
+		page, token = Sample.paginate(sort=('integer', ), limit=2, projection=('string', ), after=token)
+		assert [i.string for i in page] == ['bar', 'baz']
+		
+		projection = {'string': True}
+		page, token = Sample.paginate(sort=('integer', ), limit=2, projection=projection)
+		assert projection == {'string': True}
+	
+	def test_paginate_regex_prefix(self, Sample):
+		class Named(Sample):
+			_named = Index('string', '-integer', 'id', background=False)
+		
+		page, token = Named.paginate(string='bar', sort=('-integer', ))
+		assert [i.string for i in page] == ['bar']
+		
+		with pytest.raises(ValueError):  # A pattern match does not select a single value of the prefix.
+			Named.paginate({'string': re.compile('^b')}, sort=('-integer', ))
+	
+	def test_paginate_unindexed(self, Sample):
+		with pytest.raises(ValueError):
+			Sample.paginate(sort=('string', ))
+		
+		with pytest.raises(ValueError):  # The primary key tie-breaker is not covered by an index.
+			Sample.paginate(sort=('-string', 'integer'))
+		
+		with pytest.raises(ValueError):
+			Sample.paginate(sort=('integer', ), after=Sample.paginate(sort=('-integer', '-id'), limit=1)[1])
+	
 	def test_insert_one(self, Sample):
 		doc = Sample(string='diz', integer=2029)
 		assert doc.id
@@ -0,0 +1,157 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import pytest
+from bson import ObjectId
+
+from marrow.mongo.field import Integer, String
+from marrow.mongo.trait import Queryable
+from marrow.mongo.util.bulk import BulkResult
+
+ALICE = ObjectId('59129d460aa7397ce3f96401')
+BOB = ObjectId('59129d460aa7397ce3f96402')
+
+
+class Person(Queryable):
+	__collection__ = 'bulk_collection'
+	
+	name = String()
+	age = Integer()
+
+
+@pytest.fixture
+def People(request, connection):
+	Person.bind(connection.test).create_collection(drop=True)
+	
+	Person.__bound__.insert_many([
+			{'_id': ALICE, 'name': 'Alice', 'age': 27},
+			{'_id': BOB, 'name': 'Bob', 'age': 42},
+		])
+	
+	return Person
+
+
+class TestBulkResult(object):
+	def test_accumulation(self):
+		result = BulkResult()
+		assert result
+		
+		result.add({'nInserted': 2, 'nMatched': 1, 'nModified': 1, 'upserted': [{'index': 0, '_id': 1}]})
+		result.add({'nInserted': 1, 'nRemoved': 3})
+		
+		assert result.batches == 2
+		assert result.inserted == 3
+		assert result.matched == result.modified == 1
+		assert result.deleted == 3
+		assert result.upserted == [1]
+		assert 'inserted=3' in repr(result)
+		
+		result.errors.append((None, {}))
+		assert not result
+
+
+class TestBulk(object):
+	def test_requests(self, People):
+		with People.bulk() as bulk:
+			bulk.insert(People(name="Charlie", age=12))
+			bulk.update(People.find_one(ALICE), inc__age=1)
+			bulk.delete(People(id=BOB))
+			
+			assert len(bulk) == 3
+		
+		assert not len(bulk)
+		assert bulk.result
+		assert bulk.result.batches == 1
+		assert bulk.result.inserted == 1
+		assert bulk.result.modified == 1
+		assert bulk.result.deleted == 1
+		
+		assert People.find_one(ALICE).age == 28
+		assert People.find_one(BOB) is None
+		assert People.get_collection().count() == 2
+	
+	def test_update_requires_operation(self, People):
+		with pytest.raises(TypeError):
+			People.bulk().update(People(id=ALICE))
+	
+	def test_save(self, People):
+		alice = People.find_one(ALICE)
+		bulk = People.bulk()
+		
+		bulk.save(alice)
+		assert not len(bulk)  # Nothing changed.
+		
+		alice.name = "Alicia"
+		bulk.save(alice)
+		bulk.flush()
+		
+		assert not alice.changes()
+		assert People.find_one(ALICE).name == "Alicia"
+	
+	def test_batching(self, People):
+		bulk = People.bulk(batch=2)
+		
+		for i in range(5):
+			bulk.insert(People(name="Person %d" % i))
+		
+		assert len(bulk) == 1
+		assert bulk.result.batches == 2
+		
+		bulk.flush()
+		
+		assert bulk.result.batches == 3
+		assert bulk.result.inserted == 5
+		assert People.get_collection().count() == 7
+	
+	def test_size(self, People):
+		bulk = People.bulk(size=100)
+		
+		for i in range(10):
+			bulk.insert(People(name="x" * 50))
+		
+		assert bulk.result.batches == 5
+	
+	def test_errors(self, People):
+		duplicate = People(id=ALICE, name="Impostor")
+		charlie = People(name="Charlie")
+		
+		with People.bulk() as bulk:
+			bulk.insert(duplicate)
+			bulk.insert(charlie)
+		
+		assert not bulk.result
+		assert bulk.result.inserted == 1
+		assert len(bulk.result.errors) == 1
+		assert bulk.result.errors[0][0] is duplicate
+		assert bulk.result.errors[0][1]['code'] == 11000
+		assert People.find_one(ALICE).name == "Alice"
+		assert People.get_collection().count() == 3
+	
+	def test_ordered(self, People):
+		duplicate = People(id=ALICE, name="Impostor")
+		charlie = People(name="Charlie")
+		diane = People(name="Diane")
+		
+		with People.bulk(ordered=True) as bulk:
+			bulk.insert(duplicate)
+			bulk.insert(charlie)
+			bulk.flush()
+			bulk.insert(diane)
+		
+		assert bulk.result.inserted == 0
+		assert [document for document, error in bulk.result.errors] == [duplicate]
+		assert bulk.result.skipped == [charlie, diane]
+		assert People.get_collection().count() == 2
+	
+	def test_discard_on_error(self, People):
+		alice = People(id=ALICE)
+		
+		with pytest.raises(RuntimeError):
+			with People.bulk() as bulk:
+				bulk.delete(alice)
+				raise RuntimeError()
+		
+		assert not len(bulk)
+		assert bulk.result.skipped == [alice]
+		assert People.find_one(ALICE)
@@ -0,0 +1,195 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+from time import sleep
+
+import pytest
+from bson import ObjectId
+
+from marrow.mongo import Filter
+from marrow.mongo.field import Integer, String
+from marrow.mongo.trait import Queryable
+from marrow.mongo.util.cache import DocumentCache, Listener, cache_for, cached, caches, identify
+from marrow.mongo.util.stats import profiler
+
+ALICE = ObjectId('59129d460aa7397ce3f96401')
+
+
+class Profile(Queryable):
+	__collection__ = 'cache_collection'
+	__cache__ = {'size': 2, 'ttl': 30}
+	
+	name = String()
+	age = Integer()
+
+
+@pytest.fixture
+def Profiles(request, connection):
+	Profile.bind(connection.test).create_collection(drop=True)
+	Profile.__bound__.insert_one({'_id': ALICE, 'name': 'Alice', 'age': 27})
+	
+	caches.clear()
+	profiler.reset()
+	
+	return Profile
+
+
+class TestIdentify(object):
+	def test_primary_key(self):
+		assert identify({'_id': ALICE}) == ALICE
+		assert identify(Filter({'_id': {'$eq': ALICE}})) == ALICE
+	
+	def test_other(self):
+		assert identify({'_id': {'$in': [ALICE]}}) is None
+		assert identify({'_id': ALICE, 'name': 'Alice'}) is None
+
+
+class TestDocumentCache(object):
+	def test_lru(self):
+		cache = DocumentCache(2)
+		cache.set(1, {'v': 1})
+		cache.set(2, {'v': 2})
+		cache.get(1)
+		cache.set(3, {'v': 3})
+		
+		assert 2 not in cache
+		assert cache.get(1) == {'v': 1}
+		assert cache.evictions == 1
+	
+	def test_ttl(self):
+		cache = DocumentCache(ttl=0.01)
+		cache.set(1, {'v': 1})
+		sleep(0.02)
+		
+		assert cache.get(1) is None
+		assert cache.as_dict()['evictions'] == 1
+	
+	def test_copies(self):
+		cache = DocumentCache()
+		record = {'v': [1]}
+		cache.set(1, record)
+		record['v'].append(2)
+		cache.get(1)['v'].append(3)
+		
+		assert cache.get(1) == {'v': [1]}
+	
+	def test_invalidate(self):
+		cache = DocumentCache()
+		cache.set(1, {})
+		cache.invalidate(1)
+		cache.invalidate(2)
+		
+		assert not len(cache)
+		assert cache.invalidations == 1
+	
+	def test_generation(self):
+		cache = DocumentCache()
+		generation = cache.generation
+		cache.invalidate(1)  # E.g. a write racing the retrieval of the record.
+		
+		cache.set(1, {'stale': True}, generation)
+		assert 1 not in cache
+		
+		cache.set(1, {}, cache.generation)
+		assert 1 in cache
+
+
+class Server(object):
+	def __init__(self):
+		self.client = self  # Standing in for both the database and the client.
+	
+	@property
+	def address(self):
+		raise AssertionError("Server selection performed.")
+	
+	def collection(self):
+		collection = Watched()
+		collection.database = self
+		return collection
+
+
+class TestRegistry(object):
+	def test_per_client(self):
+		caches.clear()
+		
+		first = Server().collection()
+		second = Server().collection()
+		
+		assert cached(first) is None
+		
+		cache = cache_for(first, {'size': 10})
+		assert cache.size == 10
+		assert cache_for(first, {}) is cached(first) is cache
+		assert cache_for(second, {}) is not cache
+		
+		caches.clear()
+	
+	def test_none_declared(self):
+		caches.clear()
+		assert cached(None) is None
+
+
+class Stream(object):
+	"""A change stream reporting no changes."""
+	
+	def __enter__(self):
+		return self
+	
+	def __exit__(self, kind, value, traceback):
+		pass
+	
+	def try_next(self):
+		sleep(0.01)
+
+
+class Watched(object):
+	full_name = 'test.watched'
+	
+	def watch(self, **kw):
+		return Stream()
+
+
+class TestListener(object):
+	def test_stop(self):
+		cache = DocumentCache()
+		cache.set(1, {})
+		
+		listener = cache.listen(Watched())
+		assert isinstance(listener, Listener)
+		assert listener.is_alive()
+		
+		listener.stop()
+		listener.join(1)
+		
+		assert not listener.is_alive()
+		assert not len(cache)  # Changes may have been missed once stopped.
+
+
+class TestReadThrough(object):
+	def test_hit(self, Profiles):
+		first = Profiles.find_one(ALICE)
+		second = Profiles.find_one(ALICE)
+		
+		assert first is not second
+		assert second.name == 'Alice'
+		assert Profiles.get_cache().as_dict()['hits'] == 1
+		assert profiler.get(Profiles, 'find_one', {'_id': ALICE}).count == 1
+	
+	def test_uncached(self, Profiles):
+		Profiles.find_one(name='Alice')
+		Profiles.find_one(ALICE, projection=('name', ))
+		
+		assert not len(Profiles.get_cache())
+	
+	def test_invalidated(self, Profiles):
+		alice = Profiles.find_one(ALICE)
+		alice.update_one(inc__age=1)
+		
+		assert ALICE not in Profiles.get_cache()
+		assert Profiles.find_one(ALICE).age == 28
+		
+		alice = Profiles.find_one(ALICE)
+		alice.delete_one()
+		
+		assert Profiles.find_one(ALICE) is None
@@ -0,0 +1,123 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+from marrow.mongo import Document
+from marrow.mongo.field import Integer, String
+from marrow.mongo.trait import Derived, Queryable
+from marrow.mongo.util.cursor import DocumentCursor
+from marrow.mongo.util.stats import profiler
+from marrow.package.canonical import name
+
+
+class Person(Derived, Queryable):
+	__collection__ = 'cursor_collection'
+	
+	name = String()
+	age = Integer()
+
+
+class Employee(Person):
+	pass
+
+
+@pytest.fixture
+def People(request, connection):
+	Person.bind(connection.test).create_collection(drop=True)
+	
+	Person.__bound__.insert_many([
+			{'_id': ObjectId('59129d460aa7397ce3f96401'), 'name': 'Alice', 'age': 27},
+			{'_id': ObjectId('59129d460aa7397ce3f96402'), 'name': 'Bob', 'age': 42, '_cls': name(Employee)},
+			{'_id': ObjectId('59129d460aa7397ce3f96403'), 'name': 'Carol', 'age': 7, '_cls': name(Employee)},
+			{'_id': ObjectId('59129d460aa7397ce3f96404'), 'name': 'Dave'},
+		])
+	
+	return Person
+
+
+class TestIteration(object):
+	def test_documents(self, People):
+		cursor = People.find()
+		
+		assert isinstance(cursor, DocumentCursor)
+		assert [type(i) for i in cursor] == [Person, Employee, Employee, Person]
+		assert list(cursor._kinds) == [name(Employee)]
+	
+	def test_chained(self, People):
+		cursor = People.find(People.age > 0).sort('-age').skip(1).batch_size(2)
+		
+		assert cursor.options['batch_size'] == 2
+		assert [i.name for i in cursor] == ['Alice', 'Carol']
+	
+	def test_slice(self, People):
+		assert [i.name for i in People.find()[1:3]] == ['Bob', 'Carol']
+		assert People.find(sort=('name', ))[3].name == 'Dave'
+		
+		with pytest.raises(IndexError):
+			People.find()[4]
+	
+	def test_passthrough(self, People):
+		cursor = People.find()
+		
+		assert cursor.count() == 4
+		assert cursor.max_time_ms(1000) is cursor
+	
+	def test_profiled(self, People):
+		profiler.reset()
+		list(People.find(age=27))
+		
+		entry = profiler.get(People, 'find', {'age': 0})
+		assert entry.count == 1
+		assert entry.documents == 1
+
+
+class TestShortcuts(object):
+	def test_first(self, People):
+		assert People.find(sort=('-age', )).first().name == 'Bob'
+		assert People.find(age=99).first() is None
+	
+	def test_one(self, People):
+		assert People.find(name='Carol').one().age == 7
+		
+		with pytest.raises(LookupError):
+			People.find(name='Eve').one()
+		
+		with pytest.raises(ValueError):
+			People.find().one()
+	
+	def test_exists(self, People):
+		assert People.find(name='Alice').exists()
+		assert not People.find(name='Eve').exists()
+	
+	def test_ids(self, People):
+		assert list(People.find(People.age > 20).ids()) == [
+				ObjectId('59129d460aa7397ce3f96401'),
+				ObjectId('59129d460aa7397ce3f96402'),
+			]
+	
+	def test_scalar(self, People):
+		assert list(People.find().scalar('age')) == [27, 42, 7, None]
+		assert list(People.find(sort=('name', )).scalar(People.name)) == ['Alice', 'Bob', 'Carol', 'Dave']
+
+
+class TestPrefetch(object):
+	def test_prefetch(self, People):
+		with People.find(prefetch=2).batch_size(1) as cursor:
+			assert [i.name for i in cursor] == ['Alice', 'Bob', 'Carol', 'Dave']
+	
+	def test_abandoned(self, People):
+		cursor = People.find(prefetch=1)
+		assert next(cursor).name == 'Alice'
+		
+		cursor.close()
+		assert not cursor._thread.is_alive()
+	
+	def test_failure(self, People):
+		cursor = DocumentCursor(Document, People.get_collection(), {'$bogus': 1}, {}, True)
+		
+		with pytest.raises(OperationFailure):
+			list(cursor)
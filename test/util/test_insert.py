@@ -0,0 +1,75 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+from itertools import count
+
+import pytest
+from bson import ObjectId
+
+from marrow.mongo.field import Integer, String
+from marrow.mongo.trait import Queryable
+from marrow.mongo.util.insert import _chunked
+
+ALICE = ObjectId('59129d460aa7397ce3f96401')
+
+
+class Person(Queryable):
+	__collection__ = 'insert_collection'
+	
+	name = String()
+	age = Integer()
+
+
+@pytest.fixture
+def People(request, connection):
+	Person.bind(connection.test).create_collection(drop=True)
+	Person.__bound__.insert_one({'_id': ALICE, 'name': 'Alice', 'age': 27})
+	
+	return Person
+
+
+def test_chunked_is_lazy():
+	source = count()
+	chunks = _chunked(source, 3)
+	
+	assert next(chunks) == [0, 1, 2]
+	assert next(source) == 3  # Nothing further was consumed.
+	assert next(chunks) == [4, 5, 6]
+
+
+def test_chunked_remainder():
+	assert list(_chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+	assert list(_chunked([], 2)) == []
+
+
+class TestInsertMany(object):
+	def test_insert(self, People):
+		people = (People(name="Person %d" % i, age=i) for i in range(25))
+		result = People.insert_many(people, chunk=4, workers=2)
+		
+		assert result
+		assert result.batches == 7
+		assert result.inserted == 25
+		assert result.elapsed > 0
+		assert result.rate > 0
+		assert People.get_collection().count() == 26
+	
+	def test_errors(self, People):
+		duplicate = People(id=ALICE, name="Impostor")
+		people = [People(name="Bob"), duplicate, People(name="Charlie")]
+		
+		result = People.insert_many(people, chunk=2, workers=2)
+		
+		assert not result
+		assert result.inserted == 2
+		assert [document for document, error in result.errors] == [duplicate]
+		assert People.get_collection().count() == 3
+	
+	def test_processes(self, People):
+		people = [{'name': "Bob"}, People(name="Charlie")]
+		result = People.insert_many(people, chunk=1, processes=1)
+		
+		assert result.inserted == 2
+		assert isinstance(people[0]['_id'], ObjectId)
+		assert People.get_collection().count() == 3
@@ -0,0 +1,87 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+from bson import BSON
+from bson.raw_bson import RawBSONDocument
+
+from marrow.mongo import Document
+from marrow.mongo.field import Array, Embed, Integer, String
+from marrow.mongo.trait import Collection
+from marrow.mongo.util.raw import RawDocument
+
+
+class Child(Document):
+	value = Integer()
+
+
+class Parent(Document):
+	name = String()
+	child = Embed(Child)
+	children = Array(Embed(Child), assign=True)
+
+
+def raw(**data):
+	return RawBSONDocument(BSON.encode(data))
+
+
+class TestRawDocument(object):
+	def test_passthrough(self):
+		doc = RawDocument(raw(name="Bob", count=2))
+		
+		assert doc['name'] == "Bob"
+		assert 'count' in doc
+		assert len(doc) == 2
+		assert doc.pristine
+		assert BSON.encode(doc) == doc.raw
+	
+	def test_copy_on_write(self):
+		doc = RawDocument(raw(name="Bob", count=2))
+		doc['count'] = 3
+		
+		assert doc._data is not None
+		assert not doc.pristine
+		assert BSON(BSON.encode(doc)).decode() == {'name': "Bob", 'count': 3}
+		
+		del doc['name']
+		assert list(doc) == ['count']
+	
+	def test_nested_identity(self):
+		doc = RawDocument(raw(child={'value': 1}, children=[{'value': 2}]))
+		
+		assert isinstance(doc['child'], RawDocument)
+		assert doc['child'] is doc['child']
+		assert isinstance(doc['children'][0], RawDocument)
+		
+		doc['child']['value'] = 27
+		doc['children'][0]['value'] = 42
+		
+		assert not doc.pristine
+		assert BSON(BSON.encode(doc)).decode() == {'child': {'value': 27}, 'children': [{'value': 42}]}
+
+
+class TestRawStorage(object):
+	def test_from_mongo(self):
+		inst = Parent.from_mongo(raw(name="Alice", child={'value': 1}, children=[{'value': 2}]))
+		
+		assert isinstance(inst.__data__, RawDocument)
+		assert inst.name == "Alice"
+		assert inst.child.value == 1
+		
+		inst.child.value = 2
+		inst.children[0].value = 3
+		
+		assert inst['child']['value'] == 2
+		assert BSON(BSON.encode(inst)).decode()['children'] == [{'value': 3}]
+	
+	def test_defaults_upgrade(self):
+		inst = Parent.from_mongo(raw(name="Alice"))
+		assert inst.__data__._data is not None  # Assignment of the children default required a copy.
+		assert inst.children == []
+	
+	def test_collection_configuration(self):
+		class Sample(Collection):
+			__raw__ = True
+		
+		assert Sample._collection_configuration()['codec_options'].document_class is RawBSONDocument
+		assert Collection._collection_configuration()['codec_options'].document_class is not RawBSONDocument
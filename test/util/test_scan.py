@@ -0,0 +1,141 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+from datetime import datetime, timedelta
+from operator import add
+
+import pytest
+from bson import ObjectId
+
+from marrow.mongo import Document
+from marrow.mongo.field import Integer, String
+from marrow.mongo.trait import Queryable
+from marrow.mongo.util import utc
+from marrow.mongo.util.cursor import DocumentCursor
+from marrow.mongo.util.scan import _chronological, partition
+
+EPOCH = datetime(2017, 1, 1, tzinfo=utc)
+
+
+class Sample(Queryable):
+	__collection__ = 'scan_collection'
+	
+	name = String()
+	value = Integer()
+
+
+class Numbered(Queryable):
+	__collection__ = 'scan_numbered'
+	
+	id = Integer('_id')
+	value = Integer()
+
+
+@pytest.fixture
+def Samples(request, connection):
+	Sample.bind(connection.test).create_collection(drop=True)
+	
+	Sample.__bound__.insert_many([
+			{'_id': ObjectId.from_datetime(EPOCH + timedelta(hours=i)), 'name': 'Record %d' % i, 'value': i}
+			for i in range(100)
+		])
+	
+	return Sample
+
+
+class TestPartition(object):
+	def test_chronological(self):
+		first = ObjectId.from_datetime(EPOCH)
+		last = ObjectId.from_datetime(EPOCH + timedelta(seconds=99))
+		boundaries = _chronological(first, last, 4)
+		
+		assert [i.generation_time - EPOCH for i in boundaries] == [timedelta(seconds=25 * i) for i in range(1, 4)]
+	
+	def test_narrow(self):
+		first = ObjectId.from_datetime(EPOCH)
+		assert _chronological(first, first, 4) == []
+	
+	def test_ranges(self, Samples):
+		ranges = partition(Samples.get_collection(), {}, 4)
+		
+		assert len(ranges) == 4
+		assert ranges[0][0] is None and ranges[-1][1] is None
+		assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+	
+	def test_sampled(self, connection):
+		Numbered.bind(connection.test).create_collection(drop=True)
+		Numbered.__bound__.insert_many([{'_id': i, 'value': i} for i in range(100)])
+		
+		ranges = partition(Numbered.get_collection(), {}, 4)
+		
+		assert len(ranges) == 4
+		assert sorted(i.id for i in Numbered.scan(partitions=4)) == list(range(100))
+	
+	def test_empty(self, Samples):
+		assert partition(Samples.get_collection(), {'value': -1}, 4) == [(None, None)]
+
+
+class TestScan(object):
+	def test_documents(self, Samples):
+		results = list(Samples.scan(partitions=8, workers=3))
+		
+		assert all(isinstance(i, Sample) for i in results)
+		assert sorted(i.value for i in results) == list(range(100))
+	
+	def test_filtered(self, Samples):
+		results = Samples.scan(Samples.value < 10, projection=('value', ), workers=2, map=lambda i: i.value)
+		assert sorted(results) == list(range(10))
+	
+	def test_reduce(self, Samples):
+		count = lambda total, document: total + 1
+		
+		assert Samples.scan(reduce=count, initial=0, combine=add) == 100
+		assert len(Samples.scan(partitions=4, reduce=count, initial=0)) == 4
+	
+	def test_map_reduce(self, Samples):
+		values = Samples.scan(partitions=4, map=lambda i: i.value, reduce=add, combine=add)
+		assert values == sum(range(100))
+	
+	def test_reduce_without_initial(self, Samples):
+		larger = lambda a, b: a if a.value > b.value else b
+		
+		assert Samples.scan(partitions=4, reduce=larger, combine=larger).value == 99
+		assert Samples.scan(Samples.value < 0, reduce=larger, combine=larger) is None
+		assert Samples.scan(Samples.value < 0, reduce=larger) == []
+	
+	def test_reduce_mutable_initial(self, Samples):
+		def collect(values, document):
+			values.append(document.value)
+			return values
+		
+		partials = Samples.scan(partitions=4, reduce=collect, initial=[])
+		
+		assert len(partials) == 4
+		assert len(set(id(i) for i in partials)) == 4
+		assert sorted(sum(partials, [])) == list(range(100))
+	
+	def test_abandoned(self, Samples):
+		results = Samples.scan(workers=2)
+		next(results)
+		results.close()
+	
+	def test_abandoned_cursors_closed(self, Samples, monkeypatch):
+		closed = []
+		close = DocumentCursor.close
+		
+		def recording(self):
+			closed.append(self)
+			close(self)
+		
+		monkeypatch.setattr(DocumentCursor, 'close', recording)
+		
+		results = Samples.scan(partitions=4, workers=2)
+		next(results)
+		results.close()
+		
+		assert len(closed) == 4
+	
+	def test_options(self, Samples):
+		with pytest.raises(TypeError):
+			Samples.scan(limit=10)
@@ -0,0 +1,94 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+from marrow.mongo import Document
+from marrow.mongo.field import Integer, String
+from marrow.mongo.util.stats import Profiler, Statistics, fingerprint
+
+
+class Sample(Document):
+	name = String()
+	age = Integer()
+
+
+class TestFingerprint(object):
+	def test_values_stripped(self):
+		assert fingerprint({'name': "Alice", 'age': {'$gt': 18}}) == '{age:{$gt:?},name:?}'
+	
+	def test_key_order(self):
+		assert fingerprint({'b': 1, 'a': 2}) == fingerprint({'a': 3, 'b': 4})
+	
+	def test_arrays(self):
+		assert fingerprint({'a': {'$in': [1, 2, 3]}}) == fingerprint({'a': {'$in': [4]}}) == '{a:{$in:[?]}}'
+	
+	def test_clauses(self):
+		assert fingerprint({'$or': [{'a': 1}, {'b': 2}]}) == '{$or:[{a:?},{b:?}]}'
+	
+	def test_filter(self):
+		assert fingerprint((Sample.age > 18) & (Sample.name == "Bob")) == '{age:{$gt:?},name:?}'
+	
+	def test_pipeline(self):
+		assert fingerprint([{'$match': {'a': 1}}, {'$limit': 10}]) == '[{$match:{a:?}},{$limit:?}]'
+
+
+class TestStatistics(object):
+	def test_accumulation(self):
+		entry = Statistics(Sample, 'find', '{}')
+		
+		for duration in range(1, 101):
+			entry.add(duration / 1000.0, 1, 10)
+		
+		assert entry.count == 100
+		assert entry.documents == 100
+		assert entry.size == 1000
+		assert entry.minimum == 0.001
+		assert entry.maximum == 0.1
+		assert entry.percentile(50) == 0.05
+		assert entry.percentile(99) == 0.099
+		assert abs(entry.mean - 0.0505) < 1e-9
+	
+	def test_empty(self):
+		entry = Statistics(Sample, 'find', '{}')
+		
+		assert entry.mean is None
+		assert entry.percentile(50) is None
+		assert entry.as_dict()['p90'] is None
+
+
+class TestProfiler(object):
+	def test_grouping(self):
+		profiler = Profiler()
+		
+		profiler.record(Sample, 'find', {'age': 18}, 0.5)
+		profiler.record(Sample, 'find', {'age': 27}, 0.25, 2)
+		profiler.record(Sample, 'find', {'name': "Bob"}, 0.1)
+		profiler.record(Sample, 'find_one', {'age': 18}, 0.1)
+		
+		assert len(profiler) == 3
+		
+		entry = profiler.get(Sample, 'find', {'age': 0})
+		assert entry.count == 2
+		assert entry.total == 0.75
+		assert entry.documents == 2
+	
+	def test_dump(self):
+		profiler = Profiler()
+		
+		profiler.record(Sample, 'find', {'name': "Bob"}, 0.1)
+		profiler.record(Sample, 'find', {'age': 18}, 0.5)
+		
+		result = profiler.dump()
+		
+		assert [i['shape'] for i in result] == ['{age:?}', '{name:?}']
+		assert result[0]['document'].endswith('.Sample')
+		assert result[0]['p50'] == 0.5
+		assert len(profiler.dump(1)) == 1
+	
+	def test_reset(self):
+		profiler = Profiler()
+		profiler.record(Sample, 'find', {}, 0.1)
+		profiler.reset()
+		
+		assert not len(profiler)
+		assert list(profiler) == []
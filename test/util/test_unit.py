@@ -0,0 +1,134 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import pytest
+from bson import ObjectId
+
+from marrow.mongo.field import Integer, String
+from marrow.mongo.trait import Queryable
+from marrow.mongo.util.stats import profiler
+from marrow.mongo.util.unit import UnitOfWork, current
+
+ALICE = ObjectId('59129d460aa7397ce3f96401')
+BOB = ObjectId('59129d460aa7397ce3f96402')
+
+
+class Person(Queryable):
+	__collection__ = 'unit_collection'
+	
+	name = String()
+	age = Integer()
+
+
+@pytest.fixture
+def People(request, connection):
+	Person.bind(connection.test).create_collection(drop=True)
+	
+	Person.__bound__.insert_many([
+			{'_id': ALICE, 'name': 'Alice', 'age': 27},
+			{'_id': BOB, 'name': 'Bob', 'age': 42},
+		])
+	
+	return Person
+
+
+class TestActivation(object):
+	def test_scope(self):
+		assert current() is None
+		
+		with UnitOfWork() as outer:
+			assert current() is outer
+			
+			with UnitOfWork(flush=False) as inner:
+				assert current() is inner
+			
+			assert current() is outer
+		
+		assert current() is None
+
+
+class TestIdentityMap(object):
+	def test_find_one(self, People):
+		profiler.reset()
+		
+		with UnitOfWork() as unit:
+			alice = People.find_one(ALICE)
+			
+			assert People.find_one(ALICE) is alice
+			assert People.find_one(id=ALICE) is alice
+			assert People.find_one(name='Alice') is alice
+			assert alice in unit
+		
+		assert profiler.get(People, 'find_one', {'_id': ALICE}).count == 1
+	
+	def test_find(self, People):
+		with UnitOfWork() as unit:
+			alice = People.find_one(ALICE)
+			people = list(People.find())
+			
+			assert people[0] is alice
+			assert len(unit) == 2
+	
+	def test_projection(self, People):
+		with UnitOfWork() as unit:
+			People.find_one(ALICE, projection=('name', ))
+			list(People.find(projection=('name', )))
+			
+			assert not len(unit)
+	
+	def test_projection_reads_server(self, People):
+		with UnitOfWork() as unit:
+			alice = People.find_one(ALICE)
+			alice.age = 28
+			
+			current = People.find_one(ALICE, projection=('age', ))
+			
+			assert current is not alice
+			assert current.age == 27
+			assert unit.lookup(People.get_collection(), {'_id': ALICE}) is alice
+			
+			unit.discard(alice)  # Abandon the local change, rather than flushing it.
+	
+	def test_reload(self, People):
+		with UnitOfWork():
+			alice = People.find_one(ALICE)
+			People.get_collection().update_one({'_id': ALICE}, {'$set': {'age': 28}})
+			
+			assert alice.reload().age == 28
+			assert People.find_one(ALICE) is alice
+	
+	def test_delete(self, People):
+		with UnitOfWork() as unit:
+			alice = People.find_one(ALICE)
+			alice.delete_one()
+			
+			assert alice not in unit
+			assert People.find_one(ALICE) is None
+
+
+class TestFlush(object):
+	def test_flush(self, People):
+		with UnitOfWork() as unit:
+			People.find_one(ALICE).age = 28
+			People.find_one(BOB)
+			carol = unit.add(People(name='Carol', age=7))
+		
+		assert not carol.changed
+		assert People.find_one(ALICE).age == 28
+		assert People.find_one(carol.id).name == 'Carol'
+	
+	def test_failure(self, People):
+		with pytest.raises(RuntimeError):
+			with UnitOfWork():
+				People.find_one(ALICE).age = 28
+				raise RuntimeError()
+		
+		assert People.find_one(ALICE).age == 27
+	
+	def test_disabled(self, People):
+		with UnitOfWork(flush=False) as unit:
+			People.find_one(ALICE).age = 28
+		
+		assert People.find_one(ALICE).age == 27
+		assert unit.flush()[0].modified_count == 1
@@ -95,4 +95,5 @@ class MongoSession(object):
 		D = self._Document
 		document = context.session[self.name]
 		
+		# Replaced whole: values are plain containers whose in-place modification is not tracked.
 		D.get_collection().replace_one(D.id == document.id, document, True)